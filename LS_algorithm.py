@@ -13,19 +13,20 @@ Local dominance unveils clusters in networks, Communications Physcis, 2024, 7:17
 """
 
 
+import sys
 import random
+import logging
+from time import perf_counter
 import networkx as nx
 import numpy as np
 from queue import Queue
 from datetime import datetime
 import community
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-import matplotlib.colors as mc
-import colorsys
-from LS_other_function import plot_combination
+from LS_csr_engine import CSRGraph, degree_hierarchy_random_tree_csr, local_leader_superiors_csr, lap_time, traced_peak
 np.set_printoptions(threshold = np.inf)
 
+logger = logging.getLogger(__name__)
+
 def max_degree_hierarchy_dag(G,selfloop_nodes=None):
     '''
     Create a maximum degree hierarchy DAG from a networkx graph G
@@ -166,6 +167,7 @@ def degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=None, selfloo
             tree_edge_list.append( (parent_node,node) )
     
     # print("! In degree_hierarchy_random_tree broke "+str(number_of_ties)+" ties at random")
+    D.graph["number_of_ties"] = number_of_ties
     return D, tree_edge_list       
 	# now we break all ties in Fig.1b (e.g., d->c,d->e; l->b,l->m), and tree_edge_list are short-dahsed-arrows in Fig.1c, and add information (rootnode,parentnode,distoroot), which are useful for community label backpropagation, of nodes in the DAG
 
@@ -251,188 +253,534 @@ def BFS_from_s(G,s,roots):
             if w in roots and G.degree[w] > G.degree[s]:  ###
                 return w,path_dict[w]
     return s,-1
-	
-def hierarchical_degree_communities(G, center_num=None, auto_choose_centers=False, maximum_tree=True, seed=None, self_loop=False):
+
+class LSResult(object):
+    '''
+    Compact, array-backed result of the Local Search (LS) algorithm.
+    All node references are integer indices into nodes; -1 stands for "none".
+
+    nodes -- the original node id of every index
+    degree -- degree (influence) k_i of every node
+    parent, root, distance -- the hierarchy forest (tree parent, local leader, distance to it)
+    leaders -- indices of the local leaders (roots of trees with more than one node)
+    superior, path -- superior local leader and path length l_i of every leader (aligned with leaders), as given by the Local-BFS
+    decision_l -- l_i of every node as used in the decision graph
+    decision_value -- normalized k_i*l_i of every node
+    decision_order -- node indices sorted by decreasing decision_value (the x-axis of the decision graph)
+    centers -- indices of the community centers
+    labels -- index of the community center of every node, -1 when it belongs to no center
+    dag_src, dag_dst -- edges of the maximum degree DAG
+    seed -- the random seed used to break ties
+    '''
+    __slots__ = ('nodes', 'degree', 'parent', 'root', 'distance', 'leaders', 'superior', 'path',
+                 'decision_l', 'decision_value', 'decision_order', 'centers', 'labels',
+                 'dag_src', 'dag_dst', 'seed')
+
+    def __init__(self, **kwargs):
+        for key in self.__slots__:
+            setattr(self, key, kwargs.get(key))
+
+    def replace(self, **kwargs):
+        '''a copy of this result with some fields replaced (the other arrays are shared)'''
+        fields = {key: getattr(self, key) for key in self.__slots__}
+        fields.update(kwargs)
+        return LSResult(**fields)
+
+    def center_nodes(self):
+        '''ids of the community centers'''
+        return [self.nodes[i] for i in self.centers.tolist()]
+
+    def partition(self):
+        '''{node id: id of its community center, or -1}'''
+        nodes = self.nodes
+        return {nodes[i]: (nodes[c] if c >= 0 else -1) for i, c in enumerate(self.labels.tolist())}
+
+    def decision_graph_data(self):
+        '''
+        The data drawn by plot_combination (Fig. 1f in our paper):
+        [k_i, l_i, node ids, rank, sorted k_i*l_i, node ids in rank order, center ids],
+        with local leaders listed first as in hierarchical_degree_communities
+        '''
+        nodes = self.nodes
+        is_leader = np.zeros(len(self.degree), dtype=bool)
+        is_leader[self.leaders] = True
+        plot_order = np.concatenate((self.leaders, np.flatnonzero(~is_leader)))
+        nodeid = [nodes[i] for i in plot_order.tolist()]
+        multi_sort = np.array([[int(nodes[i]), self.decision_value[i]] for i in self.decision_order.tolist()]).reshape(-1, 2)
+        return [self.degree[plot_order], self.decision_l[plot_order], nodeid, list(range(len(multi_sort))),
+                multi_sort[:, 1], multi_sort[:, 0], self.center_nodes()]
+
+
+def local_search_communities(G, center_num=None, auto_choose_centers=False, maximum_tree=True, seed=None, self_loop=False,
+                             stats=None):
+    '''
+    Headless Local Search (LS) algorithm: computes the hierarchical degree forest, the
+    superiors of all local leaders, the decision graph and the community partition,
+    without printing or plotting anything.
+
+    Input
+    -----
+    G -- simple networkx graph, or a CSRGraph (see LS_csr_engine.py)
+    center_num=None -- number of community centers; None gives the finest partition (all local leaders)
+    auto_choose_centers=False -- If true, determine the number of first-level centers by choose_center
+    maximum_tree=True -- If true uses maximum dgree DAG as input, otherwise uses full degree DAG
+    seed=None -- an integer to use as a seed to break ties at random
+    self_loop -- If true means the self-loop makes sense
+    stats=None -- optional dict filled with stage times and counters, see profile_communities
+
+    Return
+    ------
+    LSResult
+    '''
+    hierarchy = local_leader_hierarchy(G, maximum_tree=maximum_tree, seed=seed, self_loop=self_loop, stats=stats)
+    return select_centers(hierarchy, center_num=center_num, auto_choose_centers=auto_choose_centers, stats=stats)
+
+def local_leader_hierarchy(G, maximum_tree=True, seed=None, self_loop=False, stats=None):
+    '''
+    Steps (1)-(2) of the LS algorithm, which do not depend on the number of centers:
+    the hierarchical degree forest, the superiors of all local leaders and the decision graph.
+
+    Return
+    ------
+    LSResult without centers and labels (both None)
+    '''
+    tic = perf_counter()
+    csr = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+    lap_time(stats, 'csr', tic)
+    n = csr.number_of_nodes()
+    degree = csr.degree
+    src, dst, parent, root, distance = degree_hierarchy_random_tree_csr(csr.indptr, csr.indices, degree,
+                                                                        maximum_tree=maximum_tree, random_seed=seed,
+                                                                        selfloop=csr.selfloop if self_loop else None,
+                                                                        stats=stats)
+    missing = np.flatnonzero(root < 0)
+    if len(missing) > 0:
+        logger.error("%d nodes have no rootnode, e.g. node %s", len(missing), csr.nodes[missing[0]])
+
+    # (1). local leaders (roots of more than one node, in order of appearance) and their superiors by Local-BFS
+    assigned = root[root >= 0]
+    roots, first = np.unique(assigned, return_index=True)
+    roots = roots[np.argsort(first)]
+    leaders = roots[np.bincount(assigned, minlength=n)[roots] > 1].astype(np.int64)
+    superior, path = local_leader_superiors_csr(csr.indptr, csr.indices, degree, leaders, stats=stats)
+    if stats is not None:
+        stats['leaders'] = len(leaders)
+
+    # (2). normalized influence k_i & path length l_i of all nodes, for the decision graph
+    tic = perf_counter()
+    nodes = csr.nodes
+    decision_l, decision_value, decision_order = decision_graph(nodes, degree, leaders, path)
+    lap_time(stats, 'ranking', tic)
+
+    return LSResult(nodes=nodes, degree=degree, parent=parent, root=root, distance=distance, leaders=leaders,
+                    superior=superior, path=path, decision_l=decision_l, decision_value=decision_value,
+                    decision_order=decision_order, dag_src=src, dag_dst=dst, seed=seed)
+
+def _min_max_standard(x, x_min, x_max, n):
+    # standard_data of a part x of n values whose extremes over all n values are x_min, x_max
+    if x_max - x_min == 0:
+        return np.full(len(x), 1 / n)
+    return (x - x_min) / (x_max - x_min)
+
+def node_keys(nodes):
+    # node ids as an array that numpy can sort, in the same order as the ids
+    ids = np.asarray(nodes)
+    if ids.dtype.kind not in 'iuf':
+        ids = np.unique(ids, return_inverse=True)[1].reshape(-1)
+    return ids
+
+def decision_graph(nodes, degree, leaders, path, leaders_only=False):
+    '''
+    Normalized influence k_i & path length l_i of all nodes (Fig. 1f in the main text of our paper)
+
+    The influence is the dense rank of the degree (get_indicator_rank), the path length is
+    squared (get_square), and both are min-max normalized over all nodes (standard_data).
+
+    Input
+    -----
+    nodes -- node ids (used to order nodes of equal value)
+    degree -- degree k_i of every node
+    leaders, path -- local leaders and their path length l_i to their superior (-1 if none)
+    leaders_only=False -- If true, compute the entries of the local leaders only (still normalized over all nodes)
+
+    Return
+    ------
+    decision_l -- l_i of every node: the path length for local leaders (the largest one for leaders
+                  without superior), 1 for other nodes and for nodes of degree <= 1
+    decision_value -- normalized k_i*l_i of every node
+    decision_order -- node indices by decreasing decision_value, then decreasing node id
+    With leaders_only, the three arrays are aligned with leaders and decision_order holds positions in leaders.
+    '''
+    degree = np.asarray(degree)
+    leaders = np.asarray(leaders, dtype=np.int64)
+    n = len(degree)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0, dtype=np.int64)
+    # dense rank of every degree value, 1 for the smallest one
+    rank_of_degree = np.cumsum(np.bincount(degree) > 0)
+    leader_l, leader_value, other_standard = leader_decision(degree[leaders], path, rank_of_degree, n)
+
+    if leaders_only:
+        decision_l = leader_l
+        decision_value = leader_value
+        keys = node_keys(nodes)[leaders]
+    else:
+        decision_l = np.ones(n, dtype=np.int64)
+        decision_l[leaders] = leader_l
+        # squared l_i is 1 for all nodes other than local leaders
+        decision_value = _min_max_standard(rank_of_degree[degree], 1, int(rank_of_degree[-1]), n) * other_standard
+        decision_value[leaders] = leader_value
+        keys = node_keys(nodes)
+    decision_order = np.lexsort((keys, decision_value))[::-1].astype(np.int64)
+    return decision_l, decision_value, decision_order
+
+def leader_decision(leader_degree, path, rank_of_degree, n):
+    '''
+    l_i and normalized k_i*l_i of the local leaders only, normalized over all n nodes as in decision_graph
+
+    Input
+    -----
+    leader_degree, path -- degree k_i and path length l_i (-1 if none) of every local leader
+    rank_of_degree -- dense rank of every degree value of the graph (1 for the smallest one)
+    n -- number of nodes
+
+    Return
+    ------
+    leader_l, leader_value -- l_i and normalized k_i*l_i, aligned with the leaders
+    other_standard -- normalized squared l_i of the other nodes (0 unless all squared l_i are equal)
+    '''
+    leader_degree = np.asarray(leader_degree, dtype=np.int64)
+    path = np.asarray(path, dtype=np.int64)
+    leader_l = np.ones(len(path), dtype=np.int64)
+    if len(path) > 0:
+        # For local leaders with the maximal degree in the network and noisy nodes (isolated ones), setting their l_i as the maximum of l_i of all other local leaders
+        max_path_temp = int(path.max())
+        max_path = max_path_temp if max_path_temp > -1 else 2
+        leader_l = np.where(path == -1, max_path, path).astype(np.int64)
+        leader_l[leader_degree <= 1] = 1  #Set l_i=1 for nodes whose degree k_i=1
+
+    rank_max = int(rank_of_degree[-1])
+    # squared l_i is 1 for all nodes other than local leaders
+    square = leader_l ** 2
+    square_min = int(square.min()) if len(path) > 0 else 1
+    square_max = int(square.max()) if len(path) > 0 else 1
+    if len(path) < n:
+        square_min = min(square_min, 1)
+        square_max = max(square_max, 1)
+    degree_standard = _min_max_standard(rank_of_degree[leader_degree], 1, rank_max, n)
+    shortest_path_standard = _min_max_standard(square, square_min, square_max, n)
+    other_standard = _min_max_standard(np.ones(1, dtype=np.int64), square_min, square_max, n)[0]
+    return leader_l, degree_standard * shortest_path_standard, other_standard #noralized k_i*l_i
+
+def select_centers(hierarchy, center_num=None, auto_choose_centers=False, stats=None):
+    '''
+    Step (3) of the LS algorithm: take the first center_num nodes of the decision graph as
+    community centers and resolve the community of every node.
+
+    Input
+    -----
+    hierarchy -- LSResult from local_leader_hierarchy (or any LSResult)
+    center_num, auto_choose_centers, stats -- see local_search_communities
+
+    Return
+    ------
+    LSResult sharing the arrays of hierarchy, with centers and labels
+    '''
+    tic = perf_counter()
+    decision_order = hierarchy.decision_order
+    decision_value = hierarchy.decision_value
+    if auto_choose_centers == True:
+        auto_centernum = choose_center(np.column_stack((decision_order, decision_value[decision_order])))
+        center_num = auto_centernum if (center_num or 0) < auto_centernum else center_num
+    if not center_num:
+        center_num = len(hierarchy.leaders)
+    top = decision_order[:center_num]
+    centers = top[decision_value[top] > 0]
+
+    is_center = np.zeros(len(decision_order), dtype=bool)
+    is_center[centers] = True
+    labels = resolve_community_roots(community_pointer(hierarchy), is_center)
+    lap_time(stats, 'roots', tic)
+    return hierarchy.replace(centers=centers, labels=labels)
+
+def center_token(center_num):
+    '''
+    center_num as a word for files and the command line: 'default' (None, all local leaders),
+    'auto' (auto_choose_centers) or the number
+    '''
+    if center_num is None or center_num == 'default':
+        return 'default'
+    if center_num == 'auto':
+        return 'auto'
+    return str(int(center_num))
+
+def community_pointer(hierarchy):
+    '''
+    Local leaders point to their superior, other nodes to their local leader (-1 if none)
+    '''
+    pointer = hierarchy.root.astype(np.int64)
+    pointer[hierarchy.leaders] = hierarchy.superior
+    return pointer
+
+def profile_communities(G, center_num=None, auto_choose_centers=False, maximum_tree=True, seed=None, self_loop=False,
+                        trace_memory=False):
+    '''
+    Run local_search_communities with instrumentation, to find regressions and explain slow graphs.
+
+    Input
+    -----
+    G, center_num, auto_choose_centers, maximum_tree, seed, self_loop -- see local_search_communities
+    trace_memory=False -- If true, also measure the peak of the memory allocated by Python and numpy
+                          (tracemalloc), in a separate run so that the times are not affected
+
+    Return
+    ------
+    result, stats
+
+    result --- LSResult
+    stats --- dict with
+        'time': wall time in seconds (perf_counter) of the stages 'csr' (conversion of a networkx graph),
+                'dag', 'forest', 'local_bfs', 'ranking', 'roots', and the 'total'
+        'ties': ties broken at random in the forest BFS
+        'max_depth': largest distance of a node to its local leader
+        'leaders': number of local leaders
+        'visited': nodes visited by the Local-BFS of every local leader (aligned with result.leaders)
+        'field_visited': nodes visited to maintain the distances to the leaders of larger degree
+        'peak_memory': peak traced memory in bytes (only if trace_memory)
+    '''
+    stats = {}
+    options = dict(center_num=center_num, auto_choose_centers=auto_choose_centers, maximum_tree=maximum_tree,
+                   seed=seed, self_loop=self_loop)
+    tic = perf_counter()
+    result = local_search_communities(G, stats=stats, **options)
+    lap_time(stats, 'total', tic)
+    if trace_memory:
+        # a second, untimed run: tracemalloc would slow down the stages timed above
+        stats['peak_memory'] = traced_peak(local_search_communities, G, **options)
+    return result, stats
+
+class LocalSearch(object):
+    '''
+    Reusable LS session: the leader hierarchy of a graph is computed once, after which the
+    partition for any number of centers only costs the root resolution of step (3).
+
+    >>> ls = LocalSearch(G, seed=seed)
+    >>> ls.partition(4).partition()     # first level of a multi-scale network
+    >>> ls.partition(16).partition()    # second level
+    '''
+    __slots__ = ('hierarchy', '_children_indptr', '_children')
+
+    def __init__(self, G, maximum_tree=True, seed=None, self_loop=False):
+        self.hierarchy = local_leader_hierarchy(G, maximum_tree=maximum_tree, seed=seed, self_loop=self_loop)
+        self._children = None
+
+    def partition(self, center_num=None, auto_choose_centers=False):
+        '''LSResult for center_num centers, see local_search_communities'''
+        return select_centers(self.hierarchy, center_num=center_num, auto_choose_centers=auto_choose_centers)
+
+    def iter_partitions(self, max_centers=None):
+        '''
+        Yield (center_num, centers, labels) for center_num = 1, ..., max_centers (default:
+        the number of local leaders). Adding the next center of the decision graph only
+        relabels the nodes whose chain now stops at it, so the whole sweep costs about
+        O(n * number of centers on a chain) instead of one full resolution per center_num.
+        The labels array is updated in place: copy it to keep a partition.
+        '''
+        h = self.hierarchy
+        n = len(h.degree)
+        if max_centers is None:
+            max_centers = len(h.leaders)
+        if self._children is None:
+            pointer = community_pointer(h)
+            child = np.flatnonzero((pointer >= 0) & (pointer != np.arange(n)))
+            order = np.argsort(pointer[child], kind='stable')
+            self._children = child[order].tolist()
+            self._children_indptr = np.searchsorted(pointer[child][order], np.arange(n + 1)).tolist()
+        cp = self._children_indptr
+        children = self._children
+        labels = np.full(n, -1, dtype=np.int64)
+        is_center = np.zeros(n, dtype=bool)
+        centers = []
+        for k, c in enumerate(h.decision_order[:max_centers].tolist()):
+            if h.decision_value[c] > 0:
+                is_center[c] = True
+                centers.append(c)
+                # the new center takes over its subtree, up to the subtrees of other centers
+                labels[c] = c
+                stack = [c]
+                while stack:
+                    v = stack.pop()
+                    for u in children[cp[v]:cp[v + 1]]:
+                        if not is_center[u] and labels[u] != c:
+                            labels[u] = c
+                            stack.append(u)
+            yield k + 1, np.array(centers, dtype=np.int64), labels
+
+    def partitions(self, center_nums=None):
+        '''
+        {center_num: labels} for every center_num in center_nums (default: 1 ... number of local leaders)
+        '''
+        if center_nums is None:
+            center_nums = range(1, len(self.hierarchy.leaders) + 1)
+        wanted = set(center_nums)
+        out = {}
+        if len(wanted) > 0:
+            for k, centers, labels in self.iter_partitions(max(wanted)):
+                if k in wanted:
+                    out[k] = labels.copy()
+        return out
+
+    def dendrogram(self):
+        '''
+        The whole leader hierarchy as a parent array over the local leaders.
+
+        Return
+        ------
+        leaders -- indices of the local leaders, in decision graph order (most central first)
+        parent -- position in leaders of the superior of every leader, -1 for the top of a hierarchy
+        height -- normalized k_i*l_i of every leader (its value in the decision graph)
+
+        partition(center_num) (select_centers) takes as centers the nodes of positive value among
+        the first center_num nodes of decision_order, which ranks all nodes, not only the leaders.
+        Other nodes get the value 0 unless all squared l_i are equal, so the centers are usually
+        the first center_num leaders above with positive height; in that degenerate case other
+        nodes of high degree rank among the leaders and can be centers too.
+        '''
+        h = self.hierarchy
+        is_leader = np.zeros(len(h.degree), dtype=bool)
+        is_leader[h.leaders] = True
+        leaders = h.decision_order[is_leader[h.decision_order]]
+        position = np.full(len(h.degree), -1, dtype=np.int64)
+        position[leaders] = np.arange(len(leaders))
+        superior = np.empty(len(h.degree), dtype=np.int64)
+        superior[h.leaders] = h.superior
+        parent = position[superior[leaders]]
+        parent[superior[leaders] == leaders] = -1
+        return leaders, parent, h.decision_value[leaders]
+
+def resolve_community_roots(pointer, is_center):
+    '''
+    Follow pointer from every node until a community center is met, by pointer jumping:
+    centers point to themselves, and every round replaces the target of each unresolved
+    node by the target of its target, so a chain of length d is resolved in log2(d) rounds
+    of vectorized work.
+
+    Input
+    -----
+    pointer -- the next node of every node towards its center, -1 if none
+    is_center -- boolean mask of the community centers
+
+    Return
+    ------
+    labels -- the first center on the chain of every node, -1 when the chain ends or runs into a loop first
+    '''
+    n = len(pointer)
+    # index n is a sink for missing pointers
+    target = np.append(np.where(pointer < 0, n, pointer), n).astype(np.int64)
+    target[:n][is_center] = np.flatnonzero(is_center)
+    terminal = np.append(is_center, True)
+    active = np.flatnonzero(~terminal[target[:n]])
+    rounds = 0
+    # chains reaching a center or the sink are at most n long; whatever is still active after that is caught in a loop
+    while len(active) > 0 and (1 << rounds) <= n:
+        target[active] = target[target[active]]
+        active = active[~terminal[target[active]]]
+        rounds += 1
+    labels = target[:n]
+    return np.where(terminal[labels] & (labels < n), labels, -1)
+
+def plot_decision_graph(result, filepath='./', dataname='LS_default', save=False):
+    '''
+    Draw the decision graph of an LSResult, where centers are nodes with both a large influence k_i and path length l_i
+    '''
+    from LS_other_function import plot_combination
+    data = result.decision_graph_data()
+	#just for better visualization, can be safely modified
+    subplot_location = [0.25, 0.55, 0.35, 0.3]
+    xlim_start_end = [0.3, 0.7]
+    ylim_start_end = [0.7, 0.3]
+    font_location = -0.04
+    plot_combination(data[0], data[1], data[2], data[3], data[4], data[5], data[6],
+                     subplot_location, xlim_start_end, ylim_start_end, font_location,
+                     filepath=filepath, dataname=dataname, save=save)
+
+def result_to_dag(result):
+    '''
+    The DAG of hierarchical_degree_communities: maximum degree DAG with node attributes
+    rootnode (community center or None), parentnode (tree parent, or the superior for local leaders) and distancetoroot
+    '''
+    nodes = result.nodes
+    D = nx.DiGraph()
+    D.add_nodes_from(nodes)
+    D.add_edges_from((nodes[u], nodes[v]) for u, v in zip(result.dag_src.tolist(), result.dag_dst.tolist()))
+    parent = result.parent.astype(np.int64)
+    parent[result.leaders] = result.superior
+    for i, (p, c, d) in enumerate(zip(parent.tolist(), result.labels.tolist(), result.distance.tolist())):
+        if d < 0:
+            continue
+        D.nodes[nodes[i]]["rootnode"] = nodes[c] if c >= 0 else None
+        D.nodes[nodes[i]]["parentnode"] = nodes[p] if p >= 0 else None
+        D.nodes[nodes[i]]["distancetoroot"] = d
+    return D
+
+def hierarchical_degree_communities(G, center_num=None, auto_choose_centers=False, maximum_tree=True, seed=None, self_loop=False, plot=True):
     '''
     Produces hierarchical degree forest (HDF) of trees and hence communities.
 	The main part of our Local Search (LS) algorithm
     
     Input
     -----
-    G -- simple graph for which communities are required
+    G -- simple graph for which communities are required, or a CSRGraph (e.g. from LS_knn_graph.py)
     maximum_tree=True -- If true uses maximum dgree DAG as input, otherwise uses full degree DAG 
     seed=None -- an integer to use as a seed to break ties at random.  Use None to remove random element
     self_loop -- If true means the self-loop makes sense
+    plot=True -- If true draws the decision graph
     
     Output
     ------
-    On screen statistics of communities
+    Statistics of communities, logged through the logging module
+    D,center_dcd,y_dcd,y_partition,plot_combination_data
     
+    Use local_search_communities for the same computation without the DiGraph, logging and plotting.
     '''
-    selfloop_edges = []
-    if nx.number_of_selfloops(G) > 0:
-        selfloop_edges = list(nx.selfloop_edges(G))
-        G.remove_edges_from(selfloop_edges)
-    selfloop_nodes = []
-    for item in selfloop_edges:
-        selfloop_nodes.append(item[0])
-    if self_loop == False:
-        selfloop_nodes = []
+    if isinstance(G, CSRGraph):
+        csr = G
+    else:
+        csr = CSRGraph.from_networkx(G) # keeps the self-loops as a mask
+        if nx.number_of_selfloops(G) > 0:
+            G.remove_edges_from(list(nx.selfloop_edges(G)))
 
     start_time = datetime.now()
-    treename="Hierarchical Maximum Degree Forest"
-    #treeabv="HMDF"
-    if not maximum_tree:
-        treename="Hierarchical Full Degree Forest"
-        #treeabv="HFDF"
-        
-    # print ("\n===== "+treename+" seed "+str(seed)+" =====")
-    print("\n====Local Search Algorithm (random seed " +str(seed) +")==========")
-    print("Network: "+str(len(G.nodes))+" nodes,"+str(len(G.edges))+" edges")
-    D, tree_edge_list = degree_hierarchy_random_tree(G, maximum_tree=maximum_tree, random_seed=seed, selfloop_nodes=selfloop_nodes) 
-	# D is the DAG comprising short-dahsed-arrows in Fig.1c in the main text of our paper
-    # print("With "+str(G.number_of_nodes())+" nodes, now left with "+str(len(tree_edge_list))+" edges in tree" )
-    
-	# Now find all the nodes with the same root_node (i.e., local leaders)
-    root_to_node={}
-    for node in D:
-        if "rootnode" in D.nodes[node]:
-            root_node = D.nodes[node]["rootnode"]
-        else:
-            print("*** ERROR Node "+str(node)+" has no rootnode")  
-            continue
-        if root_node not in root_to_node:
-            root_to_node[root_node]=[]
-        root_to_node[root_node].append(node)
-    ##
-	
-    # determine centers from root_to_node
-    # (1). using Local-BFS to determine the hidden directionalilty of each local leader (i.e., finding its superior among local leaders along the hierarchy & calculate shortest path lengh between it and its superior l_i  #通过local-BFS计算local leader的指向和最短路径
-    root_to_node = {key: value for key, value in root_to_node.items() if len(value) > 1}
-    Potential_Center = list(root_to_node.keys())
-    # print("! Number of Communities (root nodes) found "+str(len(root_to_node)))
-    # print("  Root Nodes: ",Potential_Center)
-    
-    root_number = len(root_to_node)
-    root_decision = {}
-    avg_l = 0
-    # print('Intermediate process of determining the center: ')
-    for node in root_to_node.keys():
-        e,p = BFS_from_s(G,node,Potential_Center)  #Local-BFS, e is the superior, p is the path length to it
-        root_decision[node] = [e, p, G.degree[node]]
-        
-
-    # For local leaders with the maximal degree in the network and noisy nodes (isolated ones), setting their l_i as the maximum of l_i of all other local leaders [or the diameter of the network #度值最大的节点和噪声节点的最短路径长度设置为所有节点中最短路径长度的最大值
-    max_path_temp = max(np.array(list(root_decision.values()))[:,1])
-    # print("max_path_temp  == ",max_path_temp," type",type(max_path_temp))
-    max_path_temp = int(max_path_temp)
-    max_path = max_path_temp if max_path_temp > -1 else 2 
-    for node in root_decision:
-        if root_decision[node][1] == -1: #maximal local leader(s)
-            root_decision[node] = [root_decision[node][0],max_path,root_decision[node][2]]
-    
-    # (2). calculate normalized influence (here, degree k_i) & path length l_i of all nodes (yields result in Fig. 1f in the main text of our paper) #计算所有节点规一化后的度值ki和最短路径li
-    node_plot = root_decision.copy()
-    for n in G.nodes():
-        if n not in node_plot:
-            node_plot[n] = [D.nodes[n]['parentnode'],1,G.degree[n]]
-    root_array = np.array(list(node_plot.values())) 
-#     print('degree, path',root_array[:,2],root_array[:,1])
-#     print(root_array)
-    root_array[root_array[:,2]<=1, 1]=1  #Set l_i=1 for nodes whose degree k_i=1 ###
-    # print('*****************')
-    # print(root_array)
-    degree = get_indicator_rank(root_array[:,2])
-    shortest_path = get_square(root_array[:,1])
-    degree_standard = standard_data(np.array(degree))
-    shortest_path_standard = standard_data(np.array(shortest_path))
-    multi = degree_standard * shortest_path_standard #noralized k_i*l_i
-    nodeid = list(node_plot.keys())
-    multi_dict = {}
-    for i in range(len(nodeid)):
-        multi_dict[nodeid[i]] = multi[i]
-    multi_sort = np.array(sorted(multi_dict.items(), key = lambda kv:(kv[1],kv[0]), reverse=True)) 
-    multi_sort = np.array([[int(i[0]),i[1]] for i in multi_sort])
-    multi_x = [i for i in range(len(multi_sort))] 
-    # print('Determine centers by muti:',multi_sort[:40])
-    
-    # choosing the first-level community centers automatically when there is multi-scale communities 
-    if auto_choose_centers == True:
-        auto_centernum = choose_center(multi_sort)
-        center_num = auto_centernum if center_num < auto_centernum else center_num
-    if not center_num:
-        center_num = len(root_to_node) 
-    center_dcd = []
-    local_cnt = 0
-    # for i in multi_sort[:,1]:
-    for i in multi_sort[:center_num]:
-        if i[1]>0:
-            local_cnt+=1
-            center_dcd.append(int(i[0]))
-    print("The number of local leaders: "+str(local_cnt))
-    # saving related data for visualization  #保存绘图需要的数据
-    plot_combination_data = [root_array[:,2],root_array[:,1],nodeid, multi_x, multi_sort[:,1],multi_sort[:,0],center_dcd]
-    plot_process_degree_shortpath_data = [degree,shortest_path,nodeid]
-
-
-    #(3). For local leaders, record their superior along the hierarchy in the DAG
-    for node in root_to_node.keys():
-        D.nodes[node]["parentnode"] = root_decision[node][0]
-        D.nodes[node]["rootnode"] =  D.nodes[node]["parentnode"]
-    for node in D.nodes():
-        recent_node = [] # prevent loop
-        recent_node.append(node)
-        flag = 0
-        if node in center_dcd:
-            D.nodes[node]["rootnode"] = node
-        else:
-            while D.nodes[node]["rootnode"] not in center_dcd and flag == 0:
-                j = D.nodes[node]["rootnode"]
-                if j not in recent_node and j != None:
-                    recent_node.append(j)
-                    D.nodes[node]["rootnode"] = D.nodes[j]["rootnode"]
-                else:
-                    D.nodes[node]["rootnode"] = None
-                    flag = 1
-                    
-    # (4). get the classes and partition
-    y_dcd = []
-    y_partition = {}
-    for node in D.nodes():
-        if D.nodes[node]["rootnode"] == None:
-            y_dcd.append(-1)
-            y_partition[node] = -1
-        else:
-            y_dcd.append(D.nodes[node]["rootnode"])
-            y_partition[node] = D.nodes[node]["rootnode"]
-
+    result = local_search_communities(csr, center_num=center_num, auto_choose_centers=auto_choose_centers,
+                                      maximum_tree=maximum_tree, seed=seed, self_loop=self_loop)
     end_time = datetime.now()
     stamp = (end_time-start_time).total_seconds()*1000
-    print('Running Time: %d ms' % stamp)
-	
-    # print('The number of community  centers: '+str(center_dcd))
-    print('The number of community  centers: ' + str(len(plot_combination_data[6])))
-    print('The id of the centers are: '+str(plot_combination_data[6]))
-    #print('Modularity of the partition by LS: '+str(community.modularity(y_partition, G)))
+    report_communities(result, stamp)
+    if plot:
+        plot_decision_graph(result)
+    D = result_to_dag(result)
+    y_partition = result.partition()
+    y_dcd = list(y_partition.values())
+    return D,result.center_nodes(),y_dcd,y_partition,result.decision_graph_data()
 
-    print("The decision graph for determining the number of centers, "+
-          "where centers are nodes with both a large influence k_i and path length l_i to other local leaders with a higher influence.")
-    
-	#just for better visualization, can be safely modified
-    subplot_location = [0.25, 0.55, 0.35, 0.3]
-    xlim_start_end = [0.3, 0.7]
-    ylim_start_end = [0.7, 0.3]
-    font_location = -0.04
-    plot_combination(plot_combination_data[0], plot_combination_data[1], plot_combination_data[2],
-                     plot_combination_data[3], plot_combination_data[4], plot_combination_data[5],
-                     plot_combination_data[6], subplot_location, xlim_start_end, ylim_start_end, font_location,
-                     filepath='./', save=False)
-                     
-    print("Note: If multi-scale community structure, which can be common in real networks, is of interest, the number of communities at different level can be explicitly set by some sophisticaed methods or simply by visual inspection for notable gaps in the decision graph. In the default setting, LS alorithm returns community partition at the finest level.")
-    return D,center_dcd,y_dcd,y_partition,plot_combination_data
+def report_communities(result, stamp=None):
+    '''
+    Log the statistics of an LSResult (stamp: running time in ms)
+    '''
+    logger.info('\n====Local Search Algorithm (random seed %s)==========', result.seed)
+    logger.info('Network: %d nodes,%d edges', len(result.degree), int(result.degree.sum()) // 2)
+    logger.info('The number of local leaders: %d', len(result.centers))
+    if stamp is not None:
+        logger.info('Running Time: %d ms', stamp)
+    logger.info('The number of community  centers: %d', len(result.centers))
+    logger.info('The id of the centers are: %s', result.center_nodes())
+    logger.info("The decision graph for determining the number of centers, "
+                "where centers are nodes with both a large influence k_i and path length l_i to other local leaders with a higher influence.")
+    logger.info("Note: If multi-scale community structure, which can be common in real networks, is of interest, the number of communities at different level can be explicitly set by some sophisticaed methods or simply by visual inspection for notable gaps in the decision graph. In the default setting, LS alorithm returns community partition at the finest level.")
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     print("### Simple (extreme) example of network where this method does not produce a unique community ###")    
     G=nx.Graph()
     #G.add_edges_from(EdgeList)
@@ -440,13 +788,22 @@ if __name__ == '__main__':
     # G.add_edges_from([ (0,2), (0,3), (0,4), (0,5), (1,2), (1,3), (1,4), (1,5) ])  #here is a simple example
 
     # if loading network from files, the network data from files, the id of nodes need to be digits, for example, if reading .gml, "label='id'" is required, which should be
-    G = nx.read_gml(r'data/network_with_true_community_labels/cora.gml', label='id')
+    # G = nx.read_gml(r'data/network_with_true_community_labels/cora.gml', label='id')
+    # the bundled networks load faster from their binary cache (parsed once, see LS_datasets.py)
+    from LS_datasets import load_networkx
+    G, _ = load_networkx('cora')
     seed = 163 # it can be any value
-    hierarchical_degree_communities(G, maximum_tree=True, seed=seed)
-    #hierarchical_degree_communities(G, maximum_tree=False, seed=seed)
-    print('If there is multi-scale community structure, you can type the number of communities:')
-    nc = int(input())
-    hierarchical_degree_communities(G, maximum_tree=True, seed=seed, center_num=nc)
+    ls = LocalSearch(G, maximum_tree=True, seed=seed) # the leader hierarchy is computed only once
+    result = ls.partition()
+    report_communities(result)
+    plot_decision_graph(result)
+    # the number of communities can also be given as the first argument (see LS_cli.py for a non-interactive command)
+    if len(sys.argv) > 1:
+        nc = int(sys.argv[1])
+    else:
+        print('If there is multi-scale community structure, you can type the number of communities:')
+        nc = int(input())
+    report_communities(ls.partition(nc))
 
     # # Other examples
     # print("\n\n  ### Karate Club Network ###")
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Batch runs of LS over collections of graphs, on a process pool, with resumable results.
+
+A batch is every graph (files, directories or glob patterns) times every seed; one job
+loads a graph, computes its leader hierarchy once (LocalSearch) and resolves it for every
+center_num. Finished jobs are written as they complete: one row per (graph, seed,
+center_num) appended to results.csv in the output directory (sizes, timings, centers,
+modularity, and the scores of cal_auc, NMI and ARI when the graph has ground-truth labels),
+and the label of every node to labels/<job>.npy. Running the same batch again skips the
+rows already in results.csv, so an interrupted batch resumes where it stopped, and a
+job which fails is logged and left for the next run instead of stopping the batch.
+Nothing is plotted.
+
+The results are a CSV file rather than Parquet or Feather parts: those need pyarrow, which
+is not among the requirements of the codebase. Appending a row and fsyncing the file is
+what makes a finished job durable, and run_batch reads the table back with pandas.
+
+    python LS_batch.py data/hierarchy_network/test --seeds 1 2 3 --center-nums default 4 16 --out batch_results
+"""
+
+
+import os
+import csv
+import glob
+import hashlib
+import logging
+import argparse
+from time import perf_counter
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from LS_algorithm import LocalSearch, center_token
+from LS_datasets import load_network, load_bundle
+from LS_metrics import evaluate_partition, modularity
+
+logger = logging.getLogger(__name__)
+
+GRAPH_EXTENSIONS = ('.gml', '.npz', '.txt', '.edgelist', '.edges')
+# columns of results.csv
+COLUMNS = ['graph', 'dataset', 'seed', 'center_num', 'nodes', 'edges', 'leaders', 'centers', 'center_nodes',
+           'load_time', 'hierarchy_time', 'partition_time', 'precision', 'recall', 'F1', 'NMI', 'ARI',
+           'modularity', 'labels_file']
+
+
+def expand_graphs(patterns):
+    '''
+    Graph files of a list of files, directories (their graph files, not recursive) and glob
+    patterns, sorted and without duplicates
+    '''
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+            paths.extend(p for p in found if os.path.isfile(p) and p.endswith(GRAPH_EXTENSIONS))
+        else:
+            found = glob.glob(pattern)
+            if not found:
+                raise FileNotFoundError('no graph matches %r' % pattern)
+            paths.extend(found)
+    return sorted(set(os.path.normpath(p) for p in paths))
+
+
+def job_name(path, seed, center_num):
+    '''file name of the labels of a job row'''
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return '%s-%s-seed%d-%s' % (stem, digest, seed, center_token(center_num))
+
+
+def _prepare_graph(path):
+    # parse a GML file into its bundle once, before the jobs of all seeds read it
+    if path.endswith('.gml'):
+        load_bundle(path)
+    return path
+
+
+def _run_job(task):
+    path, seed, center_nums, options = task
+    tic = perf_counter()
+    csr, y_true = load_network(path)
+    load_time = perf_counter() - tic
+    tic = perf_counter()
+    ls = LocalSearch(csr, seed=seed, **options)
+    hierarchy_time = perf_counter() - tic
+    nodes = np.asarray(csr.nodes)
+    rows, labels = [], []
+    for center_num in center_nums:
+        tic = perf_counter()
+        if center_num == 'auto':
+            result = ls.partition(auto_choose_centers=True)
+        else:
+            result = ls.partition(None if center_num == 'default' else int(center_num))
+        partition_time = perf_counter() - tic
+        # community center (node id) of every node, -1 for none
+        label = np.where(result.labels >= 0, nodes[np.maximum(result.labels, 0)], -1)
+        row = dict(graph=os.path.abspath(path), dataset=os.path.splitext(os.path.basename(path))[0], seed=seed,
+                   center_num=center_num, nodes=csr.number_of_nodes(), edges=csr.number_of_edges(),
+                   leaders=len(ls.hierarchy.leaders), centers=len(result.centers),
+                   center_nodes=' '.join(str(v) for v in result.center_nodes()), load_time=load_time,
+                   hierarchy_time=hierarchy_time, partition_time=partition_time,
+                   labels_file=os.path.join('labels', job_name(path, seed, center_num) + '.npy'))
+        if y_true is not None:
+            # -1 marks nodes without a ground-truth label, which are not scored
+            labelled = np.asarray(y_true) >= 0
+            row.update(evaluate_partition(result.labels[labelled], np.asarray(y_true)[labelled]))
+        row['modularity'] = modularity(csr, result.labels)
+        rows.append(row)
+        labels.append(label)
+    return rows, labels
+
+
+def _repair(path):
+    '''drop a last line left incomplete by an interrupted run'''
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+
+def completed_rows(out):
+    '''(absolute graph path, seed, center_num) of the rows already in out/results.csv'''
+    path = os.path.join(out, 'results.csv')
+    if not os.path.exists(path):
+        return set()
+    _repair(path)
+    done = pd.read_csv(path, usecols=['graph', 'seed', 'center_num'], dtype=str)
+    return set(zip(done['graph'].map(os.path.abspath), done['seed'].astype(int), done['center_num']))
+
+
+def _write(out, rows, labels):
+    # labels first, so a row in results.csv always has its labels file
+    for row, label in zip(rows, labels):
+        path = os.path.join(out, row['labels_file'])
+        temporary = path[:-4] + '.tmp%d.npy' % os.getpid()
+        np.save(temporary, label)
+        os.replace(temporary, path)
+    path = os.path.join(out, 'results.csv')
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, restval='')
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_batch(graphs, seeds=(1,), center_nums=(None,), out='ls_batch', workers=None, maximum_tree=True,
+              self_loop=False):
+    '''
+    Run LS for every graph, seed and center_num, skipping the rows already in out/results.csv
+
+    Input
+    -----
+    graphs -- list of graph files, directories or glob patterns (.gml, bundle .npz, or edge lists)
+    seeds -- list of integer seeds
+    center_nums -- list of numbers of centers; None or 'default' for all local leaders, 'auto'
+                   for auto_choose_centers
+    out -- output directory (results.csv and labels/)
+    workers -- number of worker processes (default: all cores); 1 runs in this process
+    maximum_tree, self_loop -- see local_search_communities
+
+    Return
+    ------
+    pandas DataFrame of out/results.csv, one row per (graph, seed, center_num)
+    '''
+    paths = expand_graphs(graphs)
+    tokens = list(dict.fromkeys(center_token(c) for c in center_nums))
+    os.makedirs(os.path.join(out, 'labels'), exist_ok=True)
+    done = completed_rows(out)
+    options = dict(maximum_tree=maximum_tree, self_loop=self_loop)
+    tasks = []
+    for path in paths:
+        for seed in seeds:
+            todo = [c for c in tokens if (os.path.abspath(path), int(seed), c) not in done]
+            if todo:
+                tasks.append((path, int(seed), todo, options))
+    logger.info('%d graphs, %d jobs to run (%d rows already done)', len(paths), len(tasks), len(done))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    failed = 0
+    if workers <= 1:
+        for task in tasks:
+            try:
+                _write(out, *_run_job(task))
+            except Exception:
+                failed += 1
+                logger.exception('%s seed %d failed', task[0], task[1])
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # every GML file is parsed once, before its jobs run
+            for future in as_completed([pool.submit(_prepare_graph, p) for p in set(t[0] for t in tasks)]):
+                if future.exception() is not None:
+                    logger.error('cannot read a graph: %s', future.exception())
+            futures = {pool.submit(_run_job, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    _write(out, *future.result())
+                except Exception:
+                    failed += 1
+                    logger.exception('%s seed %d failed', task[0], task[1])
+    if failed:
+        logger.warning('%d jobs failed; run the batch again to retry them', failed)
+    path = os.path.join(out, 'results.csv')
+    return pd.read_csv(path, dtype={'center_num': str}) if os.path.exists(path) else pd.DataFrame(columns=COLUMNS)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description='Run LS over a collection of graphs (resumable)')
+    parser.add_argument('graphs', nargs='+', help='graph files, directories or glob patterns')
+    parser.add_argument('--seeds', nargs='+', type=int, default=[1])
+    parser.add_argument('--center-nums', nargs='+', default=['default'],
+                        help="numbers of centers, 'default' (all local leaders) or 'auto'")
+    parser.add_argument('--out', default='ls_batch', help='output directory')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    table = run_batch(args.graphs, seeds=args.seeds, center_nums=args.center_nums, out=args.out,
+                      workers=args.workers)
+    print(table.groupby(['dataset', 'center_num'])[['centers', 'hierarchy_time', 'F1']].mean().to_string())
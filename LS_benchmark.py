@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the Local Search (LS) algorithm on the bundled datasets.
+
+Four suites are measured, each stage giving one record with its wall time (best of
+repeat runs, perf_counter) and peak memory (one run under tracemalloc):
+- network: loading, hierarchical_degree_communities, the Local-BFS of all local
+  leaders by BFS_from_s and by local_leader_superiors_csr, and the stages of profile_communities,
+  on the networks with ground-truth labels and the hierarchy networks;
+- vector: caldistance -> chose_dc -> cal_adge -> LS on the 2D and high-dimensional data;
+- scaling: the same on synthetic graphs (Barabasi-Albert) and vector data (Gaussian
+  blobs) of increasing size, for scaling curves;
+- reduction: dimensionality reduction (LS_reduction.py) -> kNN graph -> LS on MNIST and
+  Olivetti for every method and target dimension, with the time of every step and the
+  quality of the partition (precision, recall and F1 of cal_auc), for the trade-off
+  between speed and quality.
+
+Records are saved as JSON baselines, and compare_baseline lists the stages which got
+slower than a saved baseline:
+
+    python LS_benchmark.py --save baseline.json
+    python LS_benchmark.py --compare baseline.json
+"""
+
+
+import os
+import sys
+import glob
+import gzip
+import json
+import time
+import argparse
+import platform
+from time import perf_counter
+import numpy as np
+import pandas as pd
+import networkx as nx
+from LS_algorithm import (hierarchical_degree_communities, local_search_communities, profile_communities,
+                          BFS_from_s)
+from LS_cluster_function import caldistance, chose_dc, cal_adge
+from LS_other_function import cal_auc
+from LS_knn_graph import knn_graph_csr
+from LS_csr_engine import CSRGraph, local_leader_superiors_csr, traced_peak
+from LS_reduction import REDUCTIONS, reduce_dimension
+from LS_datasets import load_bundle, load_dataset
+
+NETWORKS = ['data/network_with_true_community_labels/%s.gml' % name
+            for name in ('polbooks', 'football', 'polblogs', 'cora', 'citeseer', 'pubmed')] + \
+           ['data/hierarchy_network/Hierarchy_random.gml', 'data/hierarchy_network/Hierarchy_scale.gml']
+VECTORS = sorted(glob.glob('data/2d_datasets/*.txt')) + ['data/high_datasets/iris.data', 'data/high_datasets/wine.data']
+GRAPH_SIZES = [1000, 3000, 10000, 30000, 100000]
+VECTOR_SIZES = [250, 500, 1000, 2000]
+# target dimensions of the reduction suite (None: the original data)
+REDUCTION_DIMENSIONS = [None, 10, 30, 100]
+
+
+def measure(function, *args, repeat=1, memory=True, **kwargs):
+    '''
+    Run function(*args, **kwargs)
+
+    Return
+    ------
+    value, seconds, peak
+
+    value --- the return value of the last run
+    seconds --- the best wall time of repeat runs
+    peak --- peak memory in bytes allocated during one more run under tracemalloc (None if not memory)
+    '''
+    seconds = None
+    for _ in range(repeat):
+        tic = perf_counter()
+        value = function(*args, **kwargs)
+        elapsed = perf_counter() - tic
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    peak = traced_peak(function, *args, **kwargs) if memory else None
+    return value, seconds, peak
+
+
+def _record(records, suite, dataset, stage, seconds, peak, **info):
+    records.append(dict(suite=suite, dataset=dataset, stage=stage, time=seconds, peak_memory=peak, **info))
+
+
+def _all_leaders_BFS_from_s(G, roots):
+    return {s: BFS_from_s(G, s, roots) for s in roots}
+
+
+def bench_network(records, G, dataset, suite='network', seed=1, repeat=1, memory=True, legacy=True):
+    '''
+    Benchmark LS on the graph G, appending the records of every stage to records
+    '''
+    info = dict(nodes=G.number_of_nodes(), edges=G.number_of_edges())
+    result, seconds, peak = measure(lambda: hierarchical_degree_communities(G.copy(), seed=seed, plot=False),
+                                    repeat=repeat, memory=memory)
+    _record(records, suite, dataset, 'hierarchical_degree_communities', seconds, peak, **info)
+
+    # stages of the headless pipeline
+    result, stats = profile_communities(G, seed=seed, trace_memory=False)
+    for stage, seconds in stats['time'].items():
+        _record(records, suite, dataset, 'LS.' + stage, seconds, None, **info)
+    _record(records, suite, dataset, 'LS.counters', None, None, ties=stats['ties'], max_depth=stats['max_depth'],
+            leaders=stats['leaders'], visited=int(stats['visited'].sum()), field_visited=stats['field_visited'], **info)
+
+    # Local-BFS of all local leaders, one BFS_from_s per leader and batched
+    nodes = list(G.nodes)
+    roots = [nodes[i] for i in result.leaders.tolist()]
+    if legacy:
+        _, seconds, peak = measure(_all_leaders_BFS_from_s, G, roots, repeat=repeat, memory=memory)
+        _record(records, suite, dataset, 'BFS_from_s', seconds, peak, leaders=len(roots), **info)
+    csr = CSRGraph.from_networkx(G)
+    _, seconds, peak = measure(local_leader_superiors_csr, csr.indptr, csr.indices, csr.degree, result.leaders,
+                               repeat=repeat, memory=memory)
+    _record(records, suite, dataset, 'local_leader_superiors_csr', seconds, peak, leaders=len(roots), **info)
+
+
+def bench_vector(records, data, dataset, suite='vector', dc_percent=6, seed=1, repeat=1, memory=True, condensed=True):
+    '''
+    Benchmark the vector pipeline caldistance -> chose_dc -> cal_adge -> LS on data
+    (with condensed or square distances)
+    '''
+    info = dict(nodes=len(data), dimension=data.shape[1], condensed=condensed)
+    distance, seconds, peak = measure(caldistance, data, 1, condensed=condensed, repeat=repeat, memory=memory)
+    _record(records, suite, dataset, 'caldistance', seconds, peak, **info)
+    dc, seconds, peak = measure(chose_dc, distance, dc_percent, repeat=repeat, memory=memory)
+    _record(records, suite, dataset, 'chose_dc', seconds, peak, **info)
+    (start, end), seconds, peak = measure(cal_adge, distance, dc, repeat=repeat, memory=memory)
+    _record(records, suite, dataset, 'cal_adge', seconds, peak, edges=len(start), **info)
+    G = nx.from_pandas_edgelist(pd.DataFrame({'from': start, 'to': end}), source='from', target='to')
+    G.add_nodes_from(range(len(data)))
+    _, seconds, peak = measure(local_search_communities, G, seed=seed, repeat=repeat, memory=memory)
+    _record(records, suite, dataset, 'local_search_communities', seconds, peak, edges=len(start), **info)
+
+
+def bench_reduction(records, data, labels, dataset, dimensions=None, methods=None, k=10, suite='reduction', seed=1,
+                    repeat=1):
+    '''
+    Benchmark reduce_dimension -> knn_graph_csr -> LS with as many centers as labels, for
+    every method and target dimension; the record of every (method, dimension) has the
+    time of every step and of the whole, and precision, recall and F1 of cal_auc
+    '''
+    center_num = len(set(labels))
+    methods = methods or list(REDUCTIONS)
+    for method in methods:
+        for dimension in (dimensions or REDUCTION_DIMENSIONS):
+            if dimension is not None and dimension >= data.shape[1]:
+                continue
+            if dimension is None and method != methods[0]:
+                # the original data does not depend on the method
+                continue
+            reduced, reduce_time, _ = measure(reduce_dimension, data, dimension, method, seed, repeat=repeat, memory=False)
+            csr, graph_time, _ = measure(knn_graph_csr, reduced, k, repeat=repeat, memory=False)
+            result, ls_time, _ = measure(local_search_communities, csr, center_num, seed=seed, repeat=repeat,
+                                         memory=False)
+            precision, recall, F1 = cal_auc(result.labels.tolist(), list(labels))
+            stage = 'original' if dimension is None else '%s_%d' % (method, dimension)
+            _record(records, suite, dataset, stage, reduce_time + graph_time + ls_time, None, nodes=len(data),
+                    dimension=reduced.shape[1], method=None if dimension is None else method,
+                    reduce_time=reduce_time, graph_time=graph_time, ls_time=ls_time, edges=csr.number_of_edges(),
+                    precision=precision, recall=recall, F1=F1)
+
+
+def load_vectors(path):
+    '''features of a bundled vector dataset (the label column is dropped)'''
+    if path.endswith('iris.data'):
+        return pd.read_csv(path, header=None).iloc[:, :4].to_numpy(dtype=float)
+    if path.endswith('wine.data'):
+        return pd.read_csv(path, header=None).iloc[:, 1:].to_numpy(dtype=float)
+    return np.loadtxt(path)[:, :2]
+
+
+def load_mnist(directory='data/MNIST/raw', limit=2000):
+    '''first limit images (pixels scaled to [0, 1]) and labels of the MNIST test set'''
+    with gzip.open(os.path.join(directory, 't10k-images-idx3-ubyte.gz')) as f:
+        images = np.frombuffer(f.read(), dtype=np.uint8, offset=16).reshape(-1, 784)
+    labels = np.fromfile(os.path.join(directory, 't10k-labels-idx1-ubyte'), dtype=np.uint8, offset=8)
+    return images[:limit] / 255.0, labels[:limit].astype(int)
+
+
+def _read_pgm(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    # header: P5, width, height, maximum value, then one byte per pixel
+    fields = data.split(maxsplit=4)
+    width, height = int(fields[1]), int(fields[2])
+    return np.frombuffer(data[len(data) - width * height:], dtype=np.uint8)
+
+
+def load_olivetti(directory='data/Olivetti/archive'):
+    '''the 400 faces (pixels scaled to [0, 1]) and the subject of every face'''
+    images, labels = [], []
+    for subject in sorted(os.listdir(directory), key=lambda name: int(name[1:])):
+        for name in sorted(os.listdir(os.path.join(directory, subject)), key=lambda name: int(name.split('.')[0])):
+            images.append(_read_pgm(os.path.join(directory, subject, name)))
+            labels.append(int(subject[1:]))
+    return np.array(images) / 255.0, np.array(labels)
+
+
+def run_benchmarks(suites=('network', 'vector', 'scaling', 'reduction'), networks=None, vectors=None, graph_sizes=None,
+                   vector_sizes=None, reduction_dimensions=None, mnist_size=2000, seed=1, repeat=1, memory=True,
+                   legacy=True):
+    '''
+    Run the benchmark suites
+
+    Input
+    -----
+    suites -- any of 'network', 'vector', 'scaling', 'reduction'
+    networks, vectors -- dataset files (default: NETWORKS and VECTORS that exist)
+    graph_sizes, vector_sizes -- sizes of the synthetic graphs and vector data of the scaling suite
+    reduction_dimensions -- target dimensions of the reduction suite (default: REDUCTION_DIMENSIONS)
+    mnist_size -- number of MNIST images of the reduction suite
+    repeat -- runs per stage, the best time is kept
+    memory -- If true also measure the peak memory of every stage
+    legacy -- If true also time BFS_from_s for every local leader
+
+    Return
+    ------
+    list of records (dicts with suite, dataset, stage, time, peak_memory, nodes, ...)
+    '''
+    records = []
+    if 'network' in suites:
+        for path in [p for p in (networks or NETWORKS) if os.path.exists(p)]:
+            G, seconds, peak = measure(nx.read_gml, path, label='id', memory=memory)
+            G = nx.Graph(G)
+            dataset = os.path.splitext(os.path.basename(path))[0]
+            _record(records, 'network', dataset, 'read_gml', seconds, peak,
+                    nodes=G.number_of_nodes(), edges=G.number_of_edges())
+            # the same network from its binary bundle (built here if needed, then timed)
+            load_bundle(path)
+            _, seconds, peak = measure(load_dataset, path, memory=memory)
+            _record(records, 'network', dataset, 'load_dataset', seconds, peak,
+                    nodes=G.number_of_nodes(), edges=G.number_of_edges())
+            bench_network(records, G, dataset, seed=seed, repeat=repeat, memory=memory, legacy=legacy)
+    if 'vector' in suites:
+        for path in [p for p in (vectors or VECTORS) if os.path.exists(p)]:
+            bench_vector(records, load_vectors(path), os.path.splitext(os.path.basename(path))[0],
+                         seed=seed, repeat=repeat, memory=memory)
+    if 'scaling' in suites:
+        for n in (graph_sizes or GRAPH_SIZES):
+            G = nx.barabasi_albert_graph(n, 3, seed=seed)
+            bench_network(records, G, 'ba_%d' % n, suite='scaling', seed=seed, repeat=repeat, memory=memory,
+                          legacy=legacy)
+        rng = np.random.default_rng(seed)
+        for n in (vector_sizes or VECTOR_SIZES):
+            centers = rng.uniform(0, 10, size=(5, 2))
+            data = centers[rng.integers(0, 5, size=n)] + rng.normal(scale=0.5, size=(n, 2))
+            bench_vector(records, data, 'blobs_%d' % n, suite='scaling', seed=seed, repeat=repeat, memory=memory)
+    if 'reduction' in suites:
+        if os.path.exists('data/MNIST/raw'):
+            data, labels = load_mnist(limit=mnist_size)
+            bench_reduction(records, data, labels, 'mnist_%d' % len(data), reduction_dimensions, seed=seed,
+                            repeat=repeat)
+        if os.path.exists('data/Olivetti/archive'):
+            data, labels = load_olivetti()
+            bench_reduction(records, data, labels, 'olivetti', reduction_dimensions, seed=seed, repeat=repeat)
+    return records
+
+
+def save_baseline(records, path):
+    '''save records with a description of the machine as a JSON baseline'''
+    baseline = dict(created=time.strftime('%Y-%m-%d %H:%M:%S'), python=platform.python_version(),
+                    platform=platform.platform(), numpy=np.__version__, networkx=nx.__version__,
+                    records=records)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=1)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['records']
+
+
+def compare_baseline(records, baseline, tolerance=1.5, min_time=0.01):
+    '''
+    Stages slower (or using more memory) than tolerance times their baseline
+
+    Input
+    -----
+    records, baseline -- lists of records (see run_benchmarks, load_baseline)
+    tolerance -- allowed ratio to the baseline
+    min_time -- stages faster than this (seconds) in both runs are ignored, as too noisy
+
+    Return
+    ------
+    list of (suite, dataset, stage, measure, baseline value, new value)
+    '''
+    old = {(r['suite'], r['dataset'], r['stage']): r for r in baseline}
+    regressions = []
+    for r in records:
+        key = (r['suite'], r['dataset'], r['stage'])
+        if key not in old:
+            continue
+        for measure_name in ('time', 'peak_memory'):
+            before, after = old[key].get(measure_name), r.get(measure_name)
+            if before is None or after is None:
+                continue
+            if measure_name == 'time' and max(before, after) < min_time:
+                continue
+            if after > tolerance * before:
+                regressions.append(key + (measure_name, before, after))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the LS algorithm')
+    parser.add_argument('--suites', nargs='+', default=['network', 'vector', 'scaling', 'reduction'],
+                        choices=['network', 'vector', 'scaling', 'reduction'])
+    parser.add_argument('--quick', action='store_true', help='small datasets and sizes only')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--save', help='save the records as a JSON baseline')
+    parser.add_argument('--compare', help='compare with a JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    options = {}
+    if args.quick:
+        options = dict(networks=NETWORKS[:2] + NETWORKS[-2:], vectors=VECTORS[:3],
+                       graph_sizes=GRAPH_SIZES[:3], vector_sizes=VECTOR_SIZES[:2], mnist_size=500)
+    records = run_benchmarks(args.suites, repeat=args.repeat, memory=not args.no_memory, **options)
+    for r in records:
+        if r['time'] is not None:
+            peak = '' if r['peak_memory'] is None else '%10.1f MB' % (r['peak_memory'] / 2 ** 20)
+            if 'F1' in r:
+                peak = 'dimension %5d F1 %.3f' % (r['dimension'], r['F1'])
+            print('%-8s %-40s %-34s %9.4f s %s' % (r['suite'], r['dataset'], r['stage'], r['time'], peak))
+    if args.save:
+        save_baseline(records, args.save)
+    if args.compare:
+        regressions = compare_baseline(records, load_baseline(args.compare), args.tolerance)
+        for suite, dataset, stage, measure_name, before, after in regressions:
+            print('REGRESSION %s %s %s %s: %.4g -> %.4g' % (suite, dataset, stage, measure_name, before, after))
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent on-disk cache of the vector pipeline: distances, thresholds, epsilon-ball
+networks and percolation curves.
+
+Entries are content-addressed: the key is a hash of the data (dtype, shape and bytes),
+of the kind of entry and of its parameters, so a changed data file or parameter simply
+misses. Distances are stored as .npy files and loaded memory-mapped (no copy), the other
+entries as uncompressed .npz or .npy files. Every hit refreshes the modification time of
+the file, and after every store the least recently used files are removed until the
+cache fits into max_bytes.
+
+    cache = Cache('.ls_cache')
+    distance = cached_distances(X, 1, cache)        # condensed, as caldistance(X, 1, condensed=True)
+    start, end = cached_edges(X, 1, 6, cache)       # as cal_adge(distance, chose_dc(distance, 6))
+
+With cache=None the cached_* functions compute the same values without reading or writing files.
+"""
+
+
+import os
+import json
+import hashlib
+import numpy as np
+from LS_csr_engine import CSRGraph
+from LS_distance import condensed_distances
+from LS_vector_graph import edges_to_csr
+from LS_percolation import percolation_sweep, jump_point
+from LS_cluster_function import chose_dc_gradual, cal_adge
+
+DEFAULT_DIRECTORY = '.ls_cache'
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def data_hash(X):
+    '''hex digest of the dtype, shape and bytes of an array'''
+    X = np.ascontiguousarray(X)
+    digest = hashlib.sha1()
+    digest.update(('%s %s' % (X.dtype.str, X.shape)).encode())
+    digest.update(memoryview(X).cast('B'))
+    return digest.hexdigest()
+
+
+def cache_key(kind, digest, **params):
+    '''key of an entry: kind, data digest and a hash of the parameters'''
+    text = json.dumps(params, sort_keys=True, default=str)
+    return '%s-%s-%s' % (kind, digest[:20], hashlib.sha1(text.encode()).hexdigest()[:12])
+
+
+class Cache(object):
+    '''
+    Directory of cached arrays with size-bounded LRU eviction
+
+    directory -- where the files are kept (created if needed)
+    max_bytes -- total size of the files kept after every store
+    '''
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, suffix='.npy'):
+        return os.path.join(self.directory, key + suffix)
+
+    def _hit(self, path):
+        if not os.path.exists(path):
+            return False
+        os.utime(path)
+        return True
+
+    def _temporary(self, key, suffix):
+        return self.path('%s.tmp%d' % (key, os.getpid()), suffix)
+
+    def get_array(self, key, mmap_mode='r'):
+        '''the .npy entry of key (memory-mapped by default), or None'''
+        path = self.path(key)
+        if not self._hit(path):
+            return None
+        return np.load(path, mmap_mode=mmap_mode)
+
+    def put_array(self, key, array):
+        temporary = self._temporary(key, '.npy')
+        np.save(temporary, np.asarray(array))
+        return self._commit(temporary, self.path(key))
+
+    def create_array(self, key, fill):
+        '''
+        Store the array written by fill(filename) into a new .npy file, and return it memory-mapped
+        '''
+        temporary = self._temporary(key, '.npy')
+        array = fill(temporary)
+        if isinstance(array, np.memmap):
+            array.flush()
+        del array
+        self._commit(temporary, self.path(key))
+        return np.load(self.path(key), mmap_mode='r')
+
+    def get_arrays(self, key):
+        '''the .npz entry of key as a dict of arrays, or None'''
+        path = self.path(key, '.npz')
+        if not self._hit(path):
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def put_arrays(self, key, **arrays):
+        temporary = self._temporary(key, '.npz')
+        np.savez(temporary, **arrays)
+        return self._commit(temporary, self.path(key, '.npz'))
+
+    def _commit(self, temporary, path):
+        # readers never see a half-written file
+        os.replace(temporary, path)
+        self.evict(keep=path)
+        return path
+
+    def entries(self):
+        '''(modification time, size, path) of every file, least recently used first'''
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if '.tmp' in name or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        '''remove the least recently used files (but keep) until the cache fits into max_bytes'''
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # still memory-mapped (Windows) or removed by another process
+                pass
+
+    def clear(self):
+        self.max_bytes, max_bytes = 0, self.max_bytes
+        try:
+            self.evict()
+        finally:
+            self.max_bytes = max_bytes
+
+
+class _NoCache(object):
+    '''stand-in for cache=None: every lookup misses and nothing is stored'''
+
+    def get_array(self, key, mmap_mode='r'):
+        return None
+
+    def get_arrays(self, key):
+        return None
+
+    def put_array(self, key, array):
+        return None
+
+    def put_arrays(self, key, **arrays):
+        return None
+
+    def create_array(self, key, fill):
+        return fill(None)
+
+
+def _cache(cache):
+    return _NoCache() if cache is None else cache
+
+
+def _metric(order):
+    # the metric of caldistance
+    return 'euclidean' if order == 0 else 'chebyshev'
+
+
+def cached_distances(X, order, cache=None, digest=None):
+    '''
+    caldistance(X, order, condensed=True), memory-mapped from the cache
+    '''
+    cache = _cache(cache)
+    X = np.asarray(X, dtype=np.float64)
+    key = cache_key('distance', digest or data_hash(X), metric=_metric(order))
+    distance = cache.get_array(key)
+    if distance is None:
+        distance = cache.create_array(key, lambda filename: condensed_distances(X, _metric(order), filename=filename))
+    return distance
+
+
+def cached_thresholds(X, order, cache=None, digest=None):
+    '''chose_dc_gradual(caldistance(X, order)) as an array'''
+    cache = _cache(cache)
+    digest = digest or data_hash(np.asarray(X, dtype=np.float64))
+    key = cache_key('thresholds', digest, metric=_metric(order))
+    thresholds = cache.get_array(key, mmap_mode=None)
+    if thresholds is None:
+        thresholds = np.array(chose_dc_gradual(cached_distances(X, order, cache, digest)), dtype=np.float64)
+        cache.put_array(key, thresholds)
+    return thresholds
+
+
+def cached_edges(X, order, dc_percent, cache=None, digest=None):
+    '''
+    cal_adge(distance, chose_dc(distance, dc_percent)) for distance = caldistance(X, order)
+
+    Return
+    ------
+    start, end -- int arrays
+    '''
+    cache = _cache(cache)
+    digest = digest or data_hash(np.asarray(X, dtype=np.float64))
+    key = cache_key('edges', digest, metric=_metric(order), dc_percent=dc_percent)
+    edges = cache.get_arrays(key)
+    if edges is None:
+        dc = cached_thresholds(X, order, cache, digest)[dc_percent]
+        start, end = cal_adge(cached_distances(X, order, cache, digest), dc)
+        edges = dict(start=np.array(start, dtype=np.int64), end=np.array(end, dtype=np.int64))
+        cache.put_arrays(key, **edges)
+    return edges['start'], edges['end']
+
+
+def cached_graph_csr(X, order, dc_percent, cache=None, digest=None):
+    '''
+    CSRGraph of the epsilon-ball network of the pipeline (see LS_vector_graph.edges_to_csr)
+    '''
+    cache = _cache(cache)
+    digest = digest or data_hash(np.asarray(X, dtype=np.float64))
+    key = cache_key('csr', digest, metric=_metric(order), dc_percent=dc_percent)
+    arrays = cache.get_arrays(key)
+    if arrays is None:
+        start, end = cached_edges(X, order, dc_percent, cache, digest)
+        csr = edges_to_csr(start, end, len(X))
+        cache.put_arrays(key, nodes=csr.nodes, indptr=csr.indptr, indices=csr.indices)
+        return csr
+    return CSRGraph(arrays['nodes'], arrays['indptr'], arrays['indices'])
+
+
+def cached_percolation(X, cache=None, digest=None):
+    '''
+    percolation_sweep of the Euclidean distances of X, as used by cal_jumppoint
+
+    Return
+    ------
+    thresholds, gcc, sgcc, jump
+    '''
+    cache = _cache(cache)
+    digest = digest or data_hash(np.asarray(X, dtype=np.float64))
+    key = cache_key('percolation', digest, metric='euclidean')
+    curves = cache.get_arrays(key)
+    if curves is None:
+        thresholds = cached_thresholds(X, 0, cache, digest)
+        _, gcc, sgcc, _ = percolation_sweep(cached_distances(X, 0, cache, digest), thresholds=thresholds)
+        curves = dict(thresholds=thresholds, gcc=gcc, sgcc=sgcc)
+        cache.put_arrays(key, **curves)
+    return curves['thresholds'], curves['gcc'], curves['sgcc'], jump_point(curves['sgcc'])
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Command line interface of the Local Search (LS) algorithm for large graphs.
+
+    python LS_cli.py graph.txt --seed 1 --center-num default 10 auto > labels.tsv
+    python LS_cli.py data/network_with_true_community_labels/pubmed.gml --center-num auto | sort -k2 | ...
+
+The graph is an edge list (read in chunks by read_edgelist_csr), a GML file or bundle .npz
+(see LS_datasets.py), or a directory of CSR arrays written by read_edgelist_csr; LS runs
+on the CSR arrays (a GML file is parsed by networkx only once, into its bundle). The leader hierarchy is computed once per seed (seeds run on
+a process pool with --workers) and resolved for every center_num. For every (seed,
+center_num) a comment line '# seed=... center_num=... centers=... leaders=...' is written,
+then one line 'node<TAB>community center' per node (-1 for none), in chunks as soon as
+the partition is resolved, without building the partition dict. Summaries and the
+--profile statistics go to stderr, so stdout can be piped.
+"""
+
+
+import os
+import sys
+import logging
+import argparse
+from time import perf_counter
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from LS_csr_engine import CSRGraph, traced_peak
+from LS_algorithm import local_leader_hierarchy, select_centers, center_token
+from LS_graph_io import read_edgelist_csr, load_csr
+from LS_datasets import load_dataset, load_npz, bundle_csr
+
+logger = logging.getLogger(__name__)
+
+# graph shared by the worker processes, set once per worker by _init_worker
+_shared = {}
+
+
+def read_graph(path, format='auto', delimiter=None, comments='#', nodetype=int, chunk_size=1 << 20,
+               directory=None):
+    '''
+    CSRGraph of a graph file
+
+    Input
+    -----
+    path -- the file (or directory for format 'csr')
+    format -- 'edgelist', 'gml', 'npz' (bundle), 'csr' (directory of read_edgelist_csr), or
+              'auto': 'csr' for a directory, else by the extension (edge list for any other)
+    delimiter, comments, nodetype, chunk_size, directory -- see read_edgelist_csr
+    '''
+    if format == 'auto':
+        if os.path.isdir(path):
+            format = 'csr'
+        else:
+            format = os.path.splitext(path)[1][1:] if path.endswith(('.gml', '.npz')) else 'edgelist'
+    if format == 'csr':
+        return load_csr(path)
+    if format == 'edgelist':
+        return read_edgelist_csr(path, delimiter=delimiter, comments=comments, nodetype=nodetype,
+                                 chunk_size=chunk_size, directory=directory)
+    if format == 'gml':
+        return load_dataset(path)[0]
+    return bundle_csr(load_npz(path))
+
+
+def _init_worker(nodes, indptr, indices, selfloop, options):
+    _shared['csr'] = CSRGraph(nodes, indptr, indices, selfloop)
+    _shared['options'] = options
+
+
+def iter_partitions(csr, seed, center_nums, maximum_tree=True, self_loop=False, profile=False, trace_memory=False):
+    '''
+    Yield (center_num, LSResult, stats) for every center_num ('default', 'auto' or a number),
+    computing the leader hierarchy of the seed once; stats is the dict of profile_communities
+    (the hierarchy stages, and 'roots' of this center_num) if profile, else None. With
+    trace_memory the peak memory of the hierarchy is measured in a separate, untimed run.
+    '''
+    stats = {} if profile else None
+    tic = perf_counter()
+    hierarchy = local_leader_hierarchy(csr, maximum_tree=maximum_tree, seed=seed, self_loop=self_loop, stats=stats)
+    if profile:
+        stats['time']['hierarchy'] = perf_counter() - tic
+        if trace_memory:
+            stats['peak_memory'] = traced_peak(local_leader_hierarchy, csr, maximum_tree=maximum_tree, seed=seed,
+                                               self_loop=self_loop)
+    for center_num in center_nums:
+        if profile:
+            # the time of this center_num only
+            stats['time'].pop('roots', None)
+        if center_num == 'auto':
+            result = select_centers(hierarchy, auto_choose_centers=True, stats=stats)
+        else:
+            result = select_centers(hierarchy, None if center_num == 'default' else int(center_num), stats=stats)
+        # a copy, so that every center_num keeps its own 'roots' time
+        yield center_num, result, None if stats is None else dict(stats, time=dict(stats['time']))
+
+
+def _run_seed(seed):
+    runs = []
+    for center_num, result, stats in iter_partitions(_shared['csr'], seed, **_shared['options']):
+        runs.append((center_num, len(result.leaders), result.centers, result.labels, stats))
+    return seed, runs
+
+
+def write_labels(stream, nodes, labels, chunk_size=1 << 16):
+    '''
+    Write 'node<TAB>community center' lines (-1 for none) in chunks of chunk_size nodes
+
+    Input
+    -----
+    nodes -- the original node id of every index
+    labels -- index of the community center of every node, -1 for none (LSResult.labels)
+    '''
+    nodes = np.asarray(nodes)
+    for start in range(0, len(labels), chunk_size):
+        label = np.asarray(labels[start:start + chunk_size])
+        center = nodes[np.maximum(label, 0)].tolist()
+        # node ids are written as they are (integers or strings)
+        stream.write(''.join('%s\t%s\n' % (v, c if k >= 0 else -1)
+                             for v, c, k in zip(nodes[start:start + chunk_size].tolist(), center, label.tolist())))
+
+
+def _report(seed, center_num, leaders, centers, stats):
+    logger.info('seed %s center_num %s: %d local leaders, %d centers', seed, center_num, leaders, centers)
+    if stats is not None:
+        times = ', '.join('%s %.4f s' % item for item in stats['time'].items())
+        logger.info('  time: %s', times)
+        logger.info('  ties %s, max_depth %s, visited %d, field_visited %s', stats.get('ties'),
+                    stats.get('max_depth'), int(np.sum(stats.get('visited', 0))), stats.get('field_visited'))
+        if 'peak_memory' in stats:
+            logger.info('  peak memory %.1f MB', stats['peak_memory'] / 2 ** 20)
+
+
+def run(csr, stream, seeds=(1,), center_nums=('default',), workers=1, maximum_tree=True, self_loop=False,
+        profile=False, trace_memory=False, chunk_size=1 << 16):
+    '''
+    Run LS on csr for every seed and center_num and write the labels to stream
+
+    Seeds run one after the other in this process (every partition is written as soon as
+    it is resolved), or on a pool of workers processes when there are several seeds.
+    '''
+    center_nums = list(dict.fromkeys(center_token(c) for c in center_nums))
+    seeds = list(seeds)
+    nodes = np.asarray(csr.nodes)
+
+    def emit(seed, center_num, leaders, centers, labels, stats):
+        stream.write('# seed=%s center_num=%s centers=%d leaders=%d\n' % (seed, center_num, len(centers), leaders))
+        write_labels(stream, nodes, labels, chunk_size)
+        stream.flush()
+        _report(seed, center_num, leaders, len(centers), stats)
+
+    workers = min(workers or 1, len(seeds))
+    if workers <= 1:
+        for seed in seeds:
+            for center_num, result, stats in iter_partitions(csr, seed, center_nums, maximum_tree, self_loop, profile,
+                                                             trace_memory):
+                emit(seed, center_num, len(result.leaders), result.centers, result.labels, stats)
+        return
+    options = dict(center_nums=center_nums, maximum_tree=maximum_tree, self_loop=self_loop, profile=profile,
+                   trace_memory=trace_memory)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(csr.nodes, csr.indptr, csr.indices, csr.selfloop, options)) as pool:
+        # in the order of the seeds, each as soon as it and the seeds before it are done
+        for seed, runs in pool.map(_run_seed, seeds):
+            for center_num, leaders, centers, labels, stats in runs:
+                emit(seed, center_num, leaders, centers, labels, stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local Search (LS) communities of a graph; '
+                                                 'writes "node<TAB>community center" lines')
+    parser.add_argument('graph', help='edge list, GML file, bundle .npz or directory of CSR arrays')
+    parser.add_argument('--format', default='auto', choices=['auto', 'edgelist', 'gml', 'npz', 'csr'])
+    parser.add_argument('--delimiter', default=None, help='edge list column separator (default: whitespace)')
+    parser.add_argument('--comments', default='#', help='edge list comment character')
+    parser.add_argument('--nodetype', default='int', choices=['int', 'str'], help='type of the edge list node ids')
+    parser.add_argument('--csr-dir', default=None,
+                        help='keep the CSR arrays of an edge list as memory-mapped .npy files in this '
+                             'directory (read them back with --format csr)')
+    parser.add_argument('--seed', nargs='+', type=int, default=[1], help='one or more seeds')
+    parser.add_argument('--center-num', nargs='+', default=['default'],
+                        help="one or more numbers of centers, 'default' (all local leaders) or 'auto' (choose_center)")
+    parser.add_argument('--no-maximum-tree', action='store_true', help='use the full degree DAG (deprecated)')
+    parser.add_argument('--self-loop', action='store_true', help='self-loops add to the influence of a node')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes for several seeds')
+    parser.add_argument('--profile', action='store_true',
+                        help='log stage times and counters (see profile_communities) to stderr')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='with --profile, also the peak memory (tracemalloc, in a separate run)')
+    parser.add_argument('--output', '-o', default='-', help='output file (default: stdout)')
+    parser.add_argument('--chunk-size', type=int, default=1 << 16, help='nodes written at once')
+    parser.add_argument('--quiet', '-q', action='store_true', help='no summary on stderr')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format='%(message)s',
+                        stream=sys.stderr)
+    for center_num in args.center_num:
+        if center_num not in ('default', 'auto') and not center_num.isdigit():
+            parser.error("--center-num takes numbers, 'default' or 'auto', not %r" % center_num)
+
+    tic = perf_counter()
+    csr = read_graph(args.graph, args.format, args.delimiter, args.comments, dict(int=int, str=str)[args.nodetype],
+                     directory=args.csr_dir)
+    logger.info('%s: %d nodes, %d edges, loaded in %.3f s', args.graph, csr.number_of_nodes(),
+                csr.number_of_edges(), perf_counter() - tic)
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        run(csr, stream, seeds=args.seed, center_nums=args.center_num, workers=args.workers,
+            maximum_tree=not args.no_maximum_tree, self_loop=args.self_loop, profile=args.profile,
+            trace_memory=args.trace_memory,
+            chunk_size=args.chunk_size)
+    except BrokenPipeError:
+        # the reader stopped early (e.g. | head): silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,6 +18,8 @@ import colorsys
 from collections import Counter
 from scipy.special import comb, perm
 from datetime import datetime
+from LS_distance import pairwise_distances, condensed_distances, distance_range, pairs_within
+from LS_percolation import percolation_sweep
 
 plt.rcParams['font.sans-serif'] = ['Times New Roman']
 plt.rcParams['font.family'] = ['Times New Roman']
@@ -97,50 +99,28 @@ def plot_louvian_fig(x,y,labels,filepath='./',dataname='LS_default',save=False):
     
 
 # 计算任意两点之间的切比雪夫距离,并存储为矩阵
-def caldistance(v,order):
+def caldistance(v,order,condensed=False,filename=None,reduction=None):
 #     man = np.linalg.norm(vector1-vector2,ord=1)  # Manhattan
 #     euc = np.linalg.norm(vector1-vector2)  # Euclidian
 #     che = np.linalg.norm(vector1-vector2,ord=np.inf)  # Chebyshev
 #     cos = np.dot(vector1,vector2)/(np.linalg.norm(vector1)*(np.linalg.norm(vector2))) # Cosine Similarity
-    distance = np.zeros(shape=(len(v), len(v)))
-    for i in range(len(v)):
-        for j in range(len(v)):
-            if i > j:
-                distance[i][j] = distance[j][i]
-            elif i < j:
-                if order == 0:
-                    distance[i][j] = np.linalg.norm(v[i]-v[j])
-                else:
-                    distance[i][j] = np.linalg.norm(v[i]-v[j],ord=np.inf)
-    return distance
+    # order 0: Euclidean, otherwise Chebyshev; computed by tiles in LS_distance.py (see pairwise_distances for other metrics and float32)
+    # condensed=True returns only the n(n-1)/2 distances of the pairs i < j (memory-mapped to filename if given), which chose_dc, chose_dc_gradual and cal_adge accept as well
+    # reduction: optional preprocessing of the vectors, e.g. reducer('pca', 50) of LS_reduction.py
+    metric = 'euclidean' if order == 0 else 'chebyshev'
+    if reduction is not None:
+        v = reduction(v)
+    if condensed:
+        return condensed_distances(np.asarray(v, dtype=np.float64), metric, filename=filename)
+    return pairwise_distances(np.asarray(v, dtype=np.float64), metric)
 
 # 选择合适的阈值
+# dis: square distance matrix or condensed distances (see caldistance); min and max are streamed over the pairs i < j
 def chose_dc(dis, t):
-    temp = []
-    for i in range(len(dis[0])):
-        for j in range(i + 1, len(dis[0])):
-            temp.append(dis[i][j])
-    #  升序排列
-    temp.sort()
-    arr_min = np.min(temp)
-    arr_max = np.max(temp)
-    unit = (arr_max - arr_min) / 99
-    dc_list = []
-    for i in range(100):
-        temp1 = arr_min + unit * i
-        dc_list.append(temp1)# 2.4861762041092385e-08
-    dc = dc_list[t]
-    return dc
+    return chose_dc_gradual(dis)[t]
 
 def chose_dc_gradual(dis):
-    temp = []
-    for i in range(len(dis[0])):
-        for j in range(i + 1, len(dis[0])):
-            temp.append(dis[i][j])
-    #  升序排列
-    temp.sort()
-    arr_min = np.min(temp)
-    arr_max = np.max(temp)
+    arr_min, arr_max = distance_range(dis)
     unit = (arr_max - arr_min) / 99
     dc = []
     for i in range(100):
@@ -150,14 +130,8 @@ def chose_dc_gradual(dis):
 
 #  计算网络连边
 def cal_adge(dis, dc):
-    start = []
-    end = []
-    for i in range(len(dis[0])):
-        for j in range(i + 1, len(dis[0])):
-            if dis[i][j] <= dc:
-                start.append(i)
-                end.append(j)
-    return start,end
+    start, end = pairs_within(dis, dc)
+    return start.tolist(),end.tolist()
 
 def plot_connect(arr1,arr2,t,filepath='./',dataname='LS_default',save=False):
     # plot 
@@ -191,47 +165,21 @@ def plot_connect(arr1,arr2,t,filepath='./',dataname='LS_default',save=False):
         plt.savefig(filename, bbox_inches='tight',dpi=300)
     plt.show()
     
-def cal_jumppoint(input_x,t,dataname):
-    norm_data = input_x
-    distance = caldistance(norm_data,0)  # 制作任意两点之间的距离矩阵
-    nodes = [i for i in range(len(input_x))]
-    gnode = len(input_x)
-    dc_list = []
-    dc_list = chose_dc_gradual(distance)
-    Gc_list = []
-    subGc_list = []
-    edge_proportion = []
-    sub_edge_proportion = []
-    for dc in dc_list:
-        start, end = cal_adge(distance, dc)  # 统计每点的密度
-        df = pd.DataFrame({ 'from':start, 'to':end})
-        G = nx.from_pandas_edgelist(df, source = 'from', target = 'to')
-        G.add_nodes_from(nodes)
-        
-        # 获得第2大连通子图
-        count = 0
-        connected = list(nx.connected_components(G))
-        subgraphs = [G.subgraph(i) for i in connected]
-        G_all = sorted(subgraphs,key=len, reverse = True)
-        if len(G_all) > 1:
-            for i in  G_all:
-                if count == 1:
-                    subGc = i
-                    sub_connectivity = subGc.number_of_edges() / comb(gnode,2)
-                    subGc_list.append(subGc.number_of_nodes()/ gnode)
-                    sub_edge_proportion.append(sub_connectivity)
-                count += 1
-        else:
-            subGc_list.append(0)
-            sub_edge_proportion.append(0)
-            
-        # 获得最大连通子图
-        Gc = max(subgraphs, key=len)
-        connectivity = Gc.number_of_edges() / comb(gnode,2)
-        Gc_list.append(Gc.number_of_nodes() / gnode)
-        edge_proportion.append(connectivity)
-    print('Determine jumppoint :',np.array(subGc_list)[:50])
-    plot_connect(np.array(subGc_list),np.array(Gc_list),t,filepath='./',dataname=dataname,save=False)
+def cal_jumppoint(input_x,t=None,dataname='LS_default',cache=None):
+    # GCC/SGCC of the epsilon-ball network at every threshold of chose_dc_gradual, in one
+    # union-find sweep over the minimum spanning tree (LS_percolation.py)
+    # cache: an LS_cache.Cache, to reuse the distances and curves of earlier runs on the same data
+    if cache is not None:
+        from LS_cache import cached_percolation
+        dc_list, Gc_list, subGc_list, jump = cached_percolation(input_x, cache)
+    else:
+        distance = caldistance(input_x,0,condensed=True)  # 制作任意两点之间的距离矩阵
+        dc_list, Gc_list, subGc_list, jump = percolation_sweep(distance)
+    if t is None:
+        t = jump
+    print('Determine jumppoint :',subGc_list[:50])
+    plot_connect(subGc_list,Gc_list,t,filepath='./',dataname=dataname,save=False)
+    return t
     
 def plot_predict_olivetti_img(imgs,targets,predict,filepath='./',dataname='LS_default',save=False):
     cmap = plt.get_cmap('rainbow')
@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""
+Array-backed (CSR) engine for the Local Search (LS) algorithm.
+
+The functions here mirror max_degree_hierarchy_dag and degree_hierarchy_random_tree
+in LS_algorithm.py, but work on integer-indexed compressed sparse row (CSR) arrays
+instead of networkx graphs with per-node dict attributes. Node i of the CSR
+structure is the i-th node of G.nodes, and the neighbours of node i are kept in the
+order of G.adj, so that the DAG, the forest and the seeded tie-breaking are
+exactly those of the networkx implementation.
+"""
+
+
+import random
+import tracemalloc
+from collections import deque
+from time import perf_counter
+import numpy as np
+
+
+class CSRGraph(object):
+    '''
+    Integer-indexed simple undirected graph in CSR form.
+
+    nodes -- the original node id of every index (list or array)
+    indptr, indices -- the neighbours of node i are indices[indptr[i]:indptr[i+1]]
+    degree -- degree of every node (self-loops excluded)
+    selfloop -- boolean mask of nodes which carried a self-loop in the input
+    '''
+    __slots__ = ('nodes', 'indptr', 'indices', 'degree', 'selfloop')
+
+    def __init__(self, nodes, indptr, indices, selfloop=None):
+        self.nodes = nodes
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=_index_dtype(len(self.indptr) - 1))
+        self.degree = np.diff(self.indptr)
+        if selfloop is None:
+            selfloop = np.zeros(len(self.degree), dtype=bool)
+        self.selfloop = np.asarray(selfloop, dtype=bool)
+
+    @classmethod
+    def from_networkx(cls, G):
+        '''
+        Convert a networkx graph; node order and neighbour order follow G.nodes and G.adj
+        '''
+        nodes = list(G.nodes)
+        index = {v: i for i, v in enumerate(nodes)}
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indices = []
+        selfloop = np.zeros(len(nodes), dtype=bool)
+        for i, v in enumerate(nodes):
+            for nn in G.adj[v]:
+                if nn == v:
+                    selfloop[i] = True
+                else:
+                    indices.append(index[nn])
+            indptr[i + 1] = len(indices)
+        return cls(nodes, indptr, indices, selfloop)
+
+    def to_networkx(self):
+        '''
+        networkx graph whose G.nodes and G.adj are in the order of this graph, so that
+        CSRGraph.from_networkx gives it back (self-loops are added after the other neighbours)
+        '''
+        import networkx as nx
+        G = nx.Graph()
+        G.add_nodes_from(self.nodes.tolist() if isinstance(self.nodes, np.ndarray) else self.nodes)
+        nodes = list(G.nodes)
+        G.add_edges_from((nodes[u], nodes[v]) for u, v in insertion_order(self.indptr, self.indices))
+        G.add_edges_from((nodes[u], nodes[u]) for u in np.flatnonzero(self.selfloop).tolist())
+        return G
+
+    def number_of_nodes(self):
+        return len(self.degree)
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+
+def lap_time(stats, stage, tic):
+    '''
+    Add the time since tic to stats['time'][stage] (if stats is a dict) and return perf_counter()
+    '''
+    toc = perf_counter()
+    if stats is not None:
+        times = stats.setdefault('time', {})
+        times[stage] = times.get(stage, 0.0) + toc - tic
+    return toc
+
+
+def traced_peak(function, *args, **kwargs):
+    '''
+    Peak memory in bytes allocated by Python and numpy (tracemalloc) during function(*args, **kwargs);
+    meant for a separate run, since tracing slows down the traced code
+    '''
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    else:
+        tracemalloc.start()
+        base = 0
+    try:
+        function(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def _index_dtype(n):
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+
+def edge_sources(indptr):
+    '''
+    Row index of every entry of a CSR indices array
+    '''
+    n = len(indptr) - 1
+    return np.repeat(np.arange(n, dtype=_index_dtype(n)), np.diff(indptr))
+
+
+def insertion_order(indptr, indices):
+    '''
+    Order of the edges (u, v) such that adding them one by one to a networkx graph puts the
+    neighbours of every node in the order of indices (edges are added to both adjacency
+    lists, so an edge must wait until it is next in the lists of both ends)
+
+    Return
+    ------
+    list of (u, v) pairs, every edge once
+    '''
+    n = len(indptr) - 1
+    src = edge_sources(indptr).astype(np.int64)
+    dst = np.asarray(indices, dtype=np.int64)
+    # the slot v->u of every slot u->v
+    twin = np.empty(len(dst), dtype=np.int64)
+    twin[np.lexsort((dst, src))] = np.lexsort((src, dst))
+    # every edge is its slot with u < v; it waits for the previous slot in each of its two lists
+    first = np.zeros(len(dst), dtype=bool)
+    first[np.asarray(indptr[:-1])[np.diff(indptr) > 0]] = True
+    edge = np.where(src < dst, np.arange(len(dst)), twin).tolist()
+    waiting = (~first).astype(np.int64) + (~first[twin])
+    ready = deque(np.flatnonzero((src < dst) & (waiting == 0)).tolist())
+    waiting = waiting.tolist()
+    twin = twin.tolist()
+    end = np.asarray(indptr[1:])[src].tolist()
+    src, dst = src.tolist(), dst.tolist()
+    order = []
+    while ready:
+        slot = ready.popleft()
+        order.append((src[slot], dst[slot]))
+        for x in (slot, twin[slot]):
+            if x + 1 < end[x]:
+                e = edge[x + 1]
+                waiting[e] -= 1
+                if waiting[e] == 0:
+                    ready.append(e)
+    if len(order) != len(dst) // 2:
+        raise ValueError('the adjacency lists are not symmetric or have no consistent insertion order')
+    return order
+
+
+def degree_hierarchy_dag_csr(indptr, indices, degree, maximum_tree=True, selfloop=None):
+    '''
+    Create the maximum degree hierarchy DAG (Fig.1b in the maintext of our paper) on CSR arrays.
+
+    Same rule as max_degree_hierarchy_dag: node v points to all neighbours whose degree
+    equals the largest neighbour degree knnmax, provided knnmax >= degree of v. When two
+    nodes of equal degree would point to each other, only the edge from the node that
+    comes first in the node order is kept.
+    If maximum_tree is False, the (deprecated) full degree DAG is built instead.
+
+    Input
+    -----
+    indptr, indices -- CSR adjacency of a simple undirected graph
+    degree -- degree of every node
+    selfloop -- boolean mask of nodes whose self-loop adds influence (degree), or None
+
+    Return
+    ------
+    src, dst -- int arrays of DAG edges src->dst (pointing towards the tree root),
+                in the order max_degree_hierarchy_dag adds them to D
+    '''
+    n = len(degree)
+    degree = np.asarray(degree, dtype=np.int64)
+    boosted = degree if selfloop is None else degree + np.asarray(selfloop, dtype=np.int64)
+    src = edge_sources(indptr)
+    dst = np.asarray(indices)
+    if maximum_tree:
+        knnmax = np.full(n, -1, dtype=np.int64)
+        nonempty = np.flatnonzero(degree > 0)
+        if len(nonempty) > 0:
+            knnmax[nonempty] = np.maximum.reduceat(boosted[dst], indptr[:-1][nonempty])
+        cand = (degree[dst] == knnmax[src]) & (knnmax[src] >= degree[src])
+    else:
+        cand = degree[dst] > boosted[src]
+    src = src[cand]
+    dst = dst[cand]
+
+    # both v->nn and nn->v are candidates only between nodes of equal degree;
+    # the edge added first (by the node earlier in the order) wins
+    equal = np.flatnonzero(degree[src] == degree[dst])
+    if len(equal) > 0:
+        key = src[equal].astype(np.int64) * n + dst[equal]
+        reverse = dst[equal].astype(np.int64) * n + src[equal]
+        drop = np.isin(reverse, key) & (dst[equal] < src[equal])
+        keep = np.ones(len(src), dtype=bool)
+        keep[equal[drop]] = False
+        src = src[keep]
+        dst = dst[keep]
+    return src, dst
+
+
+def dag_predecessors(n, src, dst):
+    '''
+    CSR of DAG predecessors; predecessors of each node are listed in the order
+    D.predecessors() yields them for the networkx DAG built from the same edge order
+    '''
+    order = np.argsort(dst, kind='stable')
+    pred_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(dst, minlength=n), out=pred_indptr[1:])
+    return pred_indptr, src[order]
+
+
+def degree_hierarchy_random_tree_csr(indptr, indices, degree, maximum_tree=True, random_seed=None, selfloop=None,
+                                    stats=None):
+    '''
+    Create a degree hierarchy tree (short-dashed-arrows in Fig.1c of our paper) on CSR arrays.
+
+    This is the array version of degree_hierarchy_random_tree: the BFS from all local
+    leaders visits nodes, breaks ties and draws random numbers in exactly the same
+    order, so for the same random_seed it returns the same forest.
+
+    Input
+    -----
+    indptr, indices -- CSR adjacency of a simple undirected graph
+    degree -- degree of every node
+    maximum_tree=True -- If true uses maximum degree DAG as input, otherwise uses full degree DAG
+    random_seed -- an specific integer to determine the random number series
+    selfloop -- boolean mask of nodes whose self-loop adds influence (degree), or None
+    stats -- optional dict, receives the time of the 'dag' and 'forest' stages and the
+             counters 'ties' (ties broken at random) and 'max_depth' (largest distance to a root)
+
+    Return
+    ------
+    src, dst, parent, root, distance
+
+    src, dst --- DAG edges src->dst, see degree_hierarchy_dag_csr
+    parent --- int32 parent of every node in the tree, -1 for local leaders
+    root --- int32 local leader (tree root) of every node
+    distance --- int32 distance of every node to its root
+    Nodes never reached by the BFS keep -1 in all three arrays.
+    '''
+    if random_seed != None:
+        random.seed(random_seed)
+    n = len(degree)
+    tic = perf_counter()
+    src, dst = degree_hierarchy_dag_csr(indptr, indices, degree, maximum_tree, selfloop)
+    tic = lap_time(stats, 'dag', tic)
+    pred_indptr, pred_indices = dag_predecessors(n, src, dst)
+    out_degree = np.bincount(src, minlength=n)
+
+    pp = pred_indptr.tolist()
+    pi = pred_indices.tolist()
+    parent = [-1] * n
+    root = [-1] * n
+    distance = [-1] * n
+    rand = random.random
+    ties = 0
+    # each entry in queue is tuple (parent_node, node, shortest_distance_to_root), -1 as no parent
+    node_queue = deque((-1, r, 0) for r in np.flatnonzero(out_degree == 0).tolist())
+    while node_queue:
+        p, v, d = node_queue.popleft()
+        dv = distance[v]
+        if dv != -1:
+            if dv < d:
+                continue
+            if dv == d:
+                ties += 1
+                if rand() < 0.5:
+                    continue
+        root[v] = v if p == -1 else root[p]
+        parent[v] = p
+        distance[v] = d
+        d += 1
+        node_queue.extend([(v, u, d) for u in pi[pp[v]:pp[v + 1]]])
+
+    lap_time(stats, 'forest', tic)
+    if stats is not None:
+        stats['ties'] = ties
+        stats['max_depth'] = max(distance, default=-1)
+    return (src, dst, np.array(parent, dtype=np.int32), np.array(root, dtype=np.int32),
+            np.array(distance, dtype=np.int32))
+
+
+def local_leader_superiors_csr(indptr, indices, degree, leaders, stats=None):
+    '''
+    Local-BFS from all local leaders at once (batched version of BFS_from_s).
+
+    Leaders are processed in decreasing degree with one shared multi-source distance
+    field dist_H, the distance of every node to the leaders with a larger degree than
+    the current ones. The l_i of a leader s is then simply dist_H[s], and its superior
+    is found by a BFS from s which only enters nodes lying on a shortest path to such
+    a leader. This pruned BFS keeps the discovery order of the full BFS_from_s (layer
+    by layer, neighbours sorted by decreasing degree), so ties are broken identically.
+
+    Input
+    -----
+    indptr, indices -- CSR adjacency of the graph
+    degree -- degree of every node (the influence compared by BFS_from_s)
+    leaders -- indices of all local leaders
+    stats -- optional dict, receives the time of the 'local_bfs' stage, the number of nodes
+             'visited' by the Local-BFS of every leader (array aligned with leaders) and
+             'field_visited', the nodes visited to update dist_H
+
+    Return
+    ------
+    superior, path -- arrays aligned with leaders; superior is the leader itself and
+                      path is -1 when no leader with a larger degree is reachable
+    '''
+    tic = perf_counter()
+    leaders = np.asarray(leaders, dtype=np.int64)
+    n = len(degree)
+    ip = indptr.tolist()
+    ix = indices.tolist()
+    deg = np.asarray(degree).tolist()
+    infinity = n + 1
+    dist_H = [infinity] * n
+    stamp = [-1] * n
+    superior = leaders.copy()
+    path = np.full(len(leaders), -1, dtype=np.int64)
+    visited = [1] * len(leaders)
+    field_visited = 0
+
+    # leaders by decreasing degree, as a stable order of the input
+    order = np.argsort(-np.asarray(degree)[leaders], kind='stable').tolist()
+    start = 0
+    while start < len(order):
+        k = deg[leaders[order[start]]]
+        stop = start
+        while stop < len(order) and deg[leaders[order[stop]]] == k:
+            stop += 1
+        group = [int(leaders[t]) for t in order[start:stop]]
+        for t, s in zip(order[start:stop], group):
+            l = dist_H[s]
+            if l == infinity:
+                visited[t] = 0
+                continue
+            stamp[s] = t
+            layer = [s]
+            found = -1
+            for d in range(1, l + 1):
+                target = l - d
+                next_layer = []
+                for v in layer:
+                    nodes = [u for u in ix[ip[v]:ip[v + 1]] if stamp[u] != t and dist_H[u] == target]
+                    if len(nodes) > 1:
+                        nodes.sort(key=deg.__getitem__, reverse=True)
+                    for u in nodes:
+                        stamp[u] = t
+                        next_layer.append(u)
+                    visited[t] += len(nodes)
+                    if target == 0 and len(nodes) > 0:
+                        found = nodes[0]
+                        break
+                layer = next_layer
+            superior[t] = found
+            path[t] = l
+        # the group joins the sources of the distance field for leaders of lower degree
+        queue = deque()
+        for s in group:
+            dist_H[s] = 0
+            queue.append(s)
+        field_visited += len(queue)
+        while queue:
+            v = queue.popleft()
+            dv = dist_H[v] + 1
+            for u in ix[ip[v]:ip[v + 1]]:
+                if dist_H[u] > dv:
+                    dist_H[u] = dv
+                    queue.append(u)
+                    field_visited += 1
+        start = stop
+    lap_time(stats, 'local_bfs', tic)
+    if stats is not None:
+        stats['visited'] = np.array(visited, dtype=np.int64)
+        stats['field_visited'] = field_visited
+    return superior, path
+
+
+def gather_rows(indptr, indices, rows):
+    '''
+    Concatenation of the CSR rows listed in rows, and the position in rows of every entry
+    '''
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return indices[np.repeat(starts, lengths) + offsets], owner
+
+
+def degree_hierarchy_priority_tree_csr(n, src, dst, priority):
+    '''
+    Deterministic degree hierarchy tree on a DAG given by its edges src->dst.
+
+    Unlike degree_hierarchy_random_tree_csr, which breaks ties by random numbers drawn in
+    BFS order, every node takes as parent the successor at shortest distance to a root
+    with the smallest (priority, index). The forest is then a function of the DAG alone,
+    so it can be maintained locally when the graph changes (see LS_incremental.py).
+
+    Input
+    -----
+    n -- number of nodes
+    src, dst -- DAG edges, e.g. from degree_hierarchy_dag_csr
+    priority -- float priority of every node
+
+    Return
+    ------
+    parent, root, distance -- int32 arrays as in degree_hierarchy_random_tree_csr
+    '''
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    pred_indptr, pred_indices = dag_predecessors(n, src, dst)
+    distance = np.full(n, -1, dtype=np.int32)
+    frontier = np.flatnonzero(np.bincount(src, minlength=n) == 0)
+    distance[frontier] = 0
+    levels = [frontier]
+    while len(frontier) > 0:
+        reached, _ = gather_rows(pred_indptr, pred_indices, frontier)
+        frontier = np.unique(reached[distance[reached] < 0])
+        distance[frontier] = len(levels)
+        levels.append(frontier)
+
+    parent = np.full(n, -1, dtype=np.int32)
+    tight = (distance[src] >= 0) & (distance[dst] == distance[src] - 1)
+    s = src[tight]
+    d = dst[tight]
+    order = np.lexsort((d, np.asarray(priority)[d], s))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = s[order][1:] != s[order][:-1]
+    parent[s[order][first]] = d[order][first]
+
+    root = np.full(n, -1, dtype=np.int32)
+    root[levels[0]] = levels[0]
+    for level in levels[1:]:
+        root[level] = root[parent[level]]
+    return parent, root, distance
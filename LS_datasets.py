@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of the bundled networks with a binary cache of their GML files.
+
+nx.read_gml parses the text on every run, which for pubmed.gml (320k lines) takes longer
+than LS itself. The first load_dataset of a network parses it once and stores a bundle:
+an uncompressed .npz file with the symmetrized CSR adjacency (the CSRGraph.from_networkx
+of the simple undirected graph, so LS gives the same result as on the networkx graph),
+the integer node ids and the ground-truth labels as integer codes. Later loads map the
+arrays of the bundle into memory (an uncompressed .npz is a zip of .npy files, which are
+memory-mapped at their offset in the zip) and take milliseconds. A bundle records the
+modification time and size of its GML file and is rebuilt when they change.
+
+    csr, y_true = load_dataset('cora')          # CSRGraph, integer labels (None if unlabelled)
+    result = local_search_communities(csr, seed=1)
+"""
+
+
+import os
+import zipfile
+import hashlib
+import numpy as np
+import networkx as nx
+from LS_csr_engine import CSRGraph
+from LS_graph_io import read_edgelist_csr
+
+DEFAULT_DIRECTORY = os.path.join('.ls_cache', 'datasets')
+# bumped when the content of the bundles changes
+BUNDLE_VERSION = 2
+
+_NETWORKS = 'data/network_with_true_community_labels/%s.gml'
+_HIERARCHY = 'data/hierarchy_network/%s.gml'
+DATASETS = dict([(name, _NETWORKS % name) for name in
+                 ['polbooks', 'football', 'footballTSE', 'polblogs', 'cora', 'citeseer', 'pubmed']] +
+                [(name, _HIERARCHY % name) for name in ['Hierarchy_random', 'Hierarchy_scale']])
+
+
+def dataset_path(name):
+    '''GML file of a registered dataset, or name itself if it is a path'''
+    if name in DATASETS:
+        return DATASETS[name]
+    if os.path.exists(name):
+        return name
+    raise KeyError('unknown dataset %r (registered: %s)' % (name, ', '.join(sorted(DATASETS))))
+
+
+def bundle_path(source, directory=DEFAULT_DIRECTORY):
+    '''file of the bundle of a GML file (named after the file and a hash of its absolute path)'''
+    stem = os.path.splitext(os.path.basename(source))[0]
+    digest = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:10]
+    return os.path.join(directory, '%s-%s.npz' % (stem, digest))
+
+
+def _signature(source):
+    stat = os.stat(source)
+    return np.array([BUNDLE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+
+def simple_graph(G):
+    '''
+    The simple undirected graph of a networkx graph read from a file: directed graphs as
+    direct_to_undirect_id, parallel edges merged; node and neighbour order are kept
+    '''
+    if G.is_directed():
+        H = nx.Graph()
+        H.add_nodes_from(list(G.nodes()))
+        H.add_edges_from(list(G.edges()))
+        return H
+    if G.is_multigraph():
+        return nx.Graph(G)
+    return G
+
+
+def build_bundle(source, path, label='value'):
+    '''
+    Parse the GML file source and store its bundle at path
+
+    Input
+    -----
+    source -- GML file, with integer node ids ('id')
+    path -- the .npz file to write (written to a temporary file first)
+    label -- node attribute with the ground-truth community
+
+    Return
+    ------
+    path
+    '''
+    G = simple_graph(nx.read_gml(source, label='id'))
+    csr = CSRGraph.from_networkx(G)
+    values = [G.nodes[v].get(label) for v in G.nodes]
+    arrays = dict(signature=_signature(source), nodes=np.asarray(csr.nodes, dtype=np.int64),
+                  indptr=csr.indptr, indices=csr.indices, selfloop=csr.selfloop)
+    if any(value is not None for value in values):
+        # codes in order of first appearance, the original values in label_values
+        codes = {}
+        arrays['labels'] = np.array([-1 if value is None else codes.setdefault(value, len(codes))
+                                     for value in values], dtype=np.int64)
+        names = list(codes)
+        integer = [isinstance(value, (int, np.integer)) and not isinstance(value, bool) for value in names]
+        if all(integer):
+            arrays['label_values'] = np.array(names, dtype=np.int64)
+        else:
+            # as text, with the values which were integers marked (no pickled object arrays)
+            arrays['label_values'] = np.array([str(value) for value in names], dtype=str)
+            arrays['label_integer'] = np.array(integer, dtype=bool)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = '%s.tmp%d.npz' % (path[:-4], os.getpid())
+    np.savez(temporary, **arrays)
+    # readers never see a half-written bundle
+    os.replace(temporary, path)
+    return path
+
+
+def load_npz(path, mmap_mode='r'):
+    '''
+    All arrays of an uncompressed .npz file, memory-mapped at their offsets in the zip
+    (compressed members, and mmap_mode=None, are read into memory)
+
+    Return
+    ------
+    dict of arrays
+    '''
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # local file header: 30 bytes, then the file name and the extra field
+            f.seek(info.header_offset + 26)
+            header = f.read(4)
+            f.seek(info.header_offset + 30 + int.from_bytes(header[:2], 'little') + int.from_bytes(header[2:], 'little'))
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or int(np.prod(shape)) == 0:
+                # nothing to map
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=f.tell(), shape=shape,
+                                     order='F' if fortran else 'C')
+    return arrays
+
+
+def load_bundle(name, directory=DEFAULT_DIRECTORY, rebuild=False, mmap_mode='r'):
+    '''
+    Arrays of the bundle of a dataset (registered name or GML path), built first if it is
+    missing, older than its GML file, or rebuild is True
+
+    Return
+    ------
+    dict with signature, nodes, indptr, indices, selfloop, and labels, label_values for labelled networks
+    (label_values as text, with label_integer marking the integer ones, if the values are not all integers)
+    '''
+    source = dataset_path(name)
+    path = bundle_path(source, directory)
+    if not rebuild and os.path.exists(path):
+        arrays = load_npz(path, mmap_mode)
+        if np.array_equal(arrays.get('signature'), _signature(source)):
+            return arrays
+        del arrays
+    build_bundle(source, path)
+    return load_npz(path, mmap_mode)
+
+
+def bundle_csr(arrays):
+    '''CSRGraph of the arrays of a bundle (the CSR arrays are not copied)'''
+    return CSRGraph(arrays['nodes'].tolist(), arrays['indptr'], arrays['indices'], arrays['selfloop'])
+
+
+def load_dataset(name, directory=DEFAULT_DIRECTORY, rebuild=False):
+    '''
+    Network and ground truth of a dataset (registered name or GML path)
+
+    Return
+    ------
+    csr -- CSRGraph (node i is the i-th node of the GML file), arrays memory-mapped
+    y_true -- integer label of every node (-1 for nodes without one), None for unlabelled networks
+    '''
+    arrays = load_bundle(name, directory, rebuild)
+    csr = bundle_csr(arrays)
+    return csr, arrays.get('labels')
+
+
+def load_networkx(name, directory=DEFAULT_DIRECTORY, rebuild=False):
+    '''
+    The dataset as a networkx graph (nodes and neighbours in the order of nx.read_gml) and
+    its original label values (None for unlabelled networks)
+    '''
+    arrays = load_bundle(name, directory, rebuild)
+    csr = bundle_csr(arrays)
+    if 'labels' not in arrays:
+        return csr.to_networkx(), None
+    codes = np.asarray(arrays['labels'])
+    names = np.asarray(arrays['label_values']).tolist()
+    if 'label_integer' in arrays:
+        names = [int(value) if integer else value for value, integer in zip(names, arrays['label_integer'].tolist())]
+    values = [names[code] for code in np.maximum(codes, 0).tolist()]
+    return csr.to_networkx(), [value if code >= 0 else None for code, value in zip(codes.tolist(), values)]
+
+
+def load_network(path, directory=DEFAULT_DIRECTORY):
+    '''
+    Network of a file by its extension: a registered name or .gml (through its bundle), a
+    bundle .npz, or else an edge list (read_edgelist_csr, without labels)
+
+    Return
+    ------
+    csr, y_true -- as load_dataset
+    '''
+    if path in DATASETS or path.endswith('.gml'):
+        return load_dataset(path, directory)
+    if not path.endswith('.npz'):
+        return read_edgelist_csr(path), None
+    arrays = load_npz(path)
+    csr = bundle_csr(arrays)
+    return csr, arrays.get('labels')
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Tiled pairwise distances of vector data, for the networks built from vector data.
+
+pairwise_distances computes the n x n distance matrix tile by tile with numpy, on a
+thread pool (numpy releases the GIL), so that the temporary memory is bounded by the
+tile size. Only the tiles above the diagonal are computed and mirrored, as caldistance
+does. Euclidean, Manhattan and Chebyshev distances of low-dimensional data are
+computed from the coordinate differences and equal those of np.linalg.norm bit for bit;
+Euclidean distances of high-dimensional data come from the Gram matrix instead
+(|a|^2 + |b|^2 - 2ab), which is much faster but may differ in the last bits.
+"""
+
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+METRICS = ('euclidean', 'chebyshev', 'manhattan', 'cosine')
+# Euclidean distances of data with more dimensions than this use the Gram matrix
+GRAM_DIMENSION = 32
+# bytes of the (rows, columns, dimension) differences of one tile
+TILE_MEMORY = 1 << 25
+
+
+def sum_of_squares(diff):
+    '''squared Euclidean norm of every difference vector (last axis), with the same dot product as np.linalg.norm'''
+    if hasattr(np, 'vecdot'):
+        return np.vecdot(diff, diff)
+    return (diff[..., None, :] @ diff[..., :, None])[..., 0, 0]
+
+
+def tile_distances(a, b, metric='euclidean', gram=False):
+    '''
+    Distances between the rows of a and the rows of b
+
+    Input
+    -----
+    a, b -- 2D arrays of vectors (same dtype)
+    metric -- one of METRICS; cosine is 1 - cosine similarity (1 for zero vectors)
+    gram -- If true, Euclidean distances are computed from the Gram matrix
+
+    Return
+    ------
+    (len(a), len(b)) array
+    '''
+    if metric == 'cosine' or (metric == 'euclidean' and gram):
+        product = a @ b.T
+        na = np.einsum('ij,ij->i', a, a)
+        nb = np.einsum('ij,ij->i', b, b)
+        if metric == 'euclidean':
+            product *= -2
+            product += na[:, None]
+            product += nb[None, :]
+            np.maximum(product, 0, out=product)
+            return np.sqrt(product, out=product)
+        norm = np.sqrt(na)[:, None] * np.sqrt(nb)[None, :]
+        similarity = np.divide(product, norm, out=np.zeros_like(product), where=norm > 0)
+        return np.subtract(1, similarity, out=similarity)
+    if metric == 'chebyshev' and a.shape[1] <= GRAM_DIMENSION:
+        # the maximum is exact in any order, one coordinate at a time is faster for few dimensions
+        out = np.abs(a[:, None, 0] - b[None, :, 0])
+        for k in range(1, a.shape[1]):
+            np.maximum(out, np.abs(a[:, None, k] - b[None, :, k]), out=out)
+        return out
+    diff = a[:, None, :] - b[None, :, :]
+    if metric == 'euclidean':
+        return np.sqrt(sum_of_squares(diff))
+    np.abs(diff, out=diff)
+    if metric == 'chebyshev':
+        return diff.max(axis=-1)
+    if metric == 'manhattan':
+        return diff.sum(axis=-1)
+    raise ValueError('unknown metric %r, expected one of %s' % (metric, ', '.join(METRICS)))
+
+
+def tile_size(dimension, itemsize, metric='euclidean', gram=False, tile=None):
+    '''number of rows of a tile, bounded by TILE_MEMORY for the kernels on coordinate differences'''
+    if tile is not None:
+        return max(1, int(tile))
+    if metric == 'cosine' or (metric == 'euclidean' and gram):
+        return 1024
+    # small tiles stay in cache
+    return int(min(256, max(16, np.sqrt(TILE_MEMORY / (max(dimension, 1) * itemsize)))))
+
+
+def iter_tiles(n, size):
+    '''(row slice, column slice) of the tiles on and above the diagonal'''
+    bounds = list(range(0, n, size)) + [n]
+    for i in range(len(bounds) - 1):
+        for j in range(i, len(bounds) - 1):
+            yield slice(bounds[i], bounds[i + 1]), slice(bounds[j], bounds[j + 1])
+
+
+def prepare_vectors(X, metric='euclidean', dtype=np.float64, gram=None):
+    '''
+    X as a C-contiguous 2D array of dtype, and whether Euclidean distances use the Gram matrix
+    '''
+    if metric not in METRICS:
+        raise ValueError('unknown metric %r, expected one of %s' % (metric, ', '.join(METRICS)))
+    X = np.ascontiguousarray(X, dtype=dtype)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    if gram is None:
+        gram = X.shape[1] > GRAM_DIMENSION
+    return X, gram
+
+
+def map_tiles(function, n, size, workers=None):
+    '''
+    Call function(rows, columns) for every tile on and above the diagonal, on a thread pool
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tiles = iter_tiles(n, size)
+    if workers <= 1:
+        for rows, columns in tiles:
+            function(rows, columns)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # consume the results to raise errors of the workers
+        for _ in pool.map(lambda tile: function(*tile), tiles):
+            pass
+
+
+def pairwise_distances(X, metric='euclidean', dtype=np.float64, tile=None, workers=None, gram=None, out=None):
+    '''
+    Distance matrix of the rows of X
+
+    Input
+    -----
+    X -- (n, dimension) array of vectors
+    metric -- 'euclidean', 'chebyshev', 'manhattan' or 'cosine' (1 - cosine similarity)
+    dtype -- np.float64 or np.float32 for the computation and the result
+    tile -- rows of a tile (default: bounded by TILE_MEMORY)
+    workers -- number of threads (default: all cores)
+    gram -- If true, Euclidean distances come from the Gram matrix (default: for more than GRAM_DIMENSION dimensions)
+    out -- (n, n) array to fill, e.g. a np.memmap (default: a new array)
+
+    Return
+    ------
+    (n, n) symmetric array of distances with a zero diagonal
+    '''
+    X, gram = prepare_vectors(X, metric, dtype, gram)
+    n = len(X)
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    size = tile_size(X.shape[1], X.itemsize, metric, gram, tile)
+
+    def fill(rows, columns):
+        block = tile_distances(X[rows], X[columns], metric, gram)
+        if rows == columns:
+            # distances below the diagonal mirror the ones above, as in caldistance
+            block = np.triu(block, 1)
+            block += block.T
+        out[rows, columns] = block
+        if rows != columns:
+            out[columns, rows] = block.T
+
+    map_tiles(fill, n, size, workers)
+    return out
+
+
+def condensed_length(n):
+    return n * (n - 1) // 2
+
+
+def condensed_size(m):
+    '''number of vectors n of a condensed distance array of length m = n(n-1)/2'''
+    n = int((1 + np.sqrt(1 + 8 * m)) / 2)
+    for k in (n - 1, n, n + 1):
+        if k >= 0 and condensed_length(k) == m:
+            return k
+    raise ValueError('%d is not the length of a condensed distance array' % m)
+
+
+def condensed_row_starts(n):
+    '''position in the condensed array of the pair (i, i+1), for every i'''
+    i = np.arange(n, dtype=np.int64)
+    return i * n - i * (i + 1) // 2
+
+
+def condensed_pairs(n, k):
+    '''(i, j), i < j, of the condensed positions k'''
+    starts = condensed_row_starts(n)
+    i = np.searchsorted(starts, k, side='right') - 1
+    return i, k - starts[i] + i + 1
+
+
+def condensed_distances(X, metric='euclidean', dtype=np.float64, workers=None, gram=None, out=None, filename=None):
+    '''
+    Condensed distance array of the rows of X: the distances of the pairs i < j in the
+    order (0,1), (0,2), ..., (0,n-1), (1,2), ..., as scipy.spatial.distance.pdist
+
+    Input
+    -----
+    X, metric, dtype, workers, gram -- see pairwise_distances
+    out -- array of length n(n-1)/2 to fill (default: a new array)
+    filename -- if given (and out is None), the array is a memory-mapped .npy file
+
+    Return
+    ------
+    1D array of n(n-1)/2 distances, with the same values as the upper triangle of pairwise_distances
+    '''
+    X, gram = prepare_vectors(X, metric, dtype, gram)
+    n = len(X)
+    if out is None:
+        if filename is None:
+            out = np.empty(condensed_length(n), dtype=dtype)
+        else:
+            out = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=(condensed_length(n),))
+    starts = condensed_row_starts(n)
+    if metric == 'cosine' or (metric == 'euclidean' and gram):
+        column_bytes = 4 * X.itemsize
+    else:
+        column_bytes = max(X.shape[1], 1) * X.itemsize
+    # blocks of rows against all the following columns, bounded by TILE_MEMORY
+    blocks = []
+    i0 = 0
+    while i0 < n - 1:
+        i1 = min(n - 1, i0 + max(1, min(1024, TILE_MEMORY // ((n - i0) * column_bytes))))
+        blocks.append((i0, i1))
+        i0 = i1
+
+    def fill(block):
+        i0, i1 = block
+        distance = tile_distances(X[i0:i1], X[i0:], metric, gram)
+        for k, i in enumerate(range(i0, i1)):
+            out[starts[i]:starts[i] + n - i - 1] = distance[k, k + 1:]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for block in blocks:
+            fill(block)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(fill, blocks):
+                pass
+    return out
+
+
+def iter_distances(dis, chunk=1 << 20):
+    '''
+    (positions of the pairs i < j, distances) of a condensed (1D) or square (2D) distance
+    array, chunk by chunk; positions are condensed positions
+    '''
+    if np.ndim(dis) == 1:
+        for k in range(0, len(dis), chunk):
+            yield k, np.asarray(dis[k:k + chunk])
+        return
+    n = len(dis)
+    starts = condensed_row_starts(n)
+    for i in range(n - 1):
+        yield starts[i], np.asarray(dis[i][i + 1:])
+
+
+def distance_range(dis, chunk=1 << 20):
+    '''smallest and largest distance of the pairs i < j, streamed over a condensed or square array'''
+    arr_min = arr_max = None
+    for _, values in iter_distances(dis, chunk):
+        if len(values) == 0:
+            continue
+        low, high = values.min(), values.max()
+        arr_min = low if arr_min is None or low < arr_min else arr_min
+        arr_max = high if arr_max is None or high > arr_max else arr_max
+    return arr_min, arr_max
+
+
+def pairs_within(dis, dc, chunk=1 << 20):
+    '''
+    Pairs i < j with distance <= dc, in the order of the condensed array
+
+    Return
+    ------
+    start, end -- int arrays of i and j
+    '''
+    n = len(dis) if np.ndim(dis) == 2 else condensed_size(len(dis))
+    positions = [offset + np.flatnonzero(values <= dc) for offset, values in iter_distances(dis, chunk)]
+    positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+    return condensed_pairs(n, positions.astype(np.int64))
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-seed ensemble of the Local Search (LS) algorithm.
+
+Ties in degree_hierarchy_random_tree are broken at random, so the partition depends on
+the seed. ensemble_communities runs LS for many seeds on a process pool and summarizes
+the runs by the stability of every node's label and a consensus partition built from
+the co-association of the endpoints of every edge.
+"""
+
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from LS_csr_engine import CSRGraph, edge_sources
+from LS_algorithm import local_search_communities
+
+# graph shared by the worker processes, set once per worker by _init_worker
+_shared = {}
+
+
+def _init_worker(nodes, indptr, indices, selfloop, options):
+    _shared['csr'] = CSRGraph(nodes, indptr, indices, selfloop)
+    _shared['options'] = options
+
+
+def _run_seed(seed):
+    result = local_search_communities(_shared['csr'], seed=seed, **_shared['options'])
+    return result.labels
+
+
+class EnsembleResult(object):
+    '''
+    Summary of an ensemble of LS runs; labels are node indices of community centers, -1 for none.
+
+    nodes -- the original node id of every index
+    seeds -- the seeds of the runs
+    labels -- (number of seeds, number of nodes) array of the label of every node in every run
+    coassociation -- sparse symmetric matrix, the fraction of runs in which the two endpoints of an edge share a community
+    consensus -- consensus community (0, 1, ... by decreasing size) of every node, -1 for nodes without community in most runs
+    stability -- fraction of runs in which every node gets its most frequent label
+    '''
+    __slots__ = ('nodes', 'seeds', 'labels', 'coassociation', 'consensus', 'stability')
+
+    def __init__(self, nodes, seeds, labels, coassociation, consensus, stability):
+        self.nodes = nodes
+        self.seeds = seeds
+        self.labels = labels
+        self.coassociation = coassociation
+        self.consensus = consensus
+        self.stability = stability
+
+    def consensus_partition(self):
+        '''{node id: consensus community}'''
+        return dict(zip(self.nodes, self.consensus.tolist()))
+
+
+def label_stability(labels):
+    '''
+    Fraction of runs (rows of labels) in which every node (column) gets its most frequent label
+    '''
+    runs, n = labels.shape
+    column = np.tile(np.arange(n, dtype=np.int64), runs)
+    _, inverse, counts = np.unique(np.column_stack((column, labels.ravel())), axis=0,
+                                   return_inverse=True, return_counts=True)
+    mode = np.zeros(n, dtype=np.int64)
+    np.maximum.at(mode, column, counts[inverse.ravel()])
+    return mode / runs
+
+
+def consensus_communities(csr, labels, threshold=0.5):
+    '''
+    Sparse co-association of the graph edges and the consensus partition.
+
+    Input
+    -----
+    csr -- CSRGraph
+    labels -- (runs, nodes) array of labels, -1 for nodes without community
+    threshold -- edges whose endpoints share a community in more than this fraction of runs are kept
+
+    Return
+    ------
+    coassociation -- scipy sparse matrix (only graph edges are stored)
+    consensus -- connected components of the kept edges, numbered by decreasing size;
+                 -1 for nodes labelled -1 in most runs
+    '''
+    n = csr.number_of_nodes()
+    src = edge_sources(csr.indptr)
+    dst = csr.indices
+    upper = src < dst
+    src = src[upper]
+    dst = dst[upper]
+    together = np.zeros(len(src), dtype=np.int64)
+    for run in labels:
+        together += (run[src] == run[dst]) & (run[src] >= 0)
+    share = together / len(labels)
+    coassociation = coo_matrix((np.concatenate((share, share)), (np.concatenate((src, dst)), np.concatenate((dst, src)))),
+                               shape=(n, n)).tocsr()
+
+    keep = share > threshold
+    adjacency = coo_matrix((np.ones(keep.sum()), (src[keep], dst[keep])), shape=(n, n))
+    _, component = connected_components(adjacency, directed=False)
+    noise = (labels < 0).sum(axis=0) * 2 > len(labels)
+    size = np.bincount(component[~noise], minlength=component.max() + 1)
+    rank = np.empty(len(size), dtype=np.int64)
+    rank[np.argsort(-size, kind='stable')] = np.arange(len(size))
+    consensus = np.where(noise, -1, rank[component])
+    return coassociation, consensus
+
+
+def ensemble_communities(G, seeds, center_num=None, auto_choose_centers=False, maximum_tree=True, self_loop=False,
+                         workers=None, threshold=0.5):
+    '''
+    Run LS once for every seed, in parallel, and build the consensus partition.
+
+    The CSR arrays of the graph are handed to every worker process once (by the pool
+    initializer), not pickled with every task.
+
+    Input
+    -----
+    G -- networkx graph or CSRGraph
+    seeds -- list of integer seeds
+    center_num, auto_choose_centers, maximum_tree, self_loop -- see local_search_communities
+    workers -- number of worker processes (default: all cores); 1 runs in this process
+    threshold -- see consensus_communities
+
+    Return
+    ------
+    EnsembleResult
+    '''
+    csr = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+    seeds = list(seeds)
+    options = dict(center_num=center_num, auto_choose_centers=auto_choose_centers,
+                   maximum_tree=maximum_tree, self_loop=self_loop)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(seeds))
+    if workers <= 1:
+        _init_worker(csr.nodes, csr.indptr, csr.indices, csr.selfloop, options)
+        labels = [_run_seed(seed) for seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(csr.nodes, csr.indptr, csr.indices, csr.selfloop, options)) as pool:
+            labels = list(pool.map(_run_seed, seeds, chunksize=max(1, len(seeds) // (4 * workers))))
+    labels = np.array(labels, dtype=np.int64).reshape(len(seeds), csr.number_of_nodes())
+    coassociation, consensus = consensus_communities(csr, labels, threshold)
+    return EnsembleResult(csr.nodes, seeds, labels, coassociation, consensus, label_stability(labels))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Clustering estimator for vector data with out-of-sample assignment.
+
+LSClustering.fit runs the vector pipeline (epsilon-ball network at dc_percent, LS,
+evaluate_network numbering) and keeps a KD-tree of the fitted points with their degree,
+their parent in the dominance tree and their cluster. predict assigns new points without
+refitting: a new point joins the cluster of its dominant epsilon-neighbour, the fitted
+point within dc of the highest degree, which is where LS would attach it in the maximum
+degree DAG. A point without fitted points within dc gets -1.
+
+    model = LSClustering(dc_percent=6, center_num=2).fit(X)
+    model.labels_, model.predict(Y)
+"""
+
+
+import numpy as np
+from scipy.spatial import cKDTree
+from LS_algorithm import local_search_communities
+from LS_cluster_function import evaluate_network
+from LS_distance import sum_of_squares
+from LS_vector_graph import MINKOWSKI_P, prepare_points, epsilon_graph_csr
+
+
+class LSClustering(object):
+    '''
+    Input
+    -----
+    dc_percent -- threshold of the epsilon-ball network, as in chose_dc(distance, dc_percent)
+    dc -- the threshold itself (overrides dc_percent)
+    center_num, auto_choose_centers, maximum_tree, seed -- see local_search_communities
+    order -- metric of caldistance (0: Euclidean, otherwise Chebyshev)
+    exact -- see epsilon_graph_csr
+
+    Attributes after fit
+    --------------------
+    dc_ -- the distance threshold
+    labels_ -- cluster of every fitted point (0, 1, ... as numbered by evaluate_network, -1 for none)
+    centers_ -- indices of the fitted points which are community centers
+    degree_ -- degree of every fitted point in the epsilon-ball network
+    parent_ -- parent of every fitted point in the dominance tree (itself for local leaders)
+    result_ -- the LSResult over the nodes of the network
+    tree_ -- cKDTree of the fitted points
+    '''
+
+    def __init__(self, dc_percent=6, dc=None, center_num=None, auto_choose_centers=False, order=1, seed=1,
+                 maximum_tree=True, exact=True):
+        self.dc_percent = dc_percent
+        self.dc = dc
+        self.center_num = center_num
+        self.auto_choose_centers = auto_choose_centers
+        self.order = order
+        self.seed = seed
+        self.maximum_tree = maximum_tree
+        self.exact = exact
+
+    @property
+    def metric(self):
+        return 'euclidean' if self.order == 0 else 'chebyshev'
+
+    def fit(self, X):
+        '''
+        Cluster the points X: the same network as caldistance -> chose_dc -> cal_adge, built
+        with a KD-tree (see LS_vector_graph.py), then local_search_communities and evaluate_network
+        '''
+        X = prepare_points(X, self.metric)
+        n = len(X)
+        csr, self.dc_ = epsilon_graph_csr(X, dc=self.dc, dc_percent=self.dc_percent, metric=self.metric,
+                                          exact=self.exact)
+        self.result_ = local_search_communities(csr, center_num=self.center_num,
+                                                auto_choose_centers=self.auto_choose_centers,
+                                                maximum_tree=self.maximum_tree, seed=self.seed)
+        nodes = np.asarray(csr.nodes)
+        labels, _ = evaluate_network(self.result_.partition(), n)
+        self.labels_ = np.array(labels, dtype=np.int64)
+        self.centers_ = nodes[self.result_.centers]
+        self.degree_ = np.empty(n, dtype=np.int64)
+        self.degree_[nodes] = csr.degree
+        self.parent_ = np.empty(n, dtype=np.int64)
+        # roots of the forest (local leaders) have parent -1 and map to themselves
+        parent = self.result_.parent
+        self.parent_[nodes] = np.where(parent >= 0, nodes[np.maximum(parent, 0)], nodes)
+        self.X_ = X
+        self.tree_ = cKDTree(X)
+        return self
+
+    def fit_predict(self, X):
+        return self.fit(X).labels_
+
+    def dominant_neighbours(self, Y):
+        '''
+        For every row of Y the fitted point within dc of the highest degree (ties: the
+        nearest, then the smaller index), -1 if there is none
+        '''
+        Y = prepare_points(Y, self.metric)
+        neighbours = self.tree_.query_ball_point(Y, self.dc_ * (1 + 1e-9) + 1e-300, p=MINKOWSKI_P[self.metric])
+        counts = np.fromiter((len(found) for found in neighbours), dtype=np.int64, count=len(Y))
+        dominant = np.full(len(Y), -1, dtype=np.int64)
+        if counts.sum() == 0:
+            return dominant
+        row = np.repeat(np.arange(len(Y)), counts)
+        candidate = np.concatenate([found for found in neighbours if found]).astype(np.int64)
+        # the kernel of pair_distances, so the check is the same as the one of the network
+        diff = Y[row] - self.X_[candidate]
+        distance = np.sqrt(sum_of_squares(diff)) if self.metric == 'euclidean' else np.abs(diff).max(axis=1)
+        keep = distance <= self.dc_
+        row, candidate, distance = row[keep], candidate[keep], distance[keep]
+        # per row: highest degree, then nearest, then smallest index
+        order = np.lexsort((candidate, distance, -self.degree_[candidate], row))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = row[order][1:] != row[order][:-1]
+        dominant[row[order][first]] = candidate[order][first]
+        return dominant
+
+    def predict(self, Y, batch_size=10000):
+        '''
+        Cluster of every row of Y: the cluster of its dominant epsilon-neighbour among the
+        fitted points (-1 if it has none), computed in batches of batch_size rows
+        '''
+        Y = prepare_points(Y, self.metric)
+        labels = np.full(len(Y), -1, dtype=np.int64)
+        for start in range(0, len(Y), batch_size):
+            dominant = self.dominant_neighbours(Y[start:start + batch_size])
+            found = dominant >= 0
+            labels[start:start + batch_size][found] = self.labels_[dominant[found]]
+        return labels
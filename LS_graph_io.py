@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming edge-list loader for the CSR engine of the Local Search (LS) algorithm.
+
+read_edgelist_csr reads an edge list in chunks and builds a CSRGraph without ever
+creating a networkx graph: a first pass numbers the nodes and counts degrees, a second
+pass writes every edge into preallocated (optionally memory-mapped) CSR arrays. The
+result is the CSRGraph that CSRGraph.from_networkx(nx.read_edgelist(path, nodetype=int))
+would give: nodes in order of first appearance, neighbours in the order of their first
+edge, repeated edges dropped and self-loops recorded in the selfloop mask.
+"""
+
+
+import os
+import numpy as np
+import pandas as pd
+from LS_csr_engine import CSRGraph, _index_dtype
+
+
+def _read_chunks(path, delimiter, comments, nodetype, chunk_size):
+    '''(u, v) arrays of the node ids of every chunk of edges; further columns are ignored'''
+    reader = pd.read_csv(path, sep=r'\s+' if delimiter is None else delimiter, comment=comments,
+                         header=None, usecols=[0, 1], chunksize=chunk_size, skip_blank_lines=True)
+    for chunk in reader:
+        chunk = chunk.dropna()
+        if len(chunk) > 0:
+            yield chunk[0].to_numpy().astype(nodetype), chunk[1].to_numpy().astype(nodetype)
+
+
+class _NodeIndex(object):
+    '''
+    numbering of node ids in order of first appearance, kept as sorted arrays
+
+    Every chunk only adds its unique ids (with their first position and count) to a pending
+    list, which is merged into the sorted arrays once it is as large as them, so the keys are
+    sorted O(log) times in all rather than once per chunk. finish() numbers the nodes.
+    '''
+
+    def __init__(self):
+        self.keys = None
+        self.first = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.pending = []
+        self.pending_size = 0
+        self.position = 0
+        self.values = np.zeros(0, dtype=np.int64)
+        self.nodes = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.values)
+
+    def lookup(self, ids):
+        return self.values[np.searchsorted(self.keys, ids)]
+
+    def add(self, ids, weight):
+        '''record the ids of a chunk, adding weight[i] to the count of ids[i]'''
+        uniq, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        count = np.bincount(inverse.reshape(-1), weights=weight, minlength=len(uniq)).astype(np.int64)
+        self.pending.append((uniq, first + self.position, count))
+        self.pending_size += len(uniq)
+        self.position += len(ids)
+        if self.keys is None or self.pending_size >= len(self.keys):
+            self._merge()
+
+    def _merge(self):
+        if not self.pending:
+            return
+        parts = ([] if self.keys is None else [(self.keys, self.first, self.count)]) + self.pending
+        keys = np.concatenate([part[0] for part in parts])
+        first = np.concatenate([part[1] for part in parts])
+        count = np.concatenate([part[2] for part in parts])
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        start = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        self.keys = keys[start]
+        self.first = np.minimum.reduceat(first[order], start)
+        self.count = np.add.reduceat(count[order], start)
+        self.pending = []
+        self.pending_size = 0
+
+    def finish(self):
+        '''number the nodes by first appearance; returns the count of every node number'''
+        self._merge()
+        if self.keys is None:
+            return np.zeros(0, dtype=np.int64)
+        order = np.argsort(self.first, kind='stable')
+        self.values = np.empty(len(order), dtype=np.int64)
+        self.values[order] = np.arange(len(order))
+        self.nodes = self.keys[order]
+        return self.count[order]
+
+
+def _interleave(a, b):
+    return np.column_stack((a, b)).ravel()
+
+
+def _allocate(directory, name, shape, dtype):
+    if directory is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(os.path.join(directory, name + '.npy'), mode='w+', dtype=dtype, shape=shape)
+
+
+def read_edgelist_csr(path, delimiter=None, comments='#', nodetype=int, chunk_size=1 << 20, directory=None):
+    '''
+    Load an edge list file into a CSRGraph in two streaming passes.
+
+    Input
+    -----
+    path -- edge list file, one edge "u v [data ...]" per line
+    delimiter -- column separator, default any whitespace
+    comments -- text after this character is ignored
+    nodetype -- type of the node ids
+    chunk_size -- number of lines read at once
+    directory -- if given, the CSR arrays are memory-mapped .npy files in this directory
+                 (nodes, indptr, indices, selfloop), which load_csr opens again
+
+    Return
+    ------
+    CSRGraph
+    '''
+    # pass 1: node numbers and degrees (with repeated edges)
+    index = _NodeIndex()
+    loops = []
+    for u, v in _read_chunks(path, delimiter, comments, nodetype, chunk_size):
+        loop = u == v
+        loops.append(u[loop])
+        index.add(_interleave(u, v), _interleave(~loop, ~loop))
+    count = index.finish()
+    n = len(index)
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    # pass 2: every edge in both rows, in file order
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(count, out=indptr[1:])
+    indices = _allocate(directory, 'indices', (int(indptr[-1]),), _index_dtype(n))
+    fill = indptr[:-1].copy()
+    for u, v in _read_chunks(path, delimiter, comments, nodetype, chunk_size):
+        iu = index.lookup(u)
+        iv = index.lookup(v)
+        keep = iu != iv
+        src = _interleave(iu[keep], iv[keep])
+        dst = _interleave(iv[keep], iu[keep])
+        order = np.argsort(src, kind='stable')
+        src = src[order]
+        rank = np.arange(len(src)) - np.searchsorted(src, src)
+        indices[fill[src] + rank] = dst[order]
+        fill += np.bincount(src, minlength=n)
+
+    # compaction by blocks of rows: keep the first copy of every neighbour
+    degree = np.zeros(n, dtype=np.int64)
+    write = 0
+    start = 0
+    while start < n:
+        stop = max(int(np.searchsorted(indptr, indptr[start] + 2 * chunk_size, side='right')) - 1, start + 1)
+        stop = min(stop, n)
+        segment = np.array(indices[indptr[start]:indptr[stop]])
+        row = np.repeat(np.arange(start, stop), count[start:stop])
+        order = np.lexsort((np.arange(len(segment)), segment, row))
+        keep = np.ones(len(segment), dtype=bool)
+        repeated = (row[order][1:] == row[order][:-1]) & (segment[order][1:] == segment[order][:-1])
+        keep[order[1:][repeated]] = False
+        segment = segment[keep]
+        indices[write:write + len(segment)] = segment
+        degree[start:stop] = np.bincount(row[keep] - start, minlength=stop - start)
+        write += len(segment)
+        start = stop
+    np.cumsum(degree, out=indptr[1:])
+
+    selfloop = np.zeros(n, dtype=bool)
+    if loops:
+        selfloop[index.lookup(np.concatenate(loops))] = True
+    nodes = index.nodes
+    if directory is not None:
+        indices.flush()
+        np.save(os.path.join(directory, 'nodes.npy'), nodes)
+        np.save(os.path.join(directory, 'indptr.npy'), indptr)
+        np.save(os.path.join(directory, 'selfloop.npy'), selfloop)
+    return CSRGraph(nodes, indptr, indices[:write], selfloop)
+
+
+def load_csr(directory, mmap_mode='r'):
+    '''
+    Open a CSRGraph written by read_edgelist_csr(..., directory=directory); the indices are memory-mapped
+    '''
+    indptr = np.load(os.path.join(directory, 'indptr.npy'))
+    indices = np.load(os.path.join(directory, 'indices.npy'), mmap_mode=mmap_mode)
+    return CSRGraph(np.load(os.path.join(directory, 'nodes.npy')), indptr, indices[:indptr[-1]],
+                    np.load(os.path.join(directory, 'selfloop.npy')))
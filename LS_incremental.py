@@ -0,0 +1,617 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental Local Search (LS) under edge insertions and deletions.
+
+One edge change only changes the degree of its two endpoints, hence only the maximum
+degree DAG around them, the part of the hierarchy forest hanging below the changed DAG
+edges, and the Local-BFS of the local leaders whose search read a changed node.
+IncrementalLS keeps the DAG, the forest, the root_decision table of the leaders and, for
+every node, the leaders whose Local-BFS read it (the node or its neighbour list), and
+recomputes only those parts for every batch of edge changes. Only local leaders can be
+community centers, so the decision graph is ranked over the L local leaders alone, with
+the dense rank of the degrees taken from a histogram of the degrees, and only the nodes
+whose local leader or whose leader's community changed are labelled again. A batch costs
+the part of the graph around the changed edges plus O(L log L + k_max) for the ranking
+(k_max the largest degree), where a full recompute costs O(n log n + m); measure_updates
+compares the two. When all local leaders have the same l_i every node gets the same
+positive l_i in the decision graph, and such a batch ranks all nodes again.
+
+The forest of degree_hierarchy_random_tree breaks ties with random numbers drawn in the
+order of a global BFS, which a local update cannot reproduce. Here ties are broken by a
+fixed random priority of every node instead (see degree_hierarchy_priority_tree_csr),
+so that the incrementally maintained state is exactly the one of a full recompute with
+the same priorities, which IncrementalLS.check verifies. The partitions are therefore
+not those of local_search_communities for the same seed when the forest has ties; the
+DAG is the same, and so is the whole partition when no node has two equally good
+parents in the forest.
+"""
+
+
+import glob
+import heapq
+import random
+import logging
+from bisect import bisect_left, insort
+from collections import deque
+from time import perf_counter
+import numpy as np
+import networkx as nx
+from LS_csr_engine import (degree_hierarchy_dag_csr, degree_hierarchy_priority_tree_csr,
+                           local_leader_superiors_csr, lap_time)
+from LS_algorithm import (LSResult, decision_graph, leader_decision, node_keys, resolve_community_roots,
+                          select_centers)
+from LS_datasets import load_networkx
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalLS(object):
+    '''
+    LS communities of a graph that changes by batches of edge insertions and deletions.
+
+    Ties in the forest are broken by a fixed random priority of every node (seed), not by
+    the random draws of local_search_communities, so for the same seed the partitions
+    differ from those of local_search_communities on graphs whose forest has ties.
+
+    >>> inc = IncrementalLS(G, seed=seed)
+    >>> changed = inc.update(inserted=[(1, 2)], deleted=[(3, 4)])   # {node: new label}
+    >>> inc.partition()
+    '''
+
+    def __init__(self, G, center_num=None, seed=None):
+        '''
+        Input
+        -----
+        G -- simple networkx graph (self-loops are ignored)
+        center_num=None -- number of community centers, None for the finest partition
+        seed=None -- seed of the node priorities which break ties in the forest
+        '''
+        self.center_num = center_num
+        self._random = random.Random(seed)
+        self.nodes = []
+        self.index = {}
+        self.adj = []         # adjacency of every node, in insertion order as in networkx
+        self.priority = []
+        self.labels = []      # index of the community center of every node, -1 for none
+        for v in G.nodes:
+            self._add_node(v)
+        for v in G.nodes:
+            i = self.index[v]
+            for u in G.adj[v]:
+                if u != v:
+                    self.adj[i][self.index[u]] = None
+        self._load(self.full_recompute())
+
+    def _add_node(self, v):
+        i = len(self.nodes)
+        self.index[v] = i
+        self.nodes.append(v)
+        self.adj.append({})
+        self.priority.append(self._random.random())
+        self.labels.append(-1)
+        return i
+
+    def _load(self, state):
+        '''set all incremental structures from a full recompute'''
+        n = len(self.nodes)
+        self.deg = [len(a) for a in self.adj]
+        # number of nodes of every degree, for the dense rank of the degrees
+        self.degree_count = np.bincount(np.array(self.deg, dtype=np.int64), minlength=1)
+        self.knnmax = [max((self.deg[u] for u in a), default=-1) for a in self.adj]
+        self.succ = [[] for _ in range(n)]
+        self.pred = [set() for _ in range(n)]
+        for u, v in zip(state['src'].tolist(), state['dst'].tolist()):
+            self.succ[u].append(v)
+            self.pred[v].add(u)
+        self.dist = state['distance'].tolist()
+        self.parent = state['parent'].tolist()
+        self.root = state['root'].tolist()
+        self.children = np.bincount(state['parent'][state['parent'] >= 0], minlength=n).tolist()
+        # nodes of every tree of the forest, by root
+        self.members = {}
+        for x, r in enumerate(self.root):
+            self.members.setdefault(r, set()).add(x)
+        self.leaders = state['leaders'].tolist()
+        self.superiors = {s: (w, p) for s, w, p in zip(self.leaders, state['superior'].tolist(),
+                                                       state['path'].tolist())}
+        result = state['result']
+        self.centers = result.centers
+        self.labels = result.labels.tolist()
+        self.leader_label = {s: self.labels[s] for s in self.leaders}
+        # labels may come from centers which are not local leaders (see _rank)
+        self.relabel_all = False
+        # nodes read by the Local-BFS of every leader with a superior, and the leaders which read every node
+        self.watched = {}
+        self.watchers = {}
+        for s, (w, p) in self.superiors.items():
+            if p >= 0:
+                self._watch(s, self._superior(s)[1])
+        # union-find of the connected components, kept under insertions only (None: to be rebuilt)
+        self.component = None
+
+    def full_recompute(self):
+        '''
+        DAG, forest, local leaders, root_decision and partition of the current graph from scratch
+        '''
+        n = len(self.nodes)
+        degree = np.array([len(a) for a in self.adj], dtype=np.int64)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degree, out=indptr[1:])
+        indices = np.fromiter((u for a in self.adj for u in a), dtype=np.int64, count=int(indptr[-1]))
+        src, dst = degree_hierarchy_dag_csr(indptr, indices, degree)
+        parent, root, distance = degree_hierarchy_priority_tree_csr(n, src, dst, np.array(self.priority))
+        children = np.bincount(parent[parent >= 0], minlength=n)
+        leaders = np.flatnonzero((parent < 0) & (children > 0))
+        superior, path = local_leader_superiors_csr(indptr, indices, degree, leaders)
+        return dict(src=src, dst=dst, parent=parent, root=root, distance=distance, leaders=leaders,
+                    superior=superior, path=path,
+                    result=self._partition(degree, root, leaders, superior, path))
+
+    def _partition(self, degree, root, leaders, superior, path):
+        decision_l, decision_value, decision_order = decision_graph(self.nodes, degree, leaders, path)
+        hierarchy = LSResult(nodes=self.nodes, degree=degree, root=np.asarray(root), leaders=leaders,
+                             superior=superior, path=path, decision_l=decision_l,
+                             decision_value=decision_value, decision_order=decision_order)
+        return select_centers(hierarchy, center_num=self.center_num)
+
+    def _out_edges(self, x):
+        '''final DAG out-edges of x, see degree_hierarchy_dag_csr'''
+        deg = self.deg
+        knnmax = self.knnmax
+        kmax = knnmax[x]
+        if kmax < deg[x]:
+            return []
+        dx = deg[x]
+        # y->x was added first when y comes earlier and x is one of its candidates
+        return [y for y in self.adj[x] if deg[y] == kmax
+                and not (y < x and knnmax[y] == dx and knnmax[y] >= deg[y])]
+
+    def _key(self, x):
+        # DAG edges always point to a larger key, so nodes are settled in decreasing key order
+        return (self.deg[x], self.knnmax[x] > self.deg[x], x)
+
+    def _tree_position(self, x):
+        out = self.succ[x]
+        if not out:
+            return 0, -1, x
+        dist = self.dist
+        d = min(dist[y] for y in out)
+        p = min((y for y in out if dist[y] == d), key=lambda y: (self.priority[y], y))
+        return d + 1, p, self.root[p]
+
+    def _superior(self, s):
+        '''
+        Local-BFS from the local leader s, as BFS_from_s
+
+        Return
+        ------
+        (w, p), read -- the superior and path length, and the nodes the search read: s and the
+                        neighbours of every node it expanded (their degrees, neighbour lists and
+                        leader status decide the result, so it stays valid while none of them changes)
+        '''
+        deg = self.deg
+        seen = {s}
+        path = {s: 0}
+        queue = deque([s])
+        read = {s}
+        while queue:
+            vertex = queue.popleft()
+            read.update(self.adj[vertex])
+            nodes = [u for u in self.adj[vertex] if u not in seen]
+            nodes.sort(key=deg.__getitem__, reverse=True)
+            for w in nodes:
+                path[w] = path[vertex] + 1
+                queue.append(w)
+                seen.add(w)
+                if w in self.superiors and deg[w] > deg[s]:
+                    return (w, path[w]), read
+        return (s, -1), read
+
+    def _watch(self, s, read):
+        self.watched[s] = read
+        for x in read:
+            self.watchers.setdefault(x, set()).add(s)
+
+    def _unwatch(self, s):
+        for x in self.watched.pop(s, ()):
+            watchers = self.watchers[x]
+            watchers.discard(s)
+            if not watchers:
+                del self.watchers[x]
+
+    def _count_degree(self, old, new):
+        if new >= len(self.degree_count):
+            grown = np.zeros(max(new + 1, 2 * len(self.degree_count)), dtype=np.int64)
+            grown[:len(self.degree_count)] = self.degree_count
+            self.degree_count = grown
+        if old is not None:
+            self.degree_count[old] -= 1
+        self.degree_count[new] += 1
+
+    def _move(self, x, old_root, new_root):
+        members = self.members[old_root]
+        members.discard(x)
+        if not members:
+            del self.members[old_root]
+        self.members.setdefault(new_root, set()).add(x)
+
+    def _leader_arrays(self):
+        leaders = np.array(self.leaders, dtype=np.int64)
+        superior = np.array([self.superiors[s][0] for s in self.leaders], dtype=np.int64)
+        path = np.array([self.superiors[s][1] for s in self.leaders], dtype=np.int64)
+        return leaders, superior, path
+
+    def _rank(self, relabel):
+        '''
+        Centers and labels after a batch: the decision graph of the local leaders, then the
+        label of the nodes in relabel (whose local leader changed) and of the members of the
+        leaders whose community changed
+
+        Return
+        ------
+        list of the nodes whose label changed
+        '''
+        n = len(self.nodes)
+        leaders, superior, path = self._leader_arrays()
+        degree = np.array([self.deg[s] for s in self.leaders], dtype=np.int64)
+        _, value, other_standard = leader_decision(degree, path, np.cumsum(self.degree_count > 0), n)
+        if other_standard > 0 and len(leaders) < n:
+            # all l_i are equal, so the other nodes have positive values too and may be centers
+            result = self._partition(np.array(self.deg, dtype=np.int64), self.root, leaders, superior, path)
+            self.centers = result.centers
+            labels = result.labels.tolist()
+            changed = [x for x in range(n) if labels[x] != self.labels[x]]
+            self.labels = labels
+            self.leader_label = {s: labels[s] for s in self.leaders}
+            self.relabel_all = True
+            return changed
+
+        # the other nodes have value 0, so the first center_num leaders are the centers of select_centers
+        order = np.lexsort((node_keys([self.nodes[s] for s in self.leaders]), value))[::-1]
+        top = order[:self.center_num or len(leaders)]
+        top = top[value[top] > 0]
+        self.centers = leaders[top]
+        is_center = np.zeros(len(leaders), dtype=bool)
+        is_center[top] = True
+        # leaders point to their superior, itself a leader (or the leader itself if none)
+        resolved = resolve_community_roots(np.searchsorted(leaders, superior), is_center)
+        leader_label = dict(zip(self.leaders, np.where(resolved >= 0, leaders[np.maximum(resolved, 0)], -1).tolist()))
+        if self.relabel_all:
+            candidates = range(n)
+            self.relabel_all = False
+        else:
+            candidates = set(relabel)
+            old = self.leader_label
+            for s in old.keys() | leader_label.keys():
+                if old.get(s, -1) != leader_label.get(s, -1):
+                    candidates.update(self.members.get(s, ()))
+        # every node is in the community of its local leader, -1 outside the trees of leaders
+        changed = []
+        for x in candidates:
+            label = leader_label.get(self.root[x], -1)
+            if label != self.labels[x]:
+                self.labels[x] = label
+                changed.append(x)
+        self.leader_label = leader_label
+        return changed
+
+    def _find(self, x):
+        component = self.component
+        root = x
+        while component[root] != root:
+            root = component[root]
+        while component[x] != root:
+            component[x], x = root, component[x]
+        return root
+
+    def _union(self, x, y):
+        x, y = self._find(x), self._find(y)
+        if x != y:
+            self.component[max(x, y)] = min(x, y)
+
+    def _build_components(self):
+        self.component = list(range(len(self.nodes)))
+        for x, a in enumerate(self.adj):
+            for y in a:
+                if y < x:
+                    self._union(x, y)
+
+    def update(self, inserted=(), deleted=(), nodes=(), stats=None):
+        '''
+        Apply a batch of edge deletions and then insertions, given as (u, v) or networkx
+        edge tuples; unknown nodes in inserted edges are added to the graph, as well as
+        the unknown ones in nodes (isolated unless an inserted edge reaches them).
+
+        Input
+        -----
+        stats=None -- dict which gets the wall time of every step in stats['time'] ('edges',
+                      'dag', 'forest', 'local_bfs', 'ranking', added up over batches), and the
+                      numbers of changed nodes, of leaders searched again and of relabelled nodes
+
+        Return
+        ------
+        {node: new label} for every node whose community center changed (-1 for none)
+        '''
+        tic = perf_counter()
+        first_new = len(self.nodes)
+        changed_nodes = set()
+        for edge in deleted:
+            u, v = edge[:2]
+            i = self.index.get(u)
+            j = self.index.get(v)
+            if i is None or j is None or j not in self.adj[i]:
+                continue
+            del self.adj[i][j]
+            del self.adj[j][i]
+            changed_nodes.update((i, j))
+        # deletions may split components, the union-find is rebuilt at the next batch without them
+        if changed_nodes:
+            self.component = None
+        elif self.component is None:
+            self._build_components()
+        inserted_nodes = set()
+        for v in nodes:
+            if v not in self.index:
+                inserted_nodes.add(self._new_node(v))
+        for edge in inserted:
+            u, v = edge[:2]
+            if u == v:
+                continue
+            i = self.index[u] if u in self.index else self._new_node(u)
+            j = self.index[v] if v in self.index else self._new_node(v)
+            if j in self.adj[i]:
+                continue
+            self.adj[i][j] = None
+            self.adj[j][i] = None
+            inserted_nodes.update((i, j))
+            if self.component is not None:
+                self._union(i, j)
+        changed_nodes |= inserted_nodes
+        tic = lap_time(stats, 'edges', tic)
+        if not changed_nodes:
+            return {}
+
+        # (a). degrees, neighbour maxima and DAG out-edges around the changed nodes
+        deg = self.deg
+        for x in changed_nodes:
+            self._count_degree(deg[x], len(self.adj[x]))
+            deg[x] = len(self.adj[x])
+        around = set(changed_nodes)
+        for x in changed_nodes:
+            around.update(self.adj[x])
+        for x in around:
+            self.knnmax[x] = max((deg[u] for u in self.adj[x]), default=-1)
+        recheck = set(around)
+        for x in around:
+            recheck.update(y for y in self.adj[x] if deg[y] == deg[x])
+        moved = []
+        for x in recheck:
+            out = self._out_edges(x)
+            if out != self.succ[x]:
+                for y in self.succ[x]:
+                    self.pred[y].discard(x)
+                for y in out:
+                    self.pred[y].add(x)
+                self.succ[x] = out
+                moved.append(x)
+        tic = lap_time(stats, 'dag', tic)
+
+        # (b). forest: settle the affected nodes by decreasing key, their successors first
+        heap = [(tuple(-k for k in self._key(x)), x) for x in set(moved) | changed_nodes]
+        heapq.heapify(heap)
+        queued = set(x for _, x in heap)
+        touched = set()
+        # nodes whose local leader changed
+        relabel = set(range(first_new, len(self.nodes)))
+        while heap:
+            _, x = heapq.heappop(heap)
+            queued.discard(x)
+            position = self._tree_position(x)
+            if position == (self.dist[x], self.parent[x], self.root[x]):
+                continue
+            old_parent, old_root = self.parent[x], self.root[x]
+            self.dist[x], self.parent[x], self.root[x] = position
+            if old_root != self.root[x]:
+                self._move(x, old_root, self.root[x])
+                relabel.add(x)
+            if old_parent != self.parent[x]:
+                if old_parent >= 0:
+                    self.children[old_parent] -= 1
+                    touched.add(old_parent)
+                if self.parent[x] >= 0:
+                    self.children[self.parent[x]] += 1
+                    touched.add(self.parent[x])
+            touched.add(x)
+            for y in self.pred[x]:
+                if y not in queued:
+                    queued.add(y)
+                    heapq.heappush(heap, (tuple(-k for k in self._key(y)), y))
+
+        # (c). local leaders which appeared or disappeared
+        status = set()
+        for x in touched | changed_nodes:
+            leader = self.parent[x] < 0 and self.children[x] > 0
+            if leader != (x in self.superiors):
+                status.add(x)
+        old_superiors = self.superiors
+        for x in status:
+            if x in old_superiors:
+                del old_superiors[x]
+                self._unwatch(x)
+                del self.leaders[bisect_left(self.leaders, x)]
+            else:
+                old_superiors[x] = None
+                insort(self.leaders, x)
+        tic = lap_time(stats, 'forest', tic)
+
+        # (d). Local-BFS again only for leaders whose search read a changed node
+        changed = changed_nodes | status
+        redo = set(s for c in changed for s in self.watchers.get(c, ()))
+        # a leader without superior has the largest leader degree in its component; it can only get
+        # one from a changed leader of larger degree, or from an insertion joining a larger leader
+        redo.update(s for s in changed if s in old_superiors)
+        if self.component is None:
+            top = max((deg[s] for s in old_superiors), default=-1)
+            changed_top = max((deg[c] for c in changed if c in old_superiors), default=-1)
+            for s, v in old_superiors.items():
+                if v is None or (v[1] < 0 and (changed_top > deg[s] or (inserted_nodes and top > deg[s]))):
+                    redo.add(s)
+        else:
+            # after insertions only (degrees only grow), the largest leader degree of a component
+            # touched by the batch is that of its changed leaders or of its leaders without superior
+            touched = set(self._find(c) for c in changed)
+            unranked = [s for s, v in old_superiors.items() if v is not None and v[1] < 0]
+            largest = {}
+            for s in unranked + [c for c in changed if c in old_superiors]:
+                r = self._find(s)
+                if r in touched and deg[s] > largest.get(r, -1):
+                    largest[r] = deg[s]
+            redo.update(s for s in unranked if largest.get(self._find(s), -1) > deg[s])
+        for s in redo:
+            self.superiors[s] = None
+        for s in redo:
+            self._unwatch(s)
+            self.superiors[s], read = self._superior(s)
+            if self.superiors[s][1] >= 0:
+                self._watch(s, read)
+        tic = lap_time(stats, 'local_bfs', tic)
+
+        # (e). decision graph of the leaders and labels
+        diff = set(self._rank(relabel)) | set(range(first_new, len(self.nodes)))
+        lap_time(stats, 'ranking', tic)
+        if stats is not None:
+            stats['changed'] = stats.get('changed', 0) + len(changed_nodes)
+            stats['redo'] = stats.get('redo', 0) + len(redo)
+            stats['relabelled'] = stats.get('relabelled', 0) + len(relabel)
+        nodes = self.nodes
+        labels = self.labels
+        return {nodes[i]: (nodes[labels[i]] if labels[i] >= 0 else -1) for i in sorted(diff)}
+
+    def _new_node(self, v):
+        i = self._add_node(v)
+        self.deg.append(0)
+        self.knnmax.append(-1)
+        self.succ.append([])
+        self.pred.append(set())
+        self.dist.append(0)
+        self.parent.append(-1)
+        self.root.append(i)
+        self.members[i] = {i}
+        self._count_degree(None, 0)
+        self.children.append(0)
+        if self.component is not None:
+            self.component.append(i)
+        return i
+
+    @property
+    def result(self):
+        '''LSResult of the current graph, with the decision graph of all nodes (computed on demand)'''
+        leaders, superior, path = self._leader_arrays()
+        return self._partition(np.array(self.deg, dtype=np.int64), self.root, leaders, superior, path)
+
+    def partition(self):
+        '''{node id: id of its community center, or -1}'''
+        nodes = self.nodes
+        return {v: (nodes[c] if c >= 0 else -1) for v, c in zip(nodes, self.labels)}
+
+    def check(self):
+        '''
+        Compare the incremental state with a full recompute; returns the list of differences (empty if none)
+        '''
+        full = self.full_recompute()
+        errors = []
+        succ = [[] for _ in self.nodes]
+        for u, v in zip(full['src'].tolist(), full['dst'].tolist()):
+            succ[u].append(v)
+        if succ != self.succ:
+            errors.append('DAG')
+        for key, mine in (('distance', self.dist), ('parent', self.parent), ('root', self.root)):
+            if full[key].tolist() != mine:
+                errors.append(key)
+        if full['leaders'].tolist() != self.leaders or self.leaders != sorted(self.superiors):
+            errors.append('leaders')
+        elif any(self.superiors[s] != (w, p) for s, w, p in zip(full['leaders'].tolist(), full['superior'].tolist(),
+                                                                 full['path'].tolist())):
+            errors.append('root_decision')
+        if not np.array_equal(full['result'].centers, self.centers):
+            errors.append('centers')
+        if full['result'].labels.tolist() != self.labels:
+            errors.append('labels')
+        return errors
+
+
+def _random_batches(G, rng, batches, batch_size):
+    # random edge deletions and insertions, applied to G too
+    nodes = list(G.nodes)
+    for _ in range(batches):
+        edges = list(G.edges)
+        deleted = rng.sample(edges, min(batch_size, len(edges)))
+        inserted = [tuple(rng.sample(nodes, 2)) for _ in range(batch_size)]
+        G.remove_edges_from(deleted)
+        G.add_edges_from(inserted)
+        yield inserted, deleted
+
+
+def verify_incremental(paths, batches=20, batch_size=10, seed=1):
+    '''
+    Apply random batches of edge deletions and insertions to every graph in paths and
+    check the incremental state against a full recompute after every batch.
+
+    Return
+    ------
+    list of (path, batch, differences) for every failed check
+    '''
+    rng = random.Random(seed)
+    failures = []
+    for path in paths:
+        G, _ = load_networkx(path)
+        inc = IncrementalLS(G, seed=seed)
+        for batch, (inserted, deleted) in enumerate(_random_batches(G, rng, batches, batch_size)):
+            inc.update(inserted=inserted, deleted=deleted)
+            errors = inc.check()
+            if errors:
+                failures.append((path, batch, errors))
+        logger.info('%s: %d batches checked', path, batches)
+    return failures
+
+
+def measure_updates(paths, batches=20, batch_size=10, seed=1):
+    '''
+    Cost of IncrementalLS.update against a full recompute, on random batches of edge
+    deletions and insertions (as verify_incremental) of every graph in paths
+
+    Return
+    ------
+    list of dicts, one per graph: nodes, edges, 'full' (seconds of full_recompute), 'update'
+    (mean seconds per batch), the mean seconds of every step of update (see its stats) and
+    the mean number of leaders searched again per batch ('redo')
+    '''
+    rng = random.Random(seed)
+    rows = []
+    for path in paths:
+        G, _ = load_networkx(path)
+        inc = IncrementalLS(G, seed=seed)
+        tic = perf_counter()
+        inc.full_recompute()
+        row = dict(graph=path, nodes=G.number_of_nodes(), edges=G.number_of_edges(), full=perf_counter() - tic)
+        stats = {}
+        seconds = 0.0
+        for inserted, deleted in _random_batches(G, rng, batches, batch_size):
+            tic = perf_counter()
+            inc.update(inserted=inserted, deleted=deleted, stats=stats)
+            seconds += perf_counter() - tic
+        row['update'] = seconds / batches
+        row.update((stage, seconds / batches) for stage, seconds in stats.get('time', {}).items())
+        row['redo'] = stats.get('redo', 0) / batches
+        rows.append(row)
+        logger.info('%s: %d nodes, full recompute %.4f s, update %.4f s per batch of %d+%d edges (%.1f leaders searched again)',
+                    path, row['nodes'], row['full'], row['update'], batch_size, batch_size, row['redo'])
+    return rows
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    paths = sorted(glob.glob('data/hierarchy_network/test/*.gml'))
+    failures = verify_incremental(paths)
+    print('Incremental LS agrees with a full recompute on %d graphs' % len(paths) if not failures else failures)
+    measure_updates(['polblogs', 'cora', 'citeseer', 'pubmed'])
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+k-nearest-neighbour networks of vector data, for high-dimensional data (MNIST, Olivetti).
+
+The epsilon-ball network needs the distances of all pairs and one global threshold,
+which suits data of varying density poorly. Here the exact k nearest neighbours of every
+point are found block by block: the distances of a block of rows to all points are
+computed with the kernels of LS_distance.py and reduced by np.argpartition. Blocks are
+sized so that the blocks of all worker threads, with the coordinate differences of the
+kernels that need them, fit in TILE_MEMORY together. The neighbour lists are
+then symmetrized into a CSRGraph, which LS accepts:
+- 'knn': i and j are linked if one is among the k nearest neighbours of the other;
+- 'mutual': if each is among the k nearest neighbours of the other;
+- 'snn': kNN links whose neighbour lists share at least min_shared points (shared
+  nearest neighbours), which cuts the links between clusters.
+"""
+
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from LS_csr_engine import CSRGraph
+from LS_distance import TILE_MEMORY, GRAM_DIMENSION, prepare_vectors, tile_distances
+
+SYMMETRIZATIONS = ('knn', 'mutual', 'snn')
+
+
+def _nearest(distance, k, offset):
+    '''
+    k smallest distances of every row (the point itself excluded), ties broken by the smaller index
+    '''
+    rows = np.arange(len(distance))
+    distance[rows, offset + rows] = np.inf
+    indices = np.argpartition(distance, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(distance, indices, axis=1)
+    order = np.lexsort((indices, values))
+    indices = np.take_along_axis(indices, order, axis=1)
+    # rows with ties at the k-th distance: take the smaller indices among all candidates
+    ties = np.flatnonzero((distance <= values.max(axis=1)[:, None]).sum(axis=1) > k)
+    for r in ties.tolist():
+        candidates = np.flatnonzero(distance[r] <= distance[r, indices[r, -1]])
+        indices[r] = candidates[np.argsort(distance[r, candidates], kind='stable')[:k]]
+    return indices.astype(np.int64), np.take_along_axis(distance, indices, axis=1)
+
+
+def _row_bytes(n, dimension, itemsize, metric, gram):
+    '''working memory of one row of a block: its distances and argpartition indices, and the kernel temporaries'''
+    if metric == 'cosine' or (metric == 'euclidean' and gram):
+        kernel = 0
+    elif metric == 'chebyshev' and dimension <= GRAM_DIMENSION:
+        # one coordinate at a time
+        kernel = 2 * itemsize
+    else:
+        # (rows, n, dimension) coordinate differences
+        kernel = dimension * itemsize
+    return n * (kernel + itemsize + 8)
+
+
+def knn_neighbours(X, k, metric='euclidean', dtype=np.float64, workers=None, gram=None, block=None):
+    '''
+    Exact k nearest neighbours of every row of X, computed block by block
+
+    Input
+    -----
+    X -- (n, dimension) array of vectors
+    k -- number of neighbours (the point itself is not counted)
+    metric, dtype, gram -- see LS_distance.pairwise_distances
+    workers -- number of threads (default: all cores)
+    block -- rows per block (default: the blocks of all workers are bounded by TILE_MEMORY)
+
+    Return
+    ------
+    indices, distances -- (n, k) arrays, the neighbours of every point by increasing distance
+    '''
+    X, gram = prepare_vectors(X, metric, dtype, gram)
+    n = len(X)
+    if not 0 < k < n:
+        raise ValueError('k must be between 1 and %d, not %r' % (n - 1, k))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if block is None:
+        row_bytes = _row_bytes(n, X.shape[1], X.itemsize, metric, gram)
+        block = max(1, min(1024, TILE_MEMORY // (row_bytes * workers)))
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k), dtype=dtype)
+
+    def fill(i0):
+        i1 = min(n, i0 + block)
+        indices[i0:i1], distances[i0:i1] = _nearest(tile_distances(X[i0:i1], X, metric, gram), k, i0)
+
+    starts = range(0, n, block)
+    if workers <= 1:
+        for i0 in starts:
+            fill(i0)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(fill, starts):
+                pass
+    return indices, distances
+
+
+def shared_neighbours(indices, start, end, chunk=1 << 22):
+    '''number of common points in the neighbour lists of start[e] and end[e], for every pair e'''
+    k = indices.shape[1]
+    step = max(1, chunk // (k * k))
+    shared = np.empty(len(start), dtype=np.int64)
+    for e in range(0, len(start), step):
+        a = indices[start[e:e + step]]
+        b = indices[end[e:e + step]]
+        shared[e:e + step] = (a[:, :, None] == b[:, None, :]).sum(axis=(1, 2))
+    return shared
+
+
+def symmetrize(indices, symmetrization='knn', min_shared=None):
+    '''
+    Undirected links of the neighbour lists (see the module docstring)
+
+    Return
+    ------
+    start, end -- int arrays of the pairs i < j, ordered by i then j
+    '''
+    if symmetrization not in SYMMETRIZATIONS:
+        raise ValueError('symmetrization must be one of %s, not %r' % (', '.join(SYMMETRIZATIONS), symmetrization))
+    n, k = indices.shape
+    source = np.repeat(np.arange(n, dtype=np.int64), k)
+    target = indices.reshape(-1)
+    # one code per unordered pair, counted once per direction in which it is a kNN link
+    code = np.minimum(source, target) * n + np.maximum(source, target)
+    code, count = np.unique(code, return_counts=True)
+    if symmetrization == 'mutual':
+        code = code[count == 2]
+    start, end = code // n, code % n
+    if symmetrization == 'snn':
+        if min_shared is None:
+            min_shared = k // 2
+        keep = shared_neighbours(indices, start, end) >= min_shared
+        start, end = start[keep], end[keep]
+    return start, end
+
+
+def knn_graph_csr(X, k=10, symmetrization='knn', min_shared=None, metric='euclidean', dtype=np.float64,
+                  workers=None, gram=None, block=None, reduction=None):
+    '''
+    k-nearest-neighbour network of the vectors X as a CSRGraph
+
+    Input
+    -----
+    X -- (n, dimension) array of vectors
+    k -- number of neighbours of every point
+    symmetrization -- 'knn', 'mutual' or 'snn' (see the module docstring)
+    min_shared -- shared neighbours needed by a 'snn' link (default: k // 2)
+    metric, dtype, workers, gram, block -- see knn_neighbours
+    reduction -- optional preprocessing of X, e.g. reducer('pca', 50) of LS_reduction.py
+
+    Return
+    ------
+    CSRGraph with node i the i-th row of X and neighbours in increasing order
+    '''
+    if reduction is not None:
+        X = reduction(X)
+    indices, _ = knn_neighbours(X, k, metric, dtype, workers, gram, block)
+    n = len(indices)
+    start, end = symmetrize(indices, symmetrization, min_shared)
+    src = np.concatenate((start, end))
+    dst = np.concatenate((end, start))
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return CSRGraph(np.arange(n), indptr, dst[order])
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Evaluation of partitions against ground-truth labels, from the contingency table.
+
+cal_auc counts the pairs of nodes with the same true label and the same predicted label
+one pair at a time, which is O(n^2). All those counts follow from the contingency table
+n_ij (nodes with true label i and predicted label j): the pairs within both labels are
+sum C(n_ij, 2), the pairs within a true label sum C(a_i, 2) and within a predicted label
+sum C(b_j, 2), with a_i and b_j the row and column sums. pair_scores gives precision,
+recall and F1 exactly as cal_auc, in O(n) plus the size of the table; NMI and ARI come
+from the same table, and modularity from the predicted labels and the graph.
+
+Labels are compared with == as in cal_auc, so -1 (no community) is one more label.
+"""
+
+
+import numpy as np
+import scipy.sparse as sp
+from LS_csr_engine import CSRGraph
+
+
+def label_codes(labels):
+    '''codes 0, 1, ... of the labels in order of first appearance (equal labels get equal codes)'''
+    codes = {}
+    return np.fromiter((codes.setdefault(label, len(codes)) for label in labels), dtype=np.int64,
+                       count=len(labels)), len(codes)
+
+
+def contingency_table(y_true, y_pred):
+    '''
+    Sparse contingency table of two labelings of the same nodes
+
+    Return
+    ------
+    scipy.sparse.csr_matrix, n_ij = number of nodes with the i-th true label and the j-th predicted label
+    '''
+    if len(y_true) != len(y_pred):
+        raise ValueError('y_true and y_pred have different lengths (%d, %d)' % (len(y_true), len(y_pred)))
+    true, k = label_codes(y_true)
+    pred, c = label_codes(y_pred)
+    table = sp.coo_matrix((np.ones(len(true), dtype=np.int64), (true, pred)), shape=(k, c)).tocsr()
+    table.sum_duplicates()
+    return table
+
+
+def _pairs(counts):
+    # number of pairs C(x, 2) summed, as an exact Python integer
+    counts = np.asarray(counts, dtype=np.int64)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def pair_counts(table):
+    '''
+    TP, FP, FN, TN of the pairs of nodes (TP: same true and same predicted label, FP:
+    different true and same predicted label, FN: same true and different predicted label)
+    '''
+    n = int(table.sum())
+    TP = _pairs(table.data)
+    same_true = _pairs(np.asarray(table.sum(axis=1)).ravel())
+    same_pred = _pairs(np.asarray(table.sum(axis=0)).ravel())
+    FP = same_pred - TP
+    FN = same_true - TP
+    TN = n * (n - 1) // 2 - TP - FP - FN
+    return TP, FP, FN, TN
+
+
+def pair_scores(y_pred, y_true, table=None):
+    '''
+    precision, recall, F1 of the pairs of nodes, equal to cal_auc(y_pred, y_true)
+    '''
+    if table is None:
+        table = contingency_table(y_true, y_pred)
+    TP, FP, FN, _ = pair_counts(table)
+    precision = 0 if TP + FP == 0 else TP / (TP + FP)
+    recall = 0 if TP + FN == 0 else TP / (TP + FN)
+    F1 = 0 if 2 * TP + FP + FN == 0 else 2 * TP / (2 * TP + FP + FN)
+    return precision, recall, F1
+
+
+def _entropy(counts, n):
+    p = counts[counts > 0] / n
+    return float(-(p * np.log(p)).sum())
+
+
+def normalized_mutual_information(y_true, y_pred, table=None):
+    '''
+    NMI with the arithmetic mean of the two entropies as normalization (1 for two
+    labelings with one label each)
+    '''
+    if table is None:
+        table = contingency_table(y_true, y_pred)
+    n = table.sum()
+    a = np.asarray(table.sum(axis=1)).ravel()
+    b = np.asarray(table.sum(axis=0)).ravel()
+    if len(a) == len(b) == 1:
+        return 1.0
+    coo = table.tocoo()
+    nij = coo.data.astype(np.float64)
+    mutual = float((nij / n * (np.log(nij * n) - np.log(a[coo.row] * b[coo.col].astype(np.float64)))).sum())
+    normalization = (_entropy(a, n) + _entropy(b, n)) / 2
+    if normalization == 0:
+        return 0.0
+    return max(mutual, 0.0) / normalization
+
+
+def adjusted_rand_index(y_true, y_pred, table=None):
+    '''ARI of Hubert and Arabie (1 for identical labelings, about 0 for random ones)'''
+    if table is None:
+        table = contingency_table(y_true, y_pred)
+    n = int(table.sum())
+    TP = _pairs(table.data)
+    same_true = _pairs(np.asarray(table.sum(axis=1)).ravel())
+    same_pred = _pairs(np.asarray(table.sum(axis=0)).ravel())
+    total = n * (n - 1) // 2
+    if total == 0:
+        return 1.0
+    expected = same_true * same_pred / total
+    maximum = (same_true + same_pred) / 2
+    if maximum == expected:
+        return 1.0
+    return (TP - expected) / (maximum - expected)
+
+
+def modularity(G, labels):
+    '''
+    Modularity of the partition of G given by labels (aligned with G.nodes, or with the
+    nodes of a CSRGraph; every label, -1 included, is one community); self-loops ignored
+    '''
+    csr = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+    codes, c = label_codes(labels)
+    if len(codes) != csr.number_of_nodes():
+        raise ValueError('one label per node is required')
+    degree = csr.degree.astype(np.float64)
+    m2 = degree.sum()
+    if m2 == 0:
+        return 0.0
+    source = np.repeat(np.arange(len(degree)), csr.degree)
+    # twice the edges within every community, and the degree sum of every community
+    inside = np.bincount(codes[source][codes[source] == codes[csr.indices]], minlength=c)
+    total = np.bincount(codes, weights=degree, minlength=c)
+    return float((inside / m2).sum() - ((total / m2) ** 2).sum())
+
+
+def evaluate_partition(y_pred, y_true, G=None):
+    '''
+    All scores of a predicted labeling: precision, recall, F1 (as cal_auc), NMI, ARI, and
+    modularity of the predicted partition if the graph G is given
+
+    Return
+    ------
+    dict
+    '''
+    table = contingency_table(y_true, y_pred)
+    precision, recall, F1 = pair_scores(y_pred, y_true, table)
+    scores = dict(precision=precision, recall=recall, F1=F1,
+                  NMI=normalized_mutual_information(y_true, y_pred, table),
+                  ARI=adjusted_rand_index(y_true, y_pred, table))
+    if G is not None:
+        scores['modularity'] = modularity(G, y_pred)
+    return scores
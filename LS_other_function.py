@@ -7,6 +7,8 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator
 import matplotlib.colors as mc
 import colorsys
+from LS_metrics import pair_scores
+from LS_datasets import load_networkx
 
 # 绘图字体设置
 plt.rcParams['font.sans-serif'] = ['Times New Roman']
@@ -54,29 +56,25 @@ def load_graph(Compound_list,data_id):
        G：networkx中的图结构(数据类型：nx.Graph)
        y_true：每一个节点的标签(数据类型：list)
     '''
-    # load graph
+    # load graph (GML files are parsed once and then read from their binary bundle, see LS_datasets.py)
     if data_id in [2,3,4,5,6,7]:
         Compound = Compound_list[data_id]
-        G = nx.read_gml(Compound,label='id')  # load a default graph
+        G, values = load_networkx(Compound)  # load a default graph
     elif data_id == 0:
         G = nx.karate_club_graph()   # 空手道俱乐部
     elif data_id in [1]:
         Compound = Compound_list[data_id]
-        G1 = nx.read_gml(Compound,label='id')
+        G1, values = load_networkx(Compound)
         G = direct_to_undirect_id(G1)
     
     # load true community
     if data_id in [2,3,4,6,7]:
-        labels = nx.get_node_attributes(G,'value')
-        y_true = list(labels.values())
+        y_true = [value for value in values if value is not None]
     elif data_id in [0,1,5]:
         if data_id == 0:
-            labels = nx.get_node_attributes(G,'club')
-        elif data_id == 1:
-            labels = nx.get_node_attributes(G1,'value')
+            y = list(nx.get_node_attributes(G,'club').values())
         else:
-            labels = nx.get_node_attributes(G,'value')
-        y = list(labels.values())
+            y = [value for value in values if value is not None]
         # 将标签用数字表示，从0开始逐渐增大
         y_true_dict = {}
         k = 0
@@ -383,52 +381,8 @@ def cal_auc(y_pred,y_true):
     return:
        precesion,recall,F1：评价指标(数据类型：float,float,float)
     '''
-    labels = {}
-    for index,label in enumerate(y_true):
-        if label not in labels.keys():
-            labels[label] = []
-            labels[label].append(index)
-        else:
-            labels[label].append(index)
-    TP = 0
-    FP = 0
-    TP_all = 0
-    FP_all = 0
-    # check True(同一标签组的比较)
-    for label in labels.keys():
-        index_list = labels[label]
-        for i in range(len(index_list))[:-1]:
-            for j in range(len(index_list))[i+1:]:
-                TP_all += 1
-                if y_pred[index_list[i]] == y_pred[index_list[j]]:
-                    TP += 1
-    FN = TP_all - TP             
-    # check False(不同标签组的比较)
-    label_list = list(labels.keys())
-    for i in range(len(label_list))[:-1]:
-        for j in range(len(label_list))[i+1:]:
-            index_list1 = labels[label_list[i]] 
-            index_list2 = labels[label_list[j]]
-            for k in index_list1:
-                for t in index_list2:
-                    FP_all += 1
-                    if y_pred[k] == y_pred[t]:
-                        FP += 1
-    TN = FP_all - FP
-#     print('TP,FP,FN,TN:',TP,FP,FN,TN)
-    if TP+FP == 0:
-        precesion = 0
-    else:
-        precesion = TP/(TP+FP)
-    if TP+FN == 0:
-        recall = 0
-    else:
-        recall =  TP/(TP+FN)
-    if 2 * TP + FP + FN == 0:
-        F1 = 0
-    else:
-        F1 = 2 * TP /( 2 * TP + FP + FN)
-    return precesion,recall,F1
+    # 由列联表计数,与逐对比较结果相同 (see LS_metrics.py)
+    return pair_scores([y_pred[index] for index in range(len(y_true))],y_true)
 
 # 2、层级网络相关函数
 # 绘制层级网络的邻接矩阵分布图
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Percolation sweep of epsilon-ball networks, for choosing the threshold epsilon (cal_jumppoint).
+
+Two points are in the same component of the network of all pairs within distance dc if
+and only if they are in the same component of the minimum spanning tree (MST) edges of
+length <= dc. So the sizes of the giant (GCC) and second giant (SGCC) components for
+all thresholds come from one pass of a size-tracking union-find over the n-1 MST edges
+sorted by length, instead of rebuilding the network for every threshold.
+"""
+
+
+import numpy as np
+from LS_distance import condensed_row_starts, condensed_size, prepare_vectors, tile_distances
+
+
+def _distances_from(dis, v, starts, n):
+    '''distances from v to all points, from a condensed or square distance array'''
+    if starts is None:
+        return np.asarray(dis[v], dtype=np.float64)
+    u = np.arange(n, dtype=np.int64)
+    position = np.where(u < v, starts[np.minimum(u, v)] + v - u - 1, starts[v] + u - v - 1)
+    row = np.asarray(dis[np.clip(position, 0, max(len(dis) - 1, 0))], dtype=np.float64)
+    row[v] = 0
+    return row
+
+
+def _point_count(dis, X):
+    '''number of points of a condensed or square distance array, or of the vectors X'''
+    if dis is not None:
+        return len(dis) if np.ndim(dis) == 2 else condensed_size(len(dis))
+    return len(X)
+
+
+def minimum_spanning_edges(dis=None, X=None, metric='euclidean'):
+    '''
+    Minimum spanning tree of the complete distance graph (Prim), without sorting all pairs
+
+    Input
+    -----
+    dis -- condensed or square distance array (see caldistance); or
+    X, metric -- vectors and the metric of LS_distance, then no distance array is stored
+
+    Return
+    ------
+    start, end, length -- the n-1 MST edges
+    '''
+    if dis is not None:
+        n = _point_count(dis, X)
+        starts = None if np.ndim(dis) == 2 else condensed_row_starts(n)
+        row = lambda v: _distances_from(dis, v, starts, n)
+    else:
+        X, gram = prepare_vectors(X, metric)
+        n = len(X)
+        row = lambda v: tile_distances(X[v:v + 1], X, metric, gram)[0]
+    best = np.full(n, np.inf)
+    nearest = np.zeros(n, dtype=np.int64)
+    in_tree = np.zeros(n, dtype=bool)
+    start = np.zeros(max(n - 1, 0), dtype=np.int64)
+    end = np.zeros(max(n - 1, 0), dtype=np.int64)
+    length = np.zeros(max(n - 1, 0))
+    v = 0
+    for k in range(n - 1):
+        in_tree[v] = True
+        distance = row(v)
+        closer = (distance < best) & ~in_tree
+        best[closer] = distance[closer]
+        nearest[closer] = v
+        best[v] = np.inf
+        candidates = np.where(in_tree, np.inf, best)
+        v = int(np.argmin(candidates))
+        start[k], end[k], length[k] = nearest[v], v, best[v]
+        best[v] = np.inf
+    return start, end, length
+
+
+def component_sizes(n, start, end, length, thresholds):
+    '''
+    Sizes of the largest and second largest components of the network of the edges with
+    length <= dc, for every dc in thresholds, by a union-find over the edges sorted by length
+
+    Return
+    ------
+    gcc, sgcc -- int arrays aligned with thresholds (sgcc is 0 for a connected network)
+    '''
+    parent = np.arange(n)
+    size = np.ones(n, dtype=np.int64)
+    # count[s]: number of components of size s
+    count = np.zeros(max(n, 1) + 1, dtype=np.int64)
+    count[1] = n
+    largest = 1 if n > 0 else 0
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    order = np.argsort(length, kind='stable')
+    start = np.asarray(start)[order].tolist()
+    end = np.asarray(end)[order].tolist()
+    length = np.asarray(length)[order]
+    thresholds = np.asarray(thresholds)
+    gcc = np.zeros(len(thresholds), dtype=np.int64)
+    sgcc = np.zeros(len(thresholds), dtype=np.int64)
+    # edges to merge before each threshold, thresholds in increasing order
+    stops = np.searchsorted(length, thresholds, side='right')
+    merged = 0
+    for t in np.argsort(thresholds, kind='stable').tolist():
+        while merged < stops[t]:
+            a = find(start[merged])
+            b = find(end[merged])
+            merged += 1
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            count[size[a]] -= 1
+            count[size[b]] -= 1
+            parent[b] = a
+            size[a] += size[b]
+            count[size[a]] += 1
+            largest = max(largest, int(size[a]))
+        gcc[t] = largest
+        if count[largest] > 1:
+            sgcc[t] = largest
+        else:
+            # the second largest size is the largest one below the giant component
+            below = np.flatnonzero(count[:largest])
+            sgcc[t] = below[-1] if len(below) > 0 else 0
+    return gcc, sgcc
+
+
+def jump_point(sgcc):
+    '''
+    Index of the percolation transition: the first threshold where the second giant component is the largest
+    '''
+    return int(np.argmax(sgcc))
+
+
+def percolation_sweep(dis=None, X=None, metric='euclidean', thresholds=None):
+    '''
+    GCC and SGCC (fractions of the nodes) of the epsilon-ball network for every threshold
+
+    Input
+    -----
+    dis -- condensed or square distance array; or X, metric (see minimum_spanning_edges)
+    thresholds -- distance thresholds (default: chose_dc_gradual(dis), which needs dis)
+
+    Return
+    ------
+    thresholds, gcc, sgcc, jump -- jump is the index of the threshold at the jump point (see jump_point)
+    '''
+    if thresholds is None:
+        from LS_cluster_function import chose_dc_gradual
+        thresholds = chose_dc_gradual(dis)
+    start, end, length = minimum_spanning_edges(dis, X, metric)
+    # not len(length) + 1, which is 1 for no points as well as for one
+    n = _point_count(dis, X)
+    gcc, sgcc = component_sizes(n, start, end, length, thresholds)
+    gcc = gcc / max(n, 1)
+    sgcc = sgcc / max(n, 1)
+    return thresholds, gcc, sgcc, jump_point(sgcc)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming clustering of vector data: points arrive in mini-batches and join the
+epsilon-ball network at a fixed threshold dc.
+
+StreamingLS keeps a spatial index of the points and an IncrementalLS of the network.
+Every batch finds the epsilon-neighbours of its points among the earlier points (and
+among each other), and hands the new edges to IncrementalLS, which updates the degrees,
+the dominance tree and the labels around them only. dc is fixed when the stream starts
+(given, or chose_dc of the first points) and changes only on recalibrate, which rebuilds
+the network from all points.
+
+A KD-tree cannot take new points, so the index is a logarithmic set of KD-trees
+(Bentley and Saxe): new points wait in a small buffer which is searched directly, a full
+buffer becomes a tree, and trees of similar size are merged into one, so every point is
+moved O(log n) times and a query searches O(log n) trees.
+"""
+
+
+import numpy as np
+import networkx as nx
+from scipy.spatial import cKDTree
+from LS_incremental import IncrementalLS
+from LS_vector_graph import MINKOWSKI_P, prepare_points, chose_dc_points, epsilon_pairs, pair_distances
+
+
+class GrowingIndex(object):
+    '''
+    Points which can be appended and searched within a radius: a buffer and KD-trees of
+    decreasing size (a tree holds the points of ids[k] in the order of its data)
+    '''
+
+    def __init__(self, dimension, metric='euclidean', buffer_size=256):
+        self.metric = metric
+        self.buffer_size = buffer_size
+        self.levels = []        # (cKDTree, ids), largest first
+        self.buffer = np.zeros((0, dimension))
+        self.buffer_ids = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.buffer_ids) + sum(len(ids) for _, ids in self.levels)
+
+    def add(self, points, ids):
+        self.buffer = np.concatenate((self.buffer, points))
+        self.buffer_ids = np.concatenate((self.buffer_ids, ids))
+        if len(self.buffer_ids) < self.buffer_size:
+            return
+        points, ids = self.buffer, self.buffer_ids
+        # merge with every smaller tree, like the carry of a binary counter
+        while self.levels and len(self.levels[-1][1]) <= len(ids):
+            tree, level_ids = self.levels.pop()
+            points = np.concatenate((tree.data, points))
+            ids = np.concatenate((level_ids, ids))
+        self.levels.append((cKDTree(points), ids))
+        self.buffer = self.buffer[:0]
+        self.buffer_ids = self.buffer_ids[:0]
+
+    def query_radius(self, Y, r):
+        '''
+        (row of Y, id) of the indexed points within distance about r (slightly more, the
+        caller checks the exact distance)
+        '''
+        rows, found = [], []
+        for tree, ids in self.levels:
+            neighbours = tree.query_ball_point(Y, r * (1 + 1e-9) + 1e-300, p=MINKOWSKI_P[self.metric])
+            counts = np.fromiter((len(k) for k in neighbours), dtype=np.int64, count=len(Y))
+            if counts.sum() > 0:
+                rows.append(np.repeat(np.arange(len(Y)), counts))
+                found.append(ids[np.concatenate([k for k in neighbours if k]).astype(np.int64)])
+        if len(self.buffer_ids) > 0:
+            # the Chebyshev distance is at most the Euclidean one, so this keeps all candidates
+            diff = np.abs(Y[:, None, :] - self.buffer[None, :, :])
+            near = diff.max(axis=-1) <= r * (1 + 1e-9) + 1e-300
+            row, column = np.nonzero(near)
+            rows.append(row)
+            found.append(self.buffer_ids[column])
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(found)
+
+
+class StreamingLS(object):
+    '''
+    LS communities of vector data arriving in mini-batches
+
+    >>> stream = StreamingLS(X0, dc_percent=6, order=1)
+    >>> changed = stream.insert(batch)     # {point: new label}
+    >>> stream.labels()
+
+    Input
+    -----
+    X -- initial points (optional if dc is given)
+    dc -- the threshold; or
+    dc_percent -- the threshold as chose_dc(distance, dc_percent) of the initial points
+    order -- metric of caldistance (0: Euclidean, otherwise Chebyshev)
+    center_num, seed -- see IncrementalLS
+    buffer_size -- points searched directly before they go into a KD-tree
+    '''
+
+    def __init__(self, X=None, dc=None, dc_percent=6, order=1, center_num=None, seed=None, buffer_size=256):
+        self.metric = 'euclidean' if order == 0 else 'chebyshev'
+        self.center_num = center_num
+        self.seed = seed
+        self.buffer_size = buffer_size
+        if X is None:
+            if dc is None:
+                raise ValueError('dc is required without initial points')
+            # the dimension is set by the first batch
+            X = np.zeros((0, 0))
+        else:
+            X = prepare_points(X, self.metric)
+        self.X = X
+        self.n = len(X)
+        self.dc = dc
+        self.recalibrate(dc=dc, dc_percent=None if dc is not None else dc_percent)
+
+    def recalibrate(self, dc=None, dc_percent=None):
+        '''
+        Set a new threshold (dc, or chose_dc(distance, dc_percent) of all points so far)
+        and rebuild the network and the index from all points
+        '''
+        X = self.X[:self.n]
+        if dc is None:
+            if dc_percent is None:
+                raise ValueError('either dc or dc_percent is required')
+            dc, _ = chose_dc_points(X, dc_percent, self.metric)
+        self.dc = dc
+        G = nx.Graph()
+        G.add_nodes_from(range(self.n))
+        if self.n > 1:
+            start, end = epsilon_pairs(X, dc, self.metric)
+            G.add_edges_from(zip(start.tolist(), end.tolist()))
+        self.ls = IncrementalLS(G, center_num=self.center_num, seed=self.seed)
+        self.index = GrowingIndex(X.shape[1], self.metric, self.buffer_size)
+        if self.n > 0:
+            self.index.levels.append((cKDTree(X), np.arange(self.n)))
+
+    def _append(self, Y):
+        if self.n + len(Y) > len(self.X):
+            # amortized growth of the array of points
+            grown = np.empty((max(2 * len(self.X), self.n + len(Y)), self.X.shape[1]))
+            grown[:self.n] = self.X[:self.n]
+            self.X = grown
+        self.X[self.n:self.n + len(Y)] = Y
+        ids = np.arange(self.n, self.n + len(Y))
+        self.n += len(Y)
+        return ids
+
+    def insert(self, Y):
+        '''
+        Add a batch of points (rows of Y), with ids n, n+1, ... in order
+
+        Return
+        ------
+        {point: new label} for every point whose community center changed (-1 for none)
+        '''
+        Y = prepare_points(Y, self.metric)
+        if len(Y) == 0:
+            return {}
+        if self.n == 0:
+            self.X = np.empty((0, Y.shape[1]))
+            self.index = GrowingIndex(Y.shape[1], self.metric, self.buffer_size)
+        # neighbours among the earlier points, before the batch joins the index
+        row, old = self.index.query_radius(Y, self.dc)
+        ids = self._append(Y)
+        start, end = old, ids[row]
+        # and among the points of the batch
+        within = cKDTree(Y).query_pairs(self.dc * (1 + 1e-9) + 1e-300, p=MINKOWSKI_P[self.metric], output_type='ndarray')
+        if len(within) > 0:
+            start = np.concatenate((start, ids[within[:, 0]]))
+            end = np.concatenate((end, ids[within[:, 1]]))
+        keep = pair_distances(self.X, start, end, self.metric) <= self.dc
+        self.index.add(Y, ids)
+        edges = zip(start[keep].tolist(), end[keep].tolist())
+        return self.ls.update(inserted=edges, nodes=ids.tolist())
+
+    def labels(self):
+        '''community center (a point id) of every point, -1 for none'''
+        labels = np.asarray(self.ls.labels, dtype=np.int64)
+        nodes = np.asarray(self.ls.nodes)
+        out = np.full(self.n, -1, dtype=np.int64)
+        out[nodes] = np.where(labels >= 0, nodes[np.maximum(labels, 0)], -1)
+        return out
+
+    def partition(self):
+        '''{point: community center, or -1}'''
+        return self.ls.partition()
+
+    def edges(self):
+        '''pairs i < j of the current network, ordered by i then j'''
+        pairs = [(i, j) for i, a in zip(self.ls.nodes, self.ls.adj) for j in (self.ls.nodes[k] for k in a) if i < j]
+        pairs.sort()
+        return pairs
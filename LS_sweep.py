@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Grid search of the vector pipeline over dc_percent x center_num.
+
+Trying every combination with caldistance -> chose_dc -> cal_adge -> networkx ->
+hierarchical_degree_communities repeats all the work. grid_search instead computes the
+distances once and collects the pairs within the largest threshold once, in the order of
+cal_adge, each with the rank of the smallest threshold containing it (each epsilon-ball
+network contains the previous one); the edges of a threshold are then a mask of that
+list, already in the order of cal_adge, with no sorting per threshold. The leader hierarchy of
+every network is computed once (LocalSearch) and every center_num only resolves the
+roots again. The thresholds are independent and run on a process pool, and the
+partitions are scored with cal_auc into a table.
+
+Every network is built from its mask rather than by appending the newly admitted edges
+to the network of the previous threshold: edges appended in distance order would change
+the neighbour order, and with it the ties of LS, from those of the cal_adge order, the
+rebuild costs O(edges) like the LocalSearch fit that follows anyway, and it keeps the
+thresholds independent of each other.
+"""
+
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from LS_algorithm import LocalSearch
+from LS_cluster_function import caldistance, chose_dc_gradual
+from LS_distance import iter_distances, condensed_pairs, condensed_size
+from LS_other_function import cal_auc
+from LS_vector_graph import edges_to_csr
+
+# sorted pairs shared by the worker processes, set once per worker by _init_worker
+_shared = {}
+
+
+def _init_worker(start, end, rank, n, labels, center_nums, options):
+    _shared.update(start=start, end=end, rank=rank, n=n, labels=labels, center_nums=center_nums, options=options)
+
+
+def threshold_pairs(dis, thresholds):
+    '''
+    Pairs i < j within the largest of the increasing thresholds, ordered by i then j (as
+    cal_adge gives them), and the index of the smallest threshold containing each pair
+
+    Return
+    ------
+    start, end -- int arrays of i and j
+    rank -- int array; the pairs within thresholds[k] are those with rank <= k
+    '''
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    positions, rank = [], []
+    for offset, chunk in iter_distances(dis):
+        keep = np.flatnonzero(chunk <= thresholds[-1])
+        positions.append(offset + keep)
+        rank.append(np.searchsorted(thresholds, chunk[keep], side='left'))
+    positions = np.concatenate(positions).astype(np.int64) if positions else np.zeros(0, dtype=np.int64)
+    rank = np.concatenate(rank).astype(np.int64) if rank else np.zeros(0, dtype=np.int64)
+    n = len(dis) if np.ndim(dis) == 2 else condensed_size(len(dis))
+    # condensed positions increase with (i, j)
+    start, end = condensed_pairs(n, positions)
+    return start, end, rank
+
+
+def point_labels(nodes, labels, n):
+    '''
+    label of every point (the point id of its community center, -1 for none) from the labels over the nodes of a CSRGraph
+    '''
+    nodes = np.asarray(nodes)
+    out = np.full(n, -1, dtype=np.int64)
+    out[nodes] = np.where(labels >= 0, nodes[np.maximum(labels, 0)], -1)
+    return out
+
+
+def _run_threshold(task):
+    dc_percent, dc, level = task
+    n = _shared['n']
+    # a mask keeps the order of cal_adge, which fixes the node order of the network
+    keep = _shared['rank'] <= level
+    count = int(np.count_nonzero(keep))
+    csr = edges_to_csr(_shared['start'][keep], _shared['end'][keep], n)
+    ls = LocalSearch(csr, **_shared['options'])
+    leaders = len(ls.hierarchy.leaders)
+    # center_num 0 takes all local leaders, as in select_centers; without leaders there are no communities
+    capped = {center_num: min(center_num, leaders) if center_num else leaders for center_num in _shared['center_nums']}
+    partitions = ls.partitions(set(capped.values()) - {0})
+    rows = []
+    for center_num in _shared['center_nums']:
+        centers = capped[center_num]
+        node_labels = partitions[centers] if centers > 0 else np.full(len(csr.nodes), -1, dtype=np.int64)
+        labels = point_labels(csr.nodes, node_labels, n)
+        precision, recall, F1 = cal_auc(labels.tolist(), _shared['labels'])
+        rows.append(dict(dc_percent=dc_percent, dc=dc, edges=count, leaders=leaders, center_num=center_num,
+                         centers=centers, precision=precision, recall=recall, F1=F1))
+    return rows
+
+
+def grid_search(X, labels, dc_percents, center_nums, order=1, seed=1, maximum_tree=True, workers=None,
+                distance=None):
+    '''
+    Score the LS partition of the epsilon-ball network of X for every dc_percent and center_num
+
+    Input
+    -----
+    X -- (n, dimension) array of vectors
+    labels -- true label of every point, for cal_auc
+    dc_percents -- thresholds as in chose_dc(distance, dc_percent)
+    center_nums -- numbers of communities (capped at the number of local leaders; 0 takes all of them)
+    order -- metric of caldistance (0: Euclidean, otherwise Chebyshev)
+    seed, maximum_tree -- see local_search_communities
+    workers -- number of worker processes for the thresholds (default: all cores); 1 runs in this process
+    distance -- distances of X (condensed or square) if already computed
+
+    Return
+    ------
+    pandas DataFrame, one row per (dc_percent, center_num): dc, edges, leaders, centers
+    (center_num capped), precision, recall, F1
+    '''
+    if distance is None:
+        distance = caldistance(X, order, condensed=True)
+    n = len(X)
+    dc_list = chose_dc_gradual(distance)
+    dc_percents = sorted(set(dc_percents))
+    thresholds = [dc_list[p] for p in dc_percents]
+    start, end, rank = threshold_pairs(distance, thresholds)
+    tasks = list(zip(dc_percents, thresholds, range(len(thresholds))))
+    options = dict(seed=seed, maximum_tree=maximum_tree)
+    initargs = (start, end, rank, n, list(labels), list(center_nums), options)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        _init_worker(*initargs)
+        rows = [row for task in tasks for row in _run_threshold(task)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            rows = [row for result in pool.map(_run_threshold, tasks) for row in result]
+    return pd.DataFrame(rows, columns=['dc_percent', 'dc', 'edges', 'leaders', 'center_num', 'centers',
+                                       'precision', 'recall', 'F1'])
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Epsilon-ball networks of vector data, built with a KD-tree instead of a distance matrix.
+
+The usual path caldistance -> chose_dc -> cal_adge -> nx.from_pandas_edgelist needs the
+n(n-1)/2 distances of all pairs. Here the threshold dc of chose_dc (dc_percent % of the
+range of the distances) is found from the nearest neighbours (smallest distance) and from
+the extreme points (largest distance), and the pairs within dc are found by
+scipy.spatial.cKDTree. The candidate pairs are checked again with the distance of
+caldistance, so the network is the same as the one of the usual path, and it is written
+directly into a CSRGraph with the same node order (first appearance in the edge list,
+then the isolated nodes) and neighbour order, which LS accepts.
+"""
+
+
+import warnings
+import numpy as np
+from scipy.spatial import cKDTree, ConvexHull
+from LS_csr_engine import CSRGraph
+from LS_distance import TILE_MEMORY, tile_distances, sum_of_squares
+
+# Minkowski p of cKDTree for every metric of caldistance
+MINKOWSKI_P = {'euclidean': 2, 'chebyshev': np.inf}
+
+
+def pair_distances(X, i, j, metric='euclidean', chunk=1 << 16):
+    '''
+    Distances of the pairs (i[k], j[k]) of rows of X, with the values of caldistance
+    '''
+    out = np.empty(len(i), dtype=np.float64)
+    for k in range(0, len(i), chunk):
+        diff = X[i[k:k + chunk]] - X[j[k:k + chunk]]
+        if metric == 'euclidean':
+            out[k:k + chunk] = np.sqrt(sum_of_squares(diff))
+        else:
+            out[k:k + chunk] = np.abs(diff).max(axis=1)
+    return out
+
+
+def prepare_points(X, metric):
+    '''X as a C-contiguous 2D float64 array of points, for a metric of MINKOWSKI_P'''
+    if metric not in MINKOWSKI_P:
+        raise ValueError("metric must be 'euclidean' or 'chebyshev', not %r" % metric)
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    return X.reshape(len(X), -1)
+
+
+def distance_range_points(X, metric='euclidean', tree=None, sample=1000, seed=0, exact_size=4096, exact=True):
+    '''
+    Smallest and largest distance between two rows of X, without the distance matrix
+
+    The smallest one comes from the nearest neighbours of every point. The largest one is
+    exact for the Chebyshev distance (the largest range of a coordinate), for Euclidean
+    data of up to 5 dimensions (pairs of vertices of the convex hull) and for up to
+    exact_size points (all pairs). Otherwise all pairs are scanned in tiles if exact is
+    True (O(n^2) time, memory for a tile of distances); with exact=False it is estimated from the
+    distances of a sample of points and of the farthest points found by repeated
+    farthest-point sweeps, which may underestimate it.
+
+    The pairs are scanned with the Gram matrix in tiles of TILE_MEMORY bytes, so the memory
+    does not grow with the dimension. The pairs whose squared Gram distance is within its
+    rounding error of the largest one are then measured again with pair_distances, which
+    gives the value of caldistance.
+
+    Return
+    ------
+    arr_min, arr_max, exact
+    '''
+    X = prepare_points(X, metric)
+    n = len(X)
+    if tree is None:
+        tree = cKDTree(X)
+    # a few nearest neighbours, so that rounding in the tree cannot hide the closest pair
+    k = min(n, 4)
+    _, neighbours = tree.query(X, k=k, p=MINKOWSKI_P[metric])
+    i = np.repeat(np.arange(n), k - 1)
+    j = neighbours[:, 1:].reshape(-1)
+    keep = j < n
+    arr_min = pair_distances(X, i[keep], j[keep], metric).min()
+
+    if metric == 'chebyshev':
+        high = X.max(axis=0)
+        low = X.min(axis=0)
+        d = int(np.argmax(high - low))
+        arr_max = pair_distances(X, np.array([np.argmax(X[:, d])]), np.array([np.argmin(X[:, d])]), metric).max()
+        return arr_min, arr_max, True
+    candidates = None
+    found = False
+    if X.shape[1] == 1:
+        candidates = np.array([np.argmin(X[:, 0]), np.argmax(X[:, 0])])
+        found = True
+    elif X.shape[1] <= 5 and n > X.shape[1] + 1:
+        try:
+            candidates = ConvexHull(X).vertices
+            found = True
+        except Exception:
+            # degenerate (e.g. flat) data
+            candidates = None
+    if candidates is None and (exact or n <= exact_size):
+        candidates = np.arange(n)
+        found = True
+    elif candidates is None:
+        rng = np.random.default_rng(seed)
+        far = [int(rng.integers(n))]
+        for _ in range(8):
+            far.append(int(np.argmax(tile_distances(X[far[-1]:far[-1] + 1], X, metric, gram=True)[0])))
+        candidates = np.unique(np.concatenate((far, rng.choice(n, size=min(n, sample), replace=False))))
+    points = X[candidates]
+    centered = points - points.mean(axis=0)
+    # bound of the rounding error of a squared distance from the Gram matrix (and of the exact one)
+    margin = 8 * (X.shape[1] + 2) * np.finfo(np.float64).eps * np.einsum('ij,ij->i', centered, centered).max()
+    tile = max(1, TILE_MEMORY // (len(points) * points.itemsize))
+    best = -np.inf
+    pairs = []
+    for start in range(0, len(points), tile):
+        square = tile_distances(centered[start:start + tile], centered, metric, gram=True)
+        np.square(square, out=square)
+        best = max(best, square.max())
+        i, j = np.nonzero(square >= best - margin)
+        pairs.append((i + start, j, square[i, j]))
+        del square
+    i = np.concatenate([p[0] for p in pairs])
+    j = np.concatenate([p[1] for p in pairs])
+    keep = np.concatenate([p[2] for p in pairs]) >= best - margin
+    arr_max = pair_distances(points, i[keep], j[keep], metric).max()
+    return arr_min, np.float64(arr_max), found
+
+
+def chose_dc_points(X, t, metric='euclidean', tree=None, exact=True):
+    '''
+    The threshold chose_dc(caldistance(X, order), t) of the pipeline, from the vectors X
+    (exact: see distance_range_points)
+
+    Return
+    ------
+    dc, exact (False if the largest distance was estimated)
+    '''
+    arr_min, arr_max, exact = distance_range_points(X, metric, tree, exact=exact)
+    unit = (arr_max - arr_min) / 99
+    dc_list = [arr_min + unit * i for i in range(100)]
+    return dc_list[t], exact
+
+
+def epsilon_pairs(X, dc, metric='euclidean', tree=None):
+    '''
+    Pairs i < j of rows of X with distance <= dc, as cal_adge gives them
+
+    Return
+    ------
+    start, end -- int arrays, ordered by i then j
+    '''
+    X = prepare_points(X, metric)
+    if tree is None:
+        tree = cKDTree(X)
+    # a slightly larger radius for the tree, the exact distance decides
+    pairs = tree.query_pairs(dc * (1 + 1e-9) + 1e-300, p=MINKOWSKI_P[metric], output_type='ndarray')
+    if len(pairs) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    start = np.minimum(pairs[:, 0], pairs[:, 1]).astype(np.int64)
+    end = np.maximum(pairs[:, 0], pairs[:, 1]).astype(np.int64)
+    keep = pair_distances(X, start, end, metric) <= dc
+    start = start[keep]
+    end = end[keep]
+    order = np.lexsort((end, start))
+    return start[order], end[order]
+
+
+def epsilon_graph_csr(X, dc=None, dc_percent=None, metric='euclidean', exact=True):
+    '''
+    Epsilon-ball network of the vectors X as a CSRGraph, without a distance matrix
+
+    The graph equals CSRGraph.from_networkx(G) for the G of the usual path
+        start, end = cal_adge(distance, dc)
+        G = nx.from_pandas_edgelist(pd.DataFrame({'from': start, 'to': end}), source='from', target='to')
+        G.add_nodes_from(range(len(X)))
+
+    Input
+    -----
+    X -- (n, dimension) array of vectors
+    dc -- distance threshold; or
+    dc_percent -- the threshold as in chose_dc(distance, dc_percent)
+    metric -- 'euclidean' (caldistance order 0) or 'chebyshev' (order 1)
+    exact -- find the largest distance of dc_percent exactly; False estimates it for large
+             Euclidean data of more than 5 dimensions (faster, but dc, and so the graph,
+             may then differ from the usual path, with a warning)
+
+    Return
+    ------
+    CSRGraph, dc
+    '''
+    X = prepare_points(X, metric)
+    n = len(X)
+    tree = cKDTree(X)
+    if dc is None:
+        if dc_percent is None:
+            raise ValueError('either dc or dc_percent is required')
+        dc, found = chose_dc_points(X, dc_percent, metric, tree, exact)
+        if not found:
+            warnings.warn('the largest distance was estimated from a sample; dc=%g may be smaller than '
+                          'chose_dc gives (use exact=True for the same network)' % dc)
+    start, end = epsilon_pairs(X, dc, metric, tree)
+    return edges_to_csr(start, end, n), dc
+
+
+def edges_to_csr(start, end, n):
+    '''
+    CSRGraph of the edges (start[k], end[k]) of the points 0..n-1, with the node order and
+    neighbour order of nx.from_pandas_edgelist followed by G.add_nodes_from(range(n)),
+    for edges ordered by start then end (as cal_adge gives them)
+    '''
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64)
+    # nodes by first appearance in the edge list, then the isolated ones
+    flat = np.column_stack((start, end)).reshape(-1)
+    first = np.full(n, len(flat), dtype=np.int64)
+    np.minimum.at(first, flat, np.arange(len(flat)))
+    seen = flat[first[flat] == np.arange(len(flat))]
+    isolated = np.ones(n, dtype=bool)
+    isolated[seen] = False
+    nodes = np.concatenate((seen, np.flatnonzero(isolated))).astype(np.int64)
+    index = np.empty(n, dtype=np.int64)
+    index[nodes] = np.arange(n)
+
+    # neighbours in increasing id, which is the order in which the edges add them: for
+    # every node the smaller neighbours (by start) come before the larger ones (by end), so
+    # a stable sort by node alone is enough
+    src = np.concatenate((end, start))
+    dst = np.concatenate((start, end))
+    order = np.argsort(index[src], kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(index[src], minlength=n), out=indptr[1:])
+    return CSRGraph(nodes, indptr, index[dst[order]])
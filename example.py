@@ -1,11 +1,15 @@
 from LS_algorithm import hierarchical_degree_communities
-from LS_cluster_function import caldistance, chose_dc, cal_adge, evaluate_network, plot_fig, plot_louvian_fig
+from LS_cluster_function import evaluate_network, plot_fig, plot_louvian_fig
+from LS_cache import cached_edges
 from LS_other_function import plot_combination, draw_graph, plot_degree_shortpath, plot_multi_log
 import networkx as nx
 import pandas as pd
 import datetime
 import community
 import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 
 test_cdp = r'./data/2d_datasets/test_cdp.txt'
@@ -15,10 +19,11 @@ leaders_num = 2 # the threshold is calculated in advance in the subroutine LS_al
 x = raw_data[:, 0]
 y = raw_data[:, 1]
 nodes = [i for i in range(len(raw_data))]
-distance = caldistance(raw_data, 1)
-dc = chose_dc(distance, dc_percent)
-start, end = cal_adge(distance, dc)
-df = pd.DataFrame({'from': start, 'to': end})
+# same as cal_adge(distance, chose_dc(distance, dc_percent)) for distance = caldistance(raw_data, 1, condensed=True);
+# with cache = LS_cache.Cache() the edges are kept in .ls_cache and later runs on the same data and dc_percent load them
+cache = None
+start, end = cached_edges(raw_data, 1, dc_percent, cache)
+df = pd.DataFrame({'from': start.tolist(), 'to': end.tolist()})
 G = nx.from_pandas_edgelist(df, source='from', target='to')
 G.add_nodes_from(nodes)
 seed = 1
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+The LS modules are flat files at the root of the repository, and they read the bundled
+networks by paths relative to it: tests import them from there and run from there.
+
+    python -m pytest -q tests
+"""
+
+
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(scope='session')
+def bundle_directory(tmp_path_factory):
+    '''directory for the dataset bundles of LS_datasets, instead of .ls_cache in the repository'''
+    return str(tmp_path_factory.mktemp('datasets'))
+
+
+@pytest.fixture(scope='session')
+def networks():
+    '''small labelled networks read by nx.read_gml, by name (karate from networkx)'''
+    import networkx as nx
+    graphs = {'karate': nx.karate_club_graph()}
+    for name in ('polbooks', 'football'):
+        graphs[name] = nx.read_gml(os.path.join(ROOT, 'data/network_with_true_community_labels/%s.gml' % name),
+                                   label='id')
+    return graphs
+
+
+@pytest.fixture(scope='session')
+def vectors():
+    '''small vector data sets by name: 2D benchmarks, iris, and random data of many dimensions'''
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(0)
+    return {'flame': np.loadtxt(os.path.join(ROOT, 'data/2d_datasets/flame.txt'))[:, :2],
+            'R15': np.loadtxt(os.path.join(ROOT, 'data/2d_datasets/R15.txt'))[::3, :2],
+            'iris': pd.read_csv(os.path.join(ROOT, 'data/high_datasets/iris.data'),
+                                header=None).iloc[:, :4].to_numpy(dtype=float),
+            'random': rng.normal(size=(120, 64))}
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+The vectorized steps of LS against the original hierarchical_degree_communities, rebuilt here
+from the networkx functions it used (degree_hierarchy_random_tree, BFS_from_s,
+get_indicator_rank/get_square/standard_data and the rootnode chains).
+"""
+
+
+import numpy as np
+import pytest
+from LS_algorithm import (degree_hierarchy_random_tree, BFS_from_s, get_indicator_rank, get_square, standard_data,
+                          decision_graph, local_leader_hierarchy, local_search_communities, resolve_community_roots,
+                          LocalSearch, hierarchical_degree_communities, profile_communities)
+
+SEEDS = [1, 163]
+
+
+def legacy_decision(G, D, leaders):
+    # steps (1)-(2) of the original hierarchical_degree_communities
+    root_decision = {}
+    for node in leaders:
+        e, p = BFS_from_s(G, node, leaders)
+        root_decision[node] = [e, p, G.degree[node]]
+    max_path_temp = int(max(p for e, p, k in root_decision.values()))
+    max_path = max_path_temp if max_path_temp > -1 else 2
+    for node in root_decision:
+        if root_decision[node][1] == -1:
+            root_decision[node][1] = max_path
+    node_plot = dict(root_decision)
+    for v in G.nodes():
+        if v not in node_plot:
+            node_plot[v] = [D.nodes[v]['parentnode'], 1, G.degree[v]]
+    root_array = np.array([[p, k] for e, p, k in node_plot.values()])
+    root_array[root_array[:, 1] <= 1, 0] = 1
+    multi = standard_data(np.array(get_indicator_rank(root_array[:, 1]))) * \
+        standard_data(np.array(get_square(root_array[:, 0])))
+    multi_dict = dict(zip(node_plot, multi))
+    return root_decision, sorted(multi_dict.items(), key=lambda kv: (kv[1], kv[0]), reverse=True), \
+        list(node_plot), root_array[:, 0].tolist()
+
+
+def legacy_partition(G, center_num=None, seed=None):
+    D, _ = degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=seed, selfloop_nodes=set())
+    members = {}
+    for v in D:
+        members.setdefault(D.nodes[v]['rootnode'], []).append(v)
+    leaders = [r for r, m in members.items() if len(m) > 1]
+    root_decision, multi_sort, _, _ = legacy_decision(G, D, leaders)
+    centers = [v for v, value in multi_sort[:center_num or len(leaders)] if value > 0]
+    pointer = {v: D.nodes[v]['rootnode'] for v in D}
+    for v in leaders:
+        pointer[v] = root_decision[v][0]
+    return centers, _chains(D, pointer, centers)
+
+
+def _chains(nodes, pointer, centers):
+    # the first center met by following pointer from every node, -1 at the end of a chain or in a loop
+    partition = {}
+    for start in nodes:
+        v = start
+        seen = set()
+        while v is not None and v not in centers:
+            seen.add(v)
+            v = pointer[v]
+            if v in seen:
+                v = None
+        partition[start] = -1 if v is None else v
+    return partition
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_decision_graph_matches_legacy(networks, seed):
+    for G in networks.values():
+        h = local_leader_hierarchy(G, seed=seed)
+        D, _ = degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=seed, selfloop_nodes=set())
+        _, multi_sort, _, _ = legacy_decision(G, D, [h.nodes[s] for s in h.leaders.tolist()])
+        assert [h.nodes[i] for i in h.decision_order.tolist()] == [v for v, value in multi_sort]
+        assert np.allclose(h.decision_value[h.decision_order], [value for v, value in multi_sort])
+
+
+def test_leaders_only_decision_graph(networks):
+    for G in networks.values():
+        h = local_leader_hierarchy(G, seed=1)
+        decision_l, decision_value, decision_order = decision_graph(h.nodes, h.degree, h.leaders, h.path,
+                                                                    leaders_only=True)
+        assert np.array_equal(decision_l, h.decision_l[h.leaders])
+        assert np.array_equal(decision_value, h.decision_value[h.leaders])
+        is_leader = np.zeros(len(h.degree), dtype=bool)
+        is_leader[h.leaders] = True
+        assert np.array_equal(h.leaders[decision_order], h.decision_order[is_leader[h.decision_order]])
+
+
+@pytest.mark.parametrize('center_num', [None, 2, 5])
+def test_partition_matches_legacy(networks, center_num):
+    for G in networks.values():
+        for seed in SEEDS:
+            centers, partition = legacy_partition(G, center_num, seed)
+            result = local_search_communities(G, center_num=center_num, seed=seed)
+            assert result.center_nodes() == centers
+            assert result.partition() == partition
+
+
+@pytest.mark.parametrize('center_num', [None, 3])
+def test_hierarchical_degree_communities_matches_legacy(networks, center_num):
+    seed = 163
+    for G in networks.values():
+        D0, _ = degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=seed, selfloop_nodes=set())
+        centers, partition = legacy_partition(G, center_num, seed)
+        leaders = list(dict.fromkeys(D0.nodes[v]['rootnode'] for v in D0))
+        leaders = [r for r in leaders if sum(D0.nodes[v]['rootnode'] == r for v in D0) > 1]
+        root_decision, multi_sort, nodeid, l = legacy_decision(G, D0, leaders)
+        D, center_dcd, y_dcd, y_partition, data = hierarchical_degree_communities(G.copy(), center_num=center_num,
+                                                                                 seed=seed, plot=False)
+        assert center_dcd == centers and y_partition == partition and y_dcd == list(partition.values())
+        assert sorted(D.edges) == sorted(D0.edges)
+        for v in G:
+            parent = root_decision[v][0] if v in root_decision else D0.nodes[v]['parentnode']
+            assert D.nodes[v]['parentnode'] == parent
+            assert D.nodes[v]['rootnode'] == (None if partition[v] == -1 else partition[v])
+            assert D.nodes[v]['distancetoroot'] == D0.nodes[v]['distancetoroot']
+        assert data[0].tolist() == [G.degree[v] for v in nodeid] and data[1].tolist() == l and data[2] == nodeid
+        assert data[5].tolist() == [v for v, value in multi_sort] and data[6] == centers
+
+
+def test_resolve_community_roots_matches_chains():
+    rng = np.random.default_rng(0)
+    for n in [1, 2, 10, 200]:
+        for _ in range(20):
+            # random pointers, with loops, self-loops and missing pointers
+            pointer = rng.integers(-1, n, size=n)
+            is_center = rng.random(n) < 0.1
+            centers = set(np.flatnonzero(is_center).tolist())
+            chains = _chains(range(n), {v: (p if p >= 0 else None) for v, p in enumerate(pointer.tolist())}, centers)
+            assert resolve_community_roots(pointer, is_center).tolist() == [chains[v] for v in range(n)]
+
+
+def test_local_search_session(networks):
+    for G in networks.values():
+        ls = LocalSearch(G, seed=1)
+        partitions = ls.partitions()
+        assert len(partitions) == len(ls.hierarchy.leaders)
+        for center_num, labels in partitions.items():
+            expected = local_search_communities(G, center_num=center_num, seed=1)
+            assert np.array_equal(labels, expected.labels)
+            assert np.array_equal(ls.partition(center_num).labels, expected.labels)
+
+
+def test_profile_communities(networks):
+    G = networks['polbooks']
+    D, _ = degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=1, selfloop_nodes=set())
+    result, stats = profile_communities(G, center_num=4, seed=1, trace_memory=True)
+    assert np.array_equal(result.labels, local_search_communities(G, center_num=4, seed=1).labels)
+    assert list(stats['time']) == ['csr', 'dag', 'forest', 'local_bfs', 'ranking', 'roots', 'total']
+    assert stats['time']['total'] >= sum(t for stage, t in stats['time'].items() if stage != 'total')
+    assert stats['ties'] == D.graph['number_of_ties']
+    assert stats['max_depth'] == max(d for _, d in D.nodes(data='distancetoroot'))
+    assert stats['leaders'] == len(result.leaders) == len(stats['visited'])
+    # a leader visits at least itself, unless it has no superior and no BFS is run
+    assert np.all(stats['visited'][result.path >= 0] >= 1 + result.path[result.path >= 0])
+    assert stats['peak_memory'] > 0
+
+
+def test_dendrogram(networks):
+    for G in networks.values():
+        ls = LocalSearch(G, seed=1)
+        h = ls.hierarchy
+        leaders, parent, height = ls.dendrogram()
+        assert sorted(leaders.tolist()) == sorted(h.leaders.tolist())
+        assert np.all(np.diff(height) <= 0)
+        superior = dict(zip(h.leaders.tolist(), h.superior.tolist()))
+        for s, p in zip(leaders.tolist(), parent.tolist()):
+            assert (superior[s] == s) if p < 0 else (leaders[p] == superior[s])
+        # the k highest leaders are the centers of partition(k)
+        for k in (1, 3, len(leaders)):
+            centers = ls.partition(k).centers
+            assert sorted(centers.tolist()) == sorted(leaders[:k][height[:k] > 0].tolist())
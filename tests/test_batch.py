@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import numpy as np
+import networkx as nx
+import pytest
+from LS_algorithm import local_search_communities
+from LS_batch import run_batch
+from LS_datasets import load_network
+from LS_metrics import evaluate_partition
+
+
+@pytest.fixture
+def graphs(tmp_path, monkeypatch, networks):
+    # copies in a temporary directory, which also receives the bundles of the GML files
+    shutil.copy('data/network_with_true_community_labels/polbooks.gml', str(tmp_path))
+    shutil.copy('data/hierarchy_network/test/Hierarchy_ba_modify_p2_01.gml', str(tmp_path))
+    nx.write_edgelist(networks['karate'], str(tmp_path / 'karate.txt'), data=False)
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path)
+
+
+def test_rows_match_local_search(graphs):
+    table = run_batch([graphs], seeds=[1, 2], center_nums=[None, 3], out='out', workers=1)
+    assert len(table) == 3 * 2 * 2
+    for row in table.itertuples():
+        csr, y_true = load_network(row.graph)
+        result = local_search_communities(csr, center_num=None if row.center_num == 'default' else int(row.center_num),
+                                          seed=row.seed)
+        assert (row.leaders, row.centers) == (len(result.leaders), len(result.centers))
+        nodes = np.asarray(csr.nodes)
+        labels = np.load(os.path.join('out', row.labels_file))
+        assert labels.tolist() == np.where(result.labels >= 0, nodes[np.maximum(result.labels, 0)], -1).tolist()
+        if y_true is None:
+            assert np.isnan(row.F1)
+        else:
+            assert row.F1 == pytest.approx(evaluate_partition(result.labels, y_true)['F1'])
+
+
+def test_resume(graphs):
+    first = run_batch([graphs], seeds=[1], center_nums=['default'], out='out', workers=1)
+    # an interrupted run left half a line
+    with open('out/results.csv', 'a') as f:
+        f.write('%s,polbooks,2' % os.path.abspath('polbooks.gml'))
+    again = run_batch([graphs], seeds=[1, 2], center_nums=['default'], out='out', workers=2)
+    assert len(first) == 3 and len(again) == 6
+    assert sorted(zip(again.dataset, again.seed)) == sorted((d, s) for d in first.dataset for s in (1, 2))
+    # from another directory the same graphs are recognized
+    os.mkdir('elsewhere')
+    os.chdir('elsewhere')
+    assert len(run_batch([graphs], seeds=[1, 2], out='../out', workers=1)) == 6
+
+
+def test_failed_job_is_retried(graphs):
+    with open('broken.txt', 'w') as f:
+        f.write('1 2\nnot an edge\n')
+    table = run_batch([graphs], seeds=[1], out='out', workers=1)
+    assert sorted(table.dataset) == ['Hierarchy_ba_modify_p2_01', 'karate', 'polbooks']
+    with open('broken.txt', 'w') as f:
+        f.write('1 2\n2 3\n')
+    table = run_batch([graphs], seeds=[1], out='out', workers=1)
+    assert sorted(table.dataset) == ['Hierarchy_ba_modify_p2_01', 'broken', 'karate', 'polbooks']
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from LS_benchmark import run_benchmarks, save_baseline, load_baseline, compare_baseline
+
+
+def test_records_and_baseline(tmp_path):
+    records = run_benchmarks(suites=('vector', 'scaling'), vectors=['data/2d_datasets/flame.txt'],
+                             graph_sizes=[200], vector_sizes=[300], memory=False)
+    stages = {(r['suite'], r['dataset'], r['stage']) for r in records}
+    assert ('scaling', 'ba_200', 'BFS_from_s') in stages
+    assert ('scaling', 'ba_200', 'local_leader_superiors_csr') in stages
+    assert {r['suite'] for r in records} == {'vector', 'scaling'}
+    assert all(r['time'] >= 0 for r in records if r['time'] is not None)
+
+    path = str(tmp_path / 'baseline.json')
+    save_baseline(records, path)
+    baseline = load_baseline(path)
+    assert baseline == records
+    assert compare_baseline(records, baseline) == []
+    slower = [dict(r, time=None if r['time'] is None else 2 * r['time'] + 0.02) for r in records]
+    regressions = compare_baseline(slower, baseline)
+    assert {key[:3] for key in regressions} == {(r['suite'], r['dataset'], r['stage'])
+                                                for r in records if r['time'] is not None}
+    # noise below min_time is ignored
+    assert compare_baseline([dict(records[0], time=0.004)], [dict(records[0], time=0.001)]) == []
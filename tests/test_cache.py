@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+import numpy as np
+import pytest
+from LS_cache import (Cache, cached_distances, cached_thresholds, cached_edges, cached_graph_csr,
+                      cached_percolation)
+from LS_cluster_function import caldistance, chose_dc_gradual, cal_adge
+from LS_percolation import percolation_sweep
+from LS_vector_graph import edges_to_csr
+
+
+@pytest.mark.parametrize('order', [0, 1])
+def test_cached_values_equal_the_pipeline(vectors, tmp_path, order):
+    X = vectors['flame']
+    distance = caldistance(X, order, condensed=True)
+    thresholds = chose_dc_gradual(distance)
+    start, end = cal_adge(distance, thresholds[6])
+    cache = Cache(str(tmp_path))
+    for _ in range(2):
+        # computed and stored, then read back
+        for c in (cache, None):
+            assert np.array_equal(cached_distances(X, order, c), distance)
+            assert cached_thresholds(X, order, c).tolist() == thresholds
+            edges = cached_edges(X, order, 6, c)
+            assert (edges[0].tolist(), edges[1].tolist()) == (start, end)
+            csr = cached_graph_csr(X, order, 6, c)
+            expected = edges_to_csr(start, end, len(X))
+            assert np.array_equal(csr.nodes, expected.nodes) and np.array_equal(csr.indices, expected.indices)
+    assert isinstance(cached_distances(X, order, cache), np.memmap)
+    expected = percolation_sweep(caldistance(X, 0, condensed=True))
+    for curves in (cached_percolation(X, cache), cached_percolation(X, cache)):
+        assert all(np.array_equal(a, b) for a, b in zip(curves, expected))
+
+
+def test_hits_misses_and_eviction(vectors, tmp_path):
+    X = vectors['iris']
+    cache = Cache(str(tmp_path))
+    cached_distances(X, 0, cache)
+    assert len(cache.entries()) == 1
+    cached_distances(X, 0, cache)
+    assert len(cache.entries()) == 1
+    # changed data or parameters miss
+    cached_distances(X, 1, cache)
+    before = set(path for _, _, path in cache.entries())
+    cached_distances(X[:-1], 0, cache)
+    other, = set(path for _, _, path in cache.entries()) - before
+    assert len(cache.entries()) == 3
+
+    # the thresholds read the distances of X, which become the most recently used
+    small = Cache(str(tmp_path), max_bytes=cache.size() // 2)
+    os.utime(other, (1, 1))
+    cached_thresholds(X, 0, small)
+    paths = [path for _, _, path in small.entries()]
+    assert other not in paths and small.size() <= small.max_bytes
+    assert np.array_equal(cached_distances(X, 0, small), caldistance(X, 0, condensed=True))
+    small.clear()
+    assert small.entries() == []
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import networkx as nx
+import pytest
+from LS_algorithm import local_search_communities
+from LS_cli import main
+
+
+def read_output(path):
+    # {(seed, center_num): {node: center}} of the '# seed=... center_num=...' sections
+    runs = {}
+    with open(path) as f:
+        for line in f:
+            if line.startswith('#'):
+                fields = dict(item.split('=') for item in line[1:].split())
+                labels = runs.setdefault((int(fields['seed']), fields['center_num']), {})
+            else:
+                node, center = line.split('\t')
+                labels[node] = center.strip()
+    return runs
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_output_matches_local_search(tmp_path, networks, workers):
+    G = networks['football']
+    edges = str(tmp_path / 'football.txt')
+    nx.write_edgelist(G, edges, data=False)
+    G = nx.read_edgelist(edges, nodetype=int)
+    out = str(tmp_path / 'labels.tsv')
+    assert main([edges, '--seed', '1', '7', '--center-num', 'default', '5', 'auto', '--workers', workers,
+                 '--chunk-size', '13', '-o', out, '-q']) == 0
+    runs = read_output(out)
+    assert list(runs) == [(seed, c) for seed in (1, 7) for c in ('default', '5', 'auto')]
+    for (seed, center_num), labels in runs.items():
+        options = dict(auto_choose_centers=True) if center_num == 'auto' else \
+            dict(center_num=None if center_num == 'default' else int(center_num))
+        partition = local_search_communities(G, seed=seed, **options).partition()
+        assert labels == {str(v): str(c) for v, c in partition.items()}
+
+
+def test_formats(tmp_path, networks):
+    G = networks['karate']
+    text = str(tmp_path / 'karate.csv')
+    with open(text, 'w') as f:
+        f.writelines('a%s;a%s\n' % edge for edge in G.edges)
+    out = str(tmp_path / 'labels.tsv')
+    main([text, '--delimiter', ';', '--nodetype', 'str', '-o', out, '-q', '--profile', '--trace-memory'])
+    H = nx.read_edgelist(text, delimiter=';')
+    assert read_output(out)[(1, 'default')] == {v: str(c) for v, c in local_search_communities(H, seed=1).partition().items()}
+    with pytest.raises(SystemExit):
+        main([text, '--center-num', 'many'])
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+The CSR engine against the networkx functions it mirrors (degree_hierarchy_random_tree, BFS_from_s).
+"""
+
+
+import numpy as np
+import networkx as nx
+import pytest
+from LS_csr_engine import CSRGraph, degree_hierarchy_random_tree_csr, local_leader_superiors_csr
+from LS_algorithm import degree_hierarchy_random_tree, BFS_from_s
+
+SEEDS = [1, 163]
+
+
+def test_csr_round_trip(networks):
+    for G in list(networks.values()) + [nx.Graph([(0, 0), (0, 'a'), ('a', 2.5), (3, 4)])]:
+        csr = CSRGraph.from_networkx(G)
+        H = csr.to_networkx()
+        assert list(H.nodes) == list(G.nodes)
+        assert all(list(H.adj[v]) == [u for u in G.adj[v] if u != v] + [u for u in G.adj[v] if u == v]
+                   for v in G)
+        again = CSRGraph.from_networkx(H)
+        assert np.array_equal(again.indptr, csr.indptr) and np.array_equal(again.indices, csr.indices)
+        assert np.array_equal(again.selfloop, csr.selfloop)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_forest_matches_networkx(networks, seed):
+    for G in networks.values():
+        D, tree_edge_list = degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=seed, selfloop_nodes=set())
+        csr = CSRGraph.from_networkx(G)
+        src, dst, parent, root, distance = degree_hierarchy_random_tree_csr(csr.indptr, csr.indices, csr.degree,
+                                                                            random_seed=seed)
+        nodes = csr.nodes
+        assert sorted(D.edges) == sorted((nodes[u], nodes[v]) for u, v in zip(src.tolist(), dst.tolist()))
+        for i, v in enumerate(nodes):
+            assert D.nodes[v]['parentnode'] == (nodes[parent[i]] if parent[i] >= 0 else None)
+            assert D.nodes[v]['rootnode'] == nodes[root[i]]
+            assert D.nodes[v]['distancetoroot'] == distance[i]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_superiors_match_BFS_from_s(networks, seed):
+    for G in networks.values():
+        D, _ = degree_hierarchy_random_tree(G, maximum_tree=True, random_seed=seed, selfloop_nodes=set())
+        members = {}
+        for v in D:
+            members.setdefault(D.nodes[v]['rootnode'], []).append(v)
+        leaders = [r for r, m in members.items() if len(m) > 1]
+        csr = CSRGraph.from_networkx(G)
+        index = {v: i for i, v in enumerate(csr.nodes)}
+        superior, path = local_leader_superiors_csr(csr.indptr, csr.indices, csr.degree, [index[s] for s in leaders])
+        for s, w, p in zip(leaders, superior.tolist(), path.tolist()):
+            assert BFS_from_s(G, s, leaders) == (csr.nodes[w], p)
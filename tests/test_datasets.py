@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import numpy as np
+import networkx as nx
+import pytest
+from LS_algorithm import local_search_communities
+from LS_csr_engine import CSRGraph
+from LS_datasets import DATASETS, simple_graph, load_bundle, load_dataset, load_networkx, load_network, bundle_path
+
+
+@pytest.mark.parametrize('name', ['polbooks', 'football', 'Hierarchy_random'])
+def test_bundle_round_trip(name, bundle_directory):
+    G = simple_graph(nx.read_gml(DATASETS[name], label='id'))
+    expected = CSRGraph.from_networkx(G)
+    csr, y_true = load_dataset(name, bundle_directory)
+    assert csr.nodes == expected.nodes
+    assert np.array_equal(csr.indptr, expected.indptr) and np.array_equal(csr.indices, expected.indices)
+    H, values = load_networkx(name, bundle_directory)
+    assert list(H.nodes) == list(G.nodes)
+    assert all(list(H.adj[v]) == list(G.adj[v]) for v in G)
+    original = [G.nodes[v].get('value') for v in G]
+    if all(value is None for value in original):
+        # unlabelled network
+        assert values is None and y_true is None
+    else:
+        assert values == original
+        codes = {}
+        assert y_true.tolist() == [codes.setdefault(value, len(codes)) for value in values]
+    assert local_search_communities(csr, seed=1).partition() == local_search_communities(G, seed=1).partition()
+
+
+def test_bundles_are_memory_mapped(bundle_directory):
+    arrays = load_bundle('football', bundle_directory)
+    assert isinstance(arrays['indices'], np.memmap)
+    assert np.array_equal(load_network(bundle_path(DATASETS['football'], bundle_directory))[0].indices,
+                          arrays['indices'])
+
+
+def test_label_types_and_rebuild(tmp_path):
+    source = str(tmp_path / 'mixed.gml')
+    G = nx.Graph()
+    G.add_nodes_from([(0, {'value': 3}), (1, {'value': 'a'}), (2, {'value': '3'}), (3, {})])
+    G.add_edges_from([(0, 1), (1, 2), (2, 3), (3, 3)])
+    nx.write_gml(G, source)
+    directory = str(tmp_path / 'bundles')
+    H, values = load_networkx(source, directory)
+    assert values == [3, 'a', '3', None]
+    assert load_dataset(source, directory)[1].tolist() == [0, 1, 2, -1]
+    assert 'label_integer' in load_bundle(source, directory)
+    assert list(H.edges) == list(G.edges)
+
+    # a changed file is parsed again
+    G.add_edge(0, 2)
+    nx.write_gml(G, source)
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 1))
+    assert load_dataset(source, directory)[0].number_of_edges() == 4
+    shutil.rmtree(directory)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+The tiled and condensed distances against the double loops of the original caldistance,
+chose_dc_gradual and cal_adge.
+"""
+
+
+import numpy as np
+import pytest
+from scipy.spatial.distance import pdist, squareform
+from LS_distance import (pairwise_distances, condensed_distances, condensed_size, condensed_pairs, distance_range,
+                         pairs_within)
+from LS_cluster_function import caldistance, chose_dc_gradual, cal_adge
+
+
+def legacy_caldistance(v, order):
+    distance = np.zeros(shape=(len(v), len(v)))
+    for i in range(len(v)):
+        for j in range(i + 1, len(v)):
+            distance[i][j] = np.linalg.norm(v[i] - v[j]) if order == 0 else np.linalg.norm(v[i] - v[j], ord=np.inf)
+            distance[j][i] = distance[i][j]
+    return distance
+
+
+def legacy_cal_adge(dis, dc):
+    start = []
+    end = []
+    for i in range(len(dis[0])):
+        for j in range(i + 1, len(dis[0])):
+            if dis[i][j] <= dc:
+                start.append(i)
+                end.append(j)
+    return start, end
+
+
+@pytest.mark.parametrize('order', [0, 1])
+def test_caldistance_matches_legacy(vectors, order):
+    for name, X in vectors.items():
+        expected = legacy_caldistance(X, order)
+        square = caldistance(X, order)
+        condensed = caldistance(X, order, condensed=True)
+        if name == 'random' and order == 0:
+            # Euclidean distances of many dimensions come from the Gram matrix
+            assert np.allclose(square, expected, rtol=1e-12, atol=1e-12)
+        else:
+            assert np.array_equal(square, expected)
+        assert np.array_equal(condensed, square[np.triu_indices(len(X), 1)])
+
+
+def test_tiles_and_workers(vectors):
+    X = vectors['iris']
+    expected = legacy_caldistance(X, 0)
+    for tile in (1, 7, 1000):
+        assert np.array_equal(pairwise_distances(X, tile=tile, workers=3), expected)
+    assert np.array_equal(condensed_distances(X, workers=3), expected[np.triu_indices(len(X), 1)])
+    exact = pairwise_distances(vectors['random'], gram=False)
+    assert np.allclose(pairwise_distances(vectors['random'], gram=True), exact, rtol=1e-12, atol=1e-12)
+    for metric, ord in (('manhattan', 1), ('chebyshev', np.inf)):
+        brute = np.linalg.norm(X[:, None, :] - X[None, :, :], ord=ord, axis=-1)
+        assert np.allclose(pairwise_distances(X, metric), brute)
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'chebyshev', 'manhattan', 'cosine'])
+def test_condensed_matches_squareform(vectors, metric):
+    for X in vectors.values():
+        condensed = condensed_distances(X, metric, gram=False)
+        square = pairwise_distances(X, metric, gram=False)
+        if metric == 'cosine':
+            # products of tiles of other shapes may round differently
+            assert np.allclose(squareform(condensed), square, rtol=1e-12, atol=1e-12)
+        else:
+            assert np.array_equal(squareform(condensed), square)
+        assert np.allclose(condensed, pdist(X, {'manhattan': 'cityblock'}.get(metric, metric)), rtol=1e-12,
+                           atol=1e-12)
+
+
+def test_condensed_memmap(vectors, tmp_path):
+    X = vectors['flame']
+    mapped = caldistance(X, 1, condensed=True, filename=str(tmp_path / 'dis.npy'))
+    assert isinstance(mapped, np.memmap)
+    assert np.array_equal(np.load(str(tmp_path / 'dis.npy')), caldistance(X, 1, condensed=True))
+
+
+def test_condensed_indexing():
+    for n in range(0, 30):
+        # an empty array stands for no points as well as for one
+        assert condensed_size(n * (n - 1) // 2) == (n if n > 1 else 0)
+        i, j = np.triu_indices(n, 1)
+        assert np.array_equal(np.column_stack(condensed_pairs(n, np.arange(len(i)))), np.column_stack((i, j)))
+    with pytest.raises(ValueError):
+        condensed_size(4)
+
+
+@pytest.mark.parametrize('t', [0, 3, 20, 99])
+def test_thresholds_and_edges_match_legacy(vectors, t):
+    for X in vectors.values():
+        square = legacy_caldistance(X, 1)
+        condensed = square[np.triu_indices(len(X), 1)]
+        values = condensed.tolist()
+        unit = (max(values) - min(values)) / 99
+        expected = [min(values) + unit * i for i in range(100)]
+        assert chose_dc_gradual(square) == expected
+        assert chose_dc_gradual(condensed) == expected
+        assert distance_range(condensed, chunk=97) == (min(values), max(values))
+        dc = expected[t]
+        edges = legacy_cal_adge(square, dc)
+        assert cal_adge(square, dc) == edges
+        assert cal_adge(condensed, dc) == edges
+        start, end = pairs_within(condensed, dc, chunk=97)
+        assert (start.tolist(), end.tolist()) == edges
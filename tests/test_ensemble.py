@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+import numpy as np
+import networkx as nx
+from LS_algorithm import local_search_communities
+from LS_csr_engine import CSRGraph
+from LS_ensemble import ensemble_communities
+
+
+def test_ensemble_matches_single_runs(networks):
+    G = networks['football']
+    seeds = [1, 2, 3, 4, 5]
+    ensemble = ensemble_communities(G, seeds, workers=1)
+    pool = ensemble_communities(G, seeds, workers=2)
+    runs = np.array([local_search_communities(G, seed=seed).labels for seed in seeds])
+    assert np.array_equal(ensemble.labels, runs) and np.array_equal(pool.labels, runs)
+    assert np.array_equal(pool.consensus, ensemble.consensus)
+
+    # stability: share of the runs agreeing with the most frequent label of a node
+    stability = [Counter(runs[:, i].tolist()).most_common(1)[0][1] / len(seeds) for i in range(runs.shape[1])]
+    assert np.allclose(ensemble.stability, stability)
+
+    # consensus: components of the edges whose endpoints share a community in most runs
+    csr = CSRGraph.from_networkx(G)
+    H = nx.Graph()
+    H.add_nodes_from(range(len(G)))
+    for u in range(len(G)):
+        for v in csr.neighbors(u).tolist():
+            share = np.mean((runs[:, u] == runs[:, v]) & (runs[:, u] >= 0))
+            assert ensemble.coassociation[u, v] == share
+            if share > 0.5:
+                H.add_edge(u, v)
+    groups = {frozenset(np.flatnonzero(ensemble.consensus == c).tolist()) for c in set(ensemble.consensus.tolist())}
+    noise = (runs < 0).sum(axis=0) * 2 > len(seeds)
+    expected = {frozenset(c - set(np.flatnonzero(noise).tolist())) for c in nx.connected_components(H)}
+    if noise.any():
+        expected.add(frozenset(np.flatnonzero(noise).tolist()))
+    assert groups == expected - {frozenset()}
+    sizes = [np.sum(ensemble.consensus == c) for c in range(ensemble.consensus.max() + 1)]
+    assert sizes == sorted(sizes, reverse=True)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import networkx as nx
+import pytest
+from LS_algorithm import local_search_communities
+from LS_cluster_function import caldistance, chose_dc, cal_adge, evaluate_network
+from LS_estimator import LSClustering
+
+
+def pipeline_labels(X, order, dc_percent, center_num, seed):
+    distance = caldistance(X, order)
+    start, end = cal_adge(distance, chose_dc(distance, dc_percent))
+    G = nx.from_pandas_edgelist(pd.DataFrame({'from': start, 'to': end}), source='from', target='to')
+    G.add_nodes_from(range(len(X)))
+    result = local_search_communities(G, center_num=center_num, seed=seed)
+    return evaluate_network(result.partition(), len(X))[0]
+
+
+@pytest.mark.parametrize('order', [0, 1])
+@pytest.mark.parametrize('center_num', [None, 2])
+def test_fit_matches_pipeline(vectors, order, center_num):
+    for name in ('flame', 'R15', 'iris'):
+        X = vectors[name]
+        model = LSClustering(dc_percent=6, center_num=center_num, order=order).fit(X)
+        assert model.labels_.tolist() == pipeline_labels(X, order, 6, center_num, 1)
+
+
+def test_fitted_tree(vectors):
+    X = vectors['flame']
+    model = LSClustering(dc_percent=6).fit(X)
+    result = model.result_
+    nodes = np.asarray(result.nodes)
+    leaders = nodes[result.leaders]
+    assert np.array_equal(model.parent_[leaders], leaders)
+    # every other point hangs from a neighbour of at least its degree, within dc
+    child = np.flatnonzero(model.parent_ != np.arange(len(X)))
+    parent = model.parent_[child]
+    assert np.all(model.degree_[parent] >= model.degree_[child])
+    assert np.all(np.linalg.norm(X[child] - X[parent], ord=np.inf, axis=1) <= model.dc_)
+    assert set(model.centers_.tolist()) <= set(leaders.tolist())
+
+
+def test_predict_joins_the_dominant_neighbour(vectors):
+    X = vectors['flame']
+    model = LSClustering(dc_percent=6).fit(X)
+    rng = np.random.default_rng(0)
+    Y = np.concatenate((X[rng.choice(len(X), 50)] + rng.normal(scale=0.5, size=(50, 2)), [[1e3, 1e3]]))
+    expected = []
+    for y in Y:
+        distance = np.abs(X - y).max(axis=1)
+        near = np.flatnonzero(distance <= model.dc_)
+        if len(near) == 0:
+            expected.append(-1)
+            continue
+        best = min(near.tolist(), key=lambda i: (-model.degree_[i], distance[i], i))
+        expected.append(model.labels_[best])
+    assert model.predict(Y, batch_size=7).tolist() == expected
+    assert expected[-1] == -1
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import networkx as nx
+import pytest
+from LS_csr_engine import CSRGraph
+from LS_graph_io import read_edgelist_csr, load_csr
+
+EDGES = '''# comment line
+3 7
+7 1 5.0
+1 3
+3 7
+3 3
+2 5   # trailing comment
+5 2
+7 9
+9 9
+1 2
+'''
+
+
+def assert_same(csr, expected):
+    assert np.asarray(csr.nodes).tolist() == list(expected.nodes)
+    assert np.array_equal(csr.indptr, expected.indptr)
+    assert np.array_equal(csr.indices, expected.indices)
+    assert np.array_equal(csr.selfloop, expected.selfloop)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1 << 20])
+def test_matches_read_edgelist(tmp_path, chunk_size):
+    path = tmp_path / 'edges.txt'
+    path.write_text(EDGES)
+    expected = CSRGraph.from_networkx(nx.read_edgelist(str(path), nodetype=int, data=False))
+    assert_same(read_edgelist_csr(str(path), chunk_size=chunk_size), expected)
+    directory = str(tmp_path / 'csr')
+    assert_same(read_edgelist_csr(str(path), chunk_size=chunk_size, directory=directory), expected)
+    assert_same(load_csr(directory), expected)
+
+
+def test_bundled_network(tmp_path, networks):
+    G = networks['football']
+    path = str(tmp_path / 'football.txt')
+    nx.write_edgelist(G, path, data=False)
+    expected = CSRGraph.from_networkx(nx.read_edgelist(path, nodetype=int))
+    assert_same(read_edgelist_csr(path, chunk_size=100), expected)
+    text = str(tmp_path / 'text.csv')
+    with open(text, 'w') as f:
+        f.writelines('n%s,n%s\n' % edge for edge in G.edges)
+    expected = CSRGraph.from_networkx(nx.read_edgelist(text, delimiter=',', nodetype=str))
+    assert_same(read_edgelist_csr(text, delimiter=',', nodetype=str, chunk_size=100), expected)
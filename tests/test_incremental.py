@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import glob
+import random
+import numpy as np
+import networkx as nx
+import pytest
+from LS_algorithm import local_search_communities
+from LS_incremental import IncrementalLS, verify_incremental
+
+
+def test_agrees_with_full_recompute():
+    paths = sorted(glob.glob('data/hierarchy_network/test/*.gml'))[:3]
+    assert verify_incremental(paths, batches=10, batch_size=10) == []
+
+
+@pytest.mark.parametrize('center_num', [None, 3])
+def test_update_returns_the_changed_labels(center_num):
+    rng = random.Random(0)
+    G = nx.gnm_random_graph(80, 120, seed=1)
+    inc = IncrementalLS(G, center_num=center_num, seed=2)
+    for batch in range(20):
+        before = inc.partition()
+        deleted = rng.sample(list(G.edges), 4)
+        inserted = [tuple(rng.sample(range(80), 2)) for _ in range(4)] + [(0, 1000 + batch)]
+        G.remove_edges_from(deleted)
+        G.add_edges_from(inserted)
+        changed = inc.update(inserted=inserted, deleted=deleted)
+        after = inc.partition()
+        assert changed == {v: c for v, c in after.items() if before.get(v) != c}
+        assert after == inc.result.partition()
+        assert inc.check() == []
+
+
+def test_same_dag_as_local_search(networks):
+    for G in networks.values():
+        result = local_search_communities(G, seed=1)
+        inc = IncrementalLS(G, seed=1)
+        assert sorted((u, v) for u, out in enumerate(inc.succ) for v in out) == \
+            sorted(zip(result.dag_src.tolist(), result.dag_dst.tolist()))
+
+
+def test_tie_free_partitions_equal_local_search():
+    # without ties in the forest (no node with two DAG successors) the node priorities play no role
+    checked = 0
+    for seed in range(30):
+        G = nx.barabasi_albert_graph(40, 1, seed=seed)
+        if np.bincount(local_search_communities(G, seed=1).dag_src).max() > 1:
+            continue
+        for center_num in (None, 2):
+            expected = local_search_communities(G, center_num=center_num, seed=1).partition()
+            assert IncrementalLS(G, center_num=center_num, seed=7).partition() == expected
+        checked += 1
+    assert checked > 10
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from LS_csr_engine import traced_peak
+from LS_distance import TILE_MEMORY, pairwise_distances
+from LS_knn_graph import knn_neighbours, knn_graph_csr
+
+
+def brute_neighbours(X, k, metric):
+    # all distances sorted by (distance, index), the point itself excluded
+    distance = pairwise_distances(X, metric, gram=False)
+    np.fill_diagonal(distance, np.inf)
+    order = np.lexsort((np.broadcast_to(np.arange(len(X)), distance.shape), distance), axis=1)
+    return order[:, :k]
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'chebyshev', 'manhattan'])
+def test_neighbours_match_sorted_distances(vectors, metric):
+    for X in vectors.values():
+        for k in (1, 5, 12):
+            expected = brute_neighbours(X, k, metric)
+            indices, distances = knn_neighbours(X, k, metric, gram=False, block=17, workers=2)
+            assert np.array_equal(indices, expected)
+            assert np.array_equal(distances, np.take_along_axis(pairwise_distances(X, metric, gram=False),
+                                                                expected, axis=1))
+
+
+def test_ties_take_the_smaller_index():
+    # points on a grid have many equal distances
+    X = np.array([[i, j] for i in range(6) for j in range(6)], dtype=float)
+    for k in (1, 3, 4, 7):
+        assert np.array_equal(knn_neighbours(X, k, block=5)[0], brute_neighbours(X, k, 'euclidean'))
+    with pytest.raises(ValueError):
+        knn_neighbours(X, len(X))
+
+
+@pytest.mark.parametrize('symmetrization', ['knn', 'mutual', 'snn'])
+def test_symmetrization(vectors, symmetrization):
+    X = vectors['iris']
+    k = 6
+    lists = [set(row) for row in brute_neighbours(X, k, 'euclidean').tolist()]
+    expected = set()
+    for i in range(len(X)):
+        for j in lists[i]:
+            if symmetrization == 'mutual' and i not in lists[j]:
+                continue
+            if symmetrization == 'snn' and len(lists[i] & lists[j]) < k // 2:
+                continue
+            expected.add((min(i, j), max(i, j)))
+    csr = knn_graph_csr(X, k, symmetrization)
+    edges = {(u, v) for u in range(len(X)) for v in csr.neighbors(u).tolist() if u < v}
+    assert edges == expected
+    assert all(np.all(np.diff(csr.neighbors(u)) > 0) for u in range(len(X)))
+
+
+@pytest.mark.parametrize('metric, gram', [('manhattan', False), ('euclidean', True)])
+@pytest.mark.parametrize('workers', [1, 4])
+def test_blocks_bounded_by_tile_memory(metric, gram, workers):
+    # the default blocks of all workers, with the coordinate differences of the kernel, fit in TILE_MEMORY
+    X = np.random.default_rng(3).normal(size=(2000, 100))
+    assert traced_peak(knn_neighbours, X, 5, metric, gram=gram, workers=workers) < 1.5 * TILE_MEMORY
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import math
+import numpy as np
+import networkx as nx
+import pytest
+from LS_algorithm import local_search_communities
+from LS_other_function import cal_auc
+from LS_metrics import evaluate_partition, normalized_mutual_information, adjusted_rand_index, modularity
+
+
+def legacy_cal_auc(y_pred, y_true):
+    # the original pair-by-pair cal_auc
+    labels = {}
+    for index, label in enumerate(y_true):
+        labels.setdefault(label, []).append(index)
+    TP = FP = TP_all = FP_all = 0
+    for index_list in labels.values():
+        for i in range(len(index_list) - 1):
+            for j in range(i + 1, len(index_list)):
+                TP_all += 1
+                TP += y_pred[index_list[i]] == y_pred[index_list[j]]
+    FN = TP_all - TP
+    groups = list(labels.values())
+    for i in range(len(groups) - 1):
+        for j in range(i + 1, len(groups)):
+            for k in groups[i]:
+                for t in groups[j]:
+                    FP_all += 1
+                    FP += y_pred[k] == y_pred[t]
+    precision = 0 if TP + FP == 0 else TP / (TP + FP)
+    recall = 0 if TP + FN == 0 else TP / (TP + FN)
+    F1 = 0 if 2 * TP + FP + FN == 0 else 2 * TP / (2 * TP + FP + FN)
+    return precision, recall, F1
+
+
+def brute_pairs(y_true, y_pred):
+    TP = FP = FN = TN = 0
+    for i in range(len(y_true)):
+        for j in range(i + 1, len(y_true)):
+            same_true = y_true[i] == y_true[j]
+            same_pred = y_pred[i] == y_pred[j]
+            TP += same_true and same_pred
+            FP += same_pred and not same_true
+            FN += same_true and not same_pred
+            TN += not same_true and not same_pred
+    return TP, FP, FN, TN
+
+
+def brute_nmi(y_true, y_pred):
+    n = len(y_true)
+    count = lambda labels: {v: labels.count(v) for v in set(labels)}
+    a, b, ab = count(list(y_true)), count(list(y_pred)), count(list(zip(y_true, y_pred)))
+    if len(a) == len(b) == 1:
+        return 1.0
+    mutual = sum(c / n * math.log(c * n / (a[i] * b[j])) for (i, j), c in ab.items())
+    entropy = lambda counts: -sum(c / n * math.log(c / n) for c in counts.values())
+    return max(mutual, 0.0) / ((entropy(a) + entropy(b)) / 2)
+
+
+def labelings(networks):
+    # LS partitions of the networks against their ground truth, and random labelings with -1 and text labels
+    for name, G in networks.items():
+        truth = [G.nodes[v]['club' if name == 'karate' else 'value'] for v in G]
+        for center_num in (None, 2):
+            partition = local_search_communities(G, center_num=center_num, seed=1).partition()
+            yield G, [partition[v] for v in G], truth
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 7, 60):
+        for _ in range(5):
+            yield None, rng.integers(-1, 4, size=n).tolist(), [str(x) for x in rng.integers(0, 3, size=n)]
+
+
+def test_cal_auc_matches_legacy(networks):
+    for _, y_pred, y_true in labelings(networks):
+        assert cal_auc(y_pred, y_true) == legacy_cal_auc(y_pred, y_true)
+    assert cal_auc([], []) == (0, 0, 0)
+
+
+def test_ari_and_nmi(networks):
+    for _, y_pred, y_true in labelings(networks):
+        TP, FP, FN, TN = brute_pairs(y_true, y_pred)
+        denominator = (TP + FN) * (FN + TN) + (TP + FP) * (FP + TN)
+        if denominator > 0:
+            assert adjusted_rand_index(y_true, y_pred) == pytest.approx(2 * (TP * TN - FN * FP) / denominator)
+        assert normalized_mutual_information(y_true, y_pred) == pytest.approx(brute_nmi(y_true, y_pred))
+    assert adjusted_rand_index([0, 0, 1, 1], [5, 5, 3, 3]) == 1.0
+
+
+def test_modularity(networks):
+    for G, y_pred, y_true in labelings(networks):
+        if G is None:
+            continue
+        communities = {}
+        for v, label in zip(G, y_pred):
+            communities.setdefault(label, set()).add(v)
+        expected = nx.community.modularity(G, communities.values(), weight=None)
+        assert modularity(G, y_pred) == pytest.approx(expected)
+        scores = evaluate_partition(y_pred, y_true, G)
+        assert scores['modularity'] == pytest.approx(expected)
+        assert (scores['precision'], scores['recall'], scores['F1']) == legacy_cal_auc(y_pred, y_true)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import networkx as nx
+from LS_cluster_function import caldistance, chose_dc_gradual, cal_adge
+from LS_percolation import percolation_sweep, minimum_spanning_edges
+
+
+def rebuilt_sweep(distance):
+    # the original cal_jumppoint: one network per threshold of chose_dc_gradual
+    n = len(distance)
+    gcc, sgcc = [], []
+    for dc in chose_dc_gradual(distance):
+        G = nx.Graph()
+        G.add_nodes_from(range(n))
+        G.add_edges_from(zip(*cal_adge(distance, dc)))
+        sizes = sorted((len(c) for c in nx.connected_components(G)), reverse=True) + [0]
+        gcc.append(sizes[0] / n)
+        sgcc.append(sizes[1] / n)
+    return gcc, sgcc
+
+
+def test_sweep_matches_rebuilt_networks(vectors):
+    for X in vectors.values():
+        distance = caldistance(X, 0)
+        gcc, sgcc = rebuilt_sweep(distance)
+        for dis in (distance, caldistance(X, 0, condensed=True)):
+            thresholds, sweep_gcc, sweep_sgcc, jump = percolation_sweep(dis)
+            assert thresholds == chose_dc_gradual(distance)
+            assert sweep_gcc.tolist() == gcc and sweep_sgcc.tolist() == sgcc
+            assert jump == int(np.argmax(sgcc))
+
+
+def test_minimum_spanning_edges(vectors):
+    X = vectors['flame']
+    distance = caldistance(X, 0)
+    start, end, length = minimum_spanning_edges(distance)
+    tree = nx.minimum_spanning_tree(nx.from_numpy_array(distance))
+    assert np.isclose(length.sum(), tree.size(weight='weight'))
+    assert np.array_equal(length, distance[start, end])
+    _, _, vector_length = minimum_spanning_edges(X=X)
+    assert np.allclose(np.sort(vector_length), np.sort(length))
+
+
+def test_few_points():
+    # square arrays or vectors: an empty condensed array stands for no points as well as for one
+    for n in (0, 1, 2):
+        X = np.arange(n, dtype=float).reshape(-1, 1)
+        for source in (dict(dis=caldistance(X, 0)), dict(X=X)):
+            _, gcc, sgcc, _ = percolation_sweep(thresholds=[0.5, 1.5], **source)
+            assert gcc.tolist() == ([0.0, 0.0] if n == 0 else [1 / n, 1.0])
+            assert sgcc.tolist() == ([0.0, 0.0] if n < 2 else [0.5, 0.0])
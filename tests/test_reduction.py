@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from LS_cluster_function import caldistance
+from LS_knn_graph import knn_graph_csr
+from LS_reduction import randomized_pca, sparse_random_projection, reduce_dimension, reducer
+
+
+def exact_pca(X, dimension):
+    centered = X - X.mean(axis=0)
+    _, _, components = np.linalg.svd(centered, full_matrices=False)
+    components = components[:dimension]
+    largest = np.argmax(np.abs(components), axis=1)
+    components *= np.sign(components[np.arange(dimension), largest])[:, None]
+    return centered @ components.T
+
+
+def test_randomized_pca_matches_svd():
+    rng = np.random.default_rng(0)
+    # a few strong directions and noise
+    X = rng.normal(size=(300, 5)) * [50, 20, 10, 5, 2] @ rng.normal(size=(5, 80)) + rng.normal(size=(300, 80))
+    assert np.allclose(randomized_pca(X, 5), exact_pca(X, 5), atol=1e-6)
+    assert np.array_equal(randomized_pca(X, 3, seed=4), randomized_pca(X, 3, seed=4))
+
+
+def test_sparse_random_projection():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(60, 2000))
+    Y = sparse_random_projection(X, 400, seed=2)
+    assert Y.shape == (60, 400)
+    assert np.array_equal(Y, sparse_random_projection(X, 400, seed=2))
+    ratio = caldistance(Y, 0, condensed=True) / caldistance(X, 0, condensed=True)
+    assert abs(ratio.mean() - 1) < 0.05 and ratio.min() > 0.7 and ratio.max() < 1.3
+
+
+def test_reduction_stage(vectors):
+    X = vectors['random']
+    reduced = reduce_dimension(X, 10, 'projection', seed=3)
+    assert np.array_equal(caldistance(X, 1, reduction=reducer('projection', 10, seed=3)), caldistance(reduced, 1))
+    csr = knn_graph_csr(X, 5, reduction=reducer('pca', 10))
+    assert np.array_equal(csr.indices, knn_graph_csr(reduce_dimension(X, 10), 5).indices)
+    # nothing to reduce
+    assert reduce_dimension(X, 64) is X or np.shares_memory(reduce_dimension(X, 64), X)
+    assert reduce_dimension(X, 5, method=lambda X, d, seed: X[:, :d]).shape == (120, 5)
+    with pytest.raises(ValueError):
+        reduce_dimension(X, 5, 'tsne')
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from LS_stream import GrowingIndex, StreamingLS
+from LS_vector_graph import epsilon_pairs
+
+
+def test_growing_index_finds_all_points_within_radius():
+    rng = np.random.default_rng(0)
+    index = GrowingIndex(2, 'euclidean', buffer_size=8)
+    points = np.zeros((0, 2))
+    for size in (5, 3, 20, 1, 40, 7):
+        batch = rng.random((size, 2))
+        index.add(batch, np.arange(len(points), len(points) + size))
+        points = np.concatenate((points, batch))
+        assert len(index) == len(points)
+        Y = rng.random((10, 2))
+        rows, ids = index.query_radius(Y, 0.2)
+        found = set(zip(rows.tolist(), ids.tolist()))
+        near = np.linalg.norm(Y[:, None, :] - points[None, :, :], axis=-1) <= 0.2
+        assert set(zip(*np.nonzero(near))) <= found
+
+
+@pytest.mark.parametrize('order', [0, 1])
+def test_stream_matches_the_network_of_all_points(vectors, order):
+    X = vectors['flame'][np.random.default_rng(1).permutation(240)]
+    metric = 'euclidean' if order == 0 else 'chebyshev'
+    stream = StreamingLS(X[:60], dc_percent=6, order=order, seed=1, buffer_size=16)
+    labels = stream.labels()
+    for start in range(60, 240, 30):
+        changed = stream.insert(X[start:start + 30])
+        new = stream.labels()
+        assert changed == {v: c for v, c in enumerate(new.tolist()) if v >= len(labels) or labels[v] != c}
+        labels = new
+        assert stream.ls.check() == []
+    start, end = epsilon_pairs(X, stream.dc, metric)
+    assert stream.edges() == list(zip(start.tolist(), end.tolist()))
+    assert stream.partition() == dict(enumerate(labels.tolist()))
+
+    stream.recalibrate(dc_percent=8)
+    start, end = epsilon_pairs(X, stream.dc, metric)
+    assert stream.edges() == list(zip(start.tolist(), end.tolist()))
+
+
+def test_stream_without_initial_points():
+    stream = StreamingLS(dc=0.5, order=0)
+    stream.insert(np.array([[0.0, 0.0], [0.3, 0.0]]))
+    stream.insert(np.array([[0.6, 0.0], [5.0, 5.0]]))
+    assert stream.edges() == [(0, 1), (1, 2)]
+    assert stream.labels().tolist() == [1, 1, 1, -1] and stream.ls.check() == []
+    with pytest.raises(ValueError):
+        StreamingLS()
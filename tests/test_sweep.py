@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import networkx as nx
+from LS_algorithm import local_search_communities
+from LS_cluster_function import caldistance, chose_dc, cal_adge
+from LS_other_function import cal_auc
+from LS_sweep import grid_search, _init_worker, _run_threshold
+
+
+def pipeline_scores(X, labels, dc_percent, center_num):
+    # one run of caldistance -> chose_dc -> cal_adge -> networkx -> LS per combination
+    distance = caldistance(X, 1)
+    start, end = cal_adge(distance, chose_dc(distance, dc_percent))
+    G = nx.from_pandas_edgelist(pd.DataFrame({'from': start, 'to': end}), source='from', target='to')
+    G.add_nodes_from(range(len(X)))
+    leaders = len(local_search_communities(G, seed=1).leaders)
+    partition = local_search_communities(G, center_num=min(center_num, leaders), seed=1).partition()
+    return (len(start), leaders) + cal_auc([partition[i] for i in range(len(X))], labels)
+
+
+def test_grid_matches_pipeline():
+    data = np.loadtxt('data/2d_datasets/flame.txt')
+    X, labels = data[:, :2], data[:, 2].astype(int).tolist()
+    table = grid_search(X, labels, [2, 6, 10], [1, 2, 5, 1000], workers=1)
+    assert len(table) == 12
+    for row in table.itertuples():
+        assert (row.edges, row.leaders, row.precision, row.recall, row.F1) == \
+            pipeline_scores(X, labels, row.dc_percent, row.center_num)
+    pool = grid_search(X, labels, [10, 2, 6], [1, 2, 5, 1000], workers=2,
+                       distance=caldistance(X, 1))
+    pd.testing.assert_frame_equal(pool, table)
+
+
+def test_all_leaders_and_no_leaders():
+    data = np.loadtxt('data/2d_datasets/flame.txt')
+    X, labels = data[:, :2], data[:, 2].astype(int).tolist()
+    table = grid_search(X, labels, [4], [0, 3], workers=1)
+    # center_num 0 takes all local leaders, as local_search_communities does
+    assert table.centers.tolist() == [table.leaders[0], 3]
+    assert tuple(table.loc[0, ['edges', 'leaders', 'precision', 'recall', 'F1']]) == pipeline_scores(X, labels, 4, 0)
+    # a network without edges has no local leaders and no communities
+    _init_worker(np.array([0]), np.array([1]), np.array([1]), 3, [0, 0, 1], [0, 2], dict(seed=1, maximum_tree=True))
+    rows = _run_threshold((0, 0.5, 0))
+    assert [(row['edges'], row['leaders'], row['centers']) for row in rows] == [(0, 0, 0), (0, 0, 0)]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import warnings
+import numpy as np
+import pandas as pd
+import networkx as nx
+import pytest
+from LS_csr_engine import CSRGraph, traced_peak
+from LS_cluster_function import chose_dc, cal_adge
+from LS_distance import TILE_MEMORY, distance_range, pairwise_distances, condensed_distances
+from LS_vector_graph import distance_range_points, epsilon_graph_csr
+
+
+def pipeline_graph(X, order, dc_percent):
+    # the network of the usual path caldistance -> chose_dc -> cal_adge -> nx.from_pandas_edgelist, with the
+    # distances of np.linalg.norm (caldistance uses the Gram matrix for many dimensions, which may differ in the last bits)
+    distance = pairwise_distances(X, 'euclidean' if order == 0 else 'chebyshev', gram=False)
+    dc = chose_dc(distance, dc_percent)
+    start, end = cal_adge(distance, dc)
+    G = nx.from_pandas_edgelist(pd.DataFrame({'from': start, 'to': end}), source='from', target='to')
+    G.add_nodes_from(range(len(X)))
+    return CSRGraph.from_networkx(G), dc
+
+
+@pytest.mark.parametrize('order', [0, 1])
+@pytest.mark.parametrize('dc_percent', [0, 3, 6, 20])
+def test_epsilon_graph_matches_pipeline(vectors, order, dc_percent):
+    for X in vectors.values():
+        expected, expected_dc = pipeline_graph(X, order, dc_percent)
+        csr, dc = epsilon_graph_csr(X, dc_percent=dc_percent, metric='euclidean' if order == 0 else 'chebyshev')
+        assert dc == expected_dc
+        assert np.asarray(csr.nodes).tolist() == list(expected.nodes)
+        assert np.array_equal(csr.indptr, expected.indptr)
+        assert np.array_equal(csr.indices, expected.indices)
+
+
+def test_distance_range_points(vectors):
+    for X in vectors.values():
+        for metric in ('euclidean', 'chebyshev'):
+            arr_min, arr_max, exact = distance_range_points(X, metric)
+            assert exact
+            assert (arr_min, arr_max) == distance_range(condensed_distances(X, metric, gram=False))
+
+
+def test_estimated_range_warns():
+    X = np.random.default_rng(1).normal(size=(5000, 8))
+    assert not distance_range_points(X, exact=False)[2]
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        epsilon_graph_csr(X, dc_percent=3, exact=False)
+    assert len(caught) == 1
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        epsilon_graph_csr(X[:1000], dc_percent=3, exact=False)
+
+
+def test_distance_range_points_memory():
+    # all pairs of many-dimensional points are scanned in Gram tiles of TILE_MEMORY bytes, whatever the dimension
+    X = np.random.default_rng(2).normal(size=(3000, 120))
+    arr_min, arr_max, exact = distance_range_points(X, exact=True)
+    assert exact
+    assert (arr_min, arr_max) == distance_range(condensed_distances(X, gram=False))
+    assert traced_peak(distance_range_points, X, exact=True) < 2 * TILE_MEMORY